@@ -2,6 +2,7 @@ from rest_framework import serializers
 from .models import Case, CaseNote
 from apps.violations.serializers import ViolationSerializer
 from apps.accounts.serializers import UserSerializer
+from price_monitoring.flat_lists import SparseFieldsMixin
 
 
 class CaseNoteSerializer(serializers.ModelSerializer):
@@ -35,6 +36,34 @@ class CaseSerializer(serializers.ModelSerializer):
         ]
 
 
+class CaseListSerializer(SparseFieldsMixin, serializers.Serializer):
+    """Compact case rows for the list endpoint (flat values, nested objects only on ?expand=)."""
+    
+    id = serializers.IntegerField()
+    violation_id = serializers.IntegerField()
+    violation_severity = serializers.CharField()
+    regulated_product_name = serializers.CharField()
+    scraped_product_name = serializers.CharField()
+    marketplace = serializers.CharField()
+    listed_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    investigator_id = serializers.IntegerField()
+    investigator_name = serializers.CharField()
+    status = serializers.CharField()
+    notes = serializers.CharField()
+    resolution_notes = serializers.CharField()
+    final_penalty = serializers.DecimalField(max_digits=10, decimal_places=2)
+    closed_at = serializers.DateTimeField()
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+    
+    violation = ViolationSerializer(read_only=True)
+    investigator = UserSerializer(read_only=True)
+    case_notes = CaseNoteSerializer(many=True, read_only=True)
+    
+    class Meta:
+        expandable_fields = ['violation', 'investigator', 'case_notes']
+
+
 class CaseCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating a case."""
     
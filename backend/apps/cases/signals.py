@@ -0,0 +1,19 @@
+"""
+Signal handlers for case changes.
+Bumps the 'cases' data version, which the ETags of case statistics and
+reports are derived from.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from price_monitoring.caching import bump_data_versions_on_commit
+
+from .models import Case
+
+
+@receiver(post_save, sender=Case)
+@receiver(post_delete, sender=Case)
+def bump_cases_version(sender, instance, **kwargs):
+    """Mark case data as changed once the current transaction commits."""
+    bump_data_versions_on_commit('cases')
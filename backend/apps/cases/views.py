@@ -1,32 +1,76 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Prefetch
 from django.utils import timezone
 
 from .models import Case, CaseNote
 from .serializers import (
     CaseSerializer, CaseCreateSerializer, CaseUpdateSerializer,
-    CaseNoteSerializer, CaseNoteCreateSerializer
+    CaseNoteSerializer, CaseNoteCreateSerializer, CaseListSerializer
 )
+from apps.accounts.models import User
+from apps.violations.models import Violation
+from price_monitoring.conditional import conditional_response
+from price_monitoring.flat_lists import FlatListMixin
+from price_monitoring.pagination import OptionalCursorPagination
+from price_monitoring.query_budget import QueryBudgetMixin, query_budget
 
 
-class CaseListCreateView(generics.ListCreateAPIView):
-    """List and create cases."""
+def notes_by_case(case_ids):
+    """Case notes for several cases, as {case id: [notes]}."""
+    notes = {case_id: [] for case_id in case_ids}
+    for note in CaseNote.objects.filter(case_id__in=case_ids).select_related('author'):
+        notes[note.case_id].append(note)
+    return notes
+
+
+class CaseListCreateView(QueryBudgetMixin, FlatListMixin, generics.ListCreateAPIView):
+    """List and create cases.
+    
+    Listed rows are flat; ?fields= picks columns and ?expand=violation,investigator,case_notes
+    adds the nested objects the detail endpoint returns.
+    """
     
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ('-created_at', '-id')
+    # Authentication, count, page and one query per expansion
+    query_budget = 6
+    list_values = {
+        'id': 'id',
+        'violation_id': 'violation_id',
+        'violation_severity': 'violation__severity',
+        'regulated_product_name': 'violation__regulated_product__name',
+        'scraped_product_name': 'violation__scraped_product__product_name',
+        'marketplace': 'violation__scraped_product__marketplace',
+        'listed_price': 'violation__scraped_product__listed_price',
+        'investigator_id': 'investigator_id',
+        'investigator_name': 'investigator__name',
+        'status': 'status',
+        'notes': 'notes',
+        'resolution_notes': 'resolution_notes',
+        'final_penalty': 'final_penalty',
+        'closed_at': 'closed_at',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+    expand_loaders = {
+        'violation': ('violation_id', Violation.objects.select_related(
+            'regulated_product', 'scraped_product__website', 'confirmed_by'
+        ).in_bulk),
+        'investigator': ('investigator_id', User.objects.in_bulk),
+        'case_notes': ('id', notes_by_case),
+    }
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return CaseCreateSerializer
-        return CaseSerializer
+        return CaseListSerializer
     
     def get_queryset(self):
-        queryset = Case.objects.select_related(
-            'violation__regulated_product',
-            'violation__scraped_product',
-            'investigator'
-        ).prefetch_related('case_notes__author').all()
+        # Rows are read with values() (see list_values), so no related objects are loaded here
+        queryset = Case.objects.all()
         
         # Filter by status
         status_filter = self.request.query_params.get('status')
@@ -64,16 +108,20 @@ class CaseListCreateView(generics.ListCreateAPIView):
         serializer.save(investigator=self.request.user)
 
 
-class CaseDetailView(generics.RetrieveUpdateAPIView):
+class CaseDetailView(QueryBudgetMixin, generics.RetrieveUpdateAPIView):
     """Retrieve and update a case."""
     
     queryset = Case.objects.select_related(
         'violation__regulated_product',
-        'violation__scraped_product',
+        'violation__scraped_product__website',
+        'violation__confirmed_by',
         'investigator'
-    ).prefetch_related('case_notes__author').all()
+    ).prefetch_related(
+        Prefetch('case_notes', queryset=CaseNote.objects.select_related('author'))
+    ).all()
     serializer_class = CaseUpdateSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 6
     
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -88,7 +136,7 @@ class CaseDetailView(generics.RetrieveUpdateAPIView):
         return queryset
     
     def perform_update(self, serializer):
-        case = self.get_object()
+        case = serializer.instance
         
         # Only investigators can update cases
         if not self.request.user.is_investigator:
@@ -129,55 +177,56 @@ class CaseNoteListCreateView(generics.ListCreateAPIView):
         serializer.save(case=case, author=self.request.user)
 
 
+@query_budget(6)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def case_stats_view(request):
     """Get case statistics."""
     
+    # Stats differ per investigator; clients holding the current ETag get a 304
+    # until a case changes (or the minute rolls over, for the recent count)
+    key = 'case_stats:all' if request.user.is_admin else f'case_stats:{request.user.id}'
+    return conditional_response(
+        request, key, ['cases'], lambda: compute_case_stats(request.user), timeout=60, cached=False
+    )
+
+
+def compute_case_stats(user):
+    """Aggregate the case statistics served by case_stats_view."""
+    
+    # Admins see every case, investigators only their own
+    cases = Case.objects.all() if user.is_admin else Case.objects.filter(investigator=user)
+    
     # Total cases
-    total_cases = Case.objects.count()
+    total_cases = cases.count()
     
     # Cases by status
-    status_stats = Case.objects.values('status').annotate(
+    status_stats = cases.values('status').annotate(
         count=Count('id')
     ).order_by('status')
     
     # Cases by investigator
-    investigator_stats = Case.objects.values('investigator__name').annotate(
-        count=Count('id')
-    ).order_by('-count')
+    investigator_stats = []
+    if user.is_admin:
+        investigator_stats = cases.values('investigator__name').annotate(
+            count=Count('id')
+        ).order_by('-count')
     
     # Recent cases (last 7 days)
-    recent_cases = Case.objects.filter(
+    recent_cases = cases.filter(
         created_at__gte=timezone.now() - timezone.timedelta(days=7)
     ).count()
     
     # Open cases
-    open_cases = Case.objects.filter(status__in=['open', 'in_progress']).count()
+    open_cases = cases.filter(status__in=['open', 'in_progress']).count()
     
-    # If user is not admin, filter by their cases
-    if not request.user.is_admin:
-        total_cases = Case.objects.filter(investigator=request.user).count()
-        status_stats = Case.objects.filter(investigator=request.user).values('status').annotate(
-            count=Count('id')
-        ).order_by('status')
-        recent_cases = Case.objects.filter(
-            investigator=request.user,
-            created_at__gte=timezone.now() - timezone.timedelta(days=7)
-        ).count()
-        open_cases = Case.objects.filter(
-            investigator=request.user,
-            status__in=['open', 'in_progress']
-        ).count()
-        investigator_stats = []
-    
-    return Response({
+    return {
         'total_cases': total_cases,
         'status_stats': list(status_stats),
         'investigator_stats': list(investigator_stats),
         'recent_cases': recent_cases,
         'open_cases': open_cases,
-    })
+    }
 
 
 @api_view(['POST'])
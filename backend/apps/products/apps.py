@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.products'
+    
+    def ready(self):
+        """Import signal handlers when the app is ready."""
+        import apps.products.signals
@@ -0,0 +1,349 @@
+"""
+Matching of scraped product names against regulated products.
+RegulatedProductMatcher precomputes everything is_product_match needs per
+regulated product, so matching a scraped name no longer costs a DB query or
+a regex compile per candidate.
+"""
+
+import difflib
+import functools
+import logging
+import pickle
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Words that don't help with matching
+STOP_WORDS = frozenset([
+    'the', 'and', 'or', 'of', 'in', 'on', 'at', 'to', 'for', 'with', 'by',
+    'kg', 'liter', 'l', 'piece', 'pcs', 'pack', 'bag', 'box'
+])
+
+KEYWORD_SPLIT_RE = re.compile(r'[\s\-_\(\)\[\]\/]+')
+WEIGHT_RE = re.compile(r'\d+kg')
+VOLUME_RE = re.compile(r'\d+liter?')
+PIECES_RE = re.compile(r'\d+pc?s?')
+BRACKETS_RE = re.compile(r'[\(\)\[\]]')
+SPACES_RE = re.compile(r'\s+')
+
+SIMILARITY_THRESHOLD = 0.6
+KEYWORD_MATCH_RATIO = 0.5
+
+MATCHER_VERSION_CACHE_KEY = 'regulated_product_matcher_version'
+# How often a long-lived matcher checks whether another process changed the products
+VERSION_CHECK_INTERVAL = 5.0
+# Search keywords whose related vocabulary keywords a matcher remembers
+RELATED_KEYWORDS_CACHE_SIZE = 10000
+
+
+def extract_keywords(name):
+    """Extract meaningful keywords from product name."""
+    name = name.lower().strip()
+    words = KEYWORD_SPLIT_RE.split(name)
+    return [word for word in words if word and word not in STOP_WORDS and len(word) > 2]
+
+
+def normalize_for_matching(name):
+    """Normalize product name for better matching."""
+    name = name.lower().strip()
+    name = WEIGHT_RE.sub('', name)  # Remove weight specifications
+    name = VOLUME_RE.sub('', name)  # Remove volume specifications
+    name = PIECES_RE.sub('', name)  # Remove piece specifications
+    name = BRACKETS_RE.sub('', name)  # Remove brackets
+    name = SPACES_RE.sub(' ', name)  # Normalize spaces
+    return name.strip()
+
+
+def keyword_match_count(search_keywords, regulated_keywords):
+    """Count search keywords that overlap (as substrings) with any regulated keyword."""
+    matches = 0
+    for search_kw in search_keywords:
+        for reg_kw in regulated_keywords:
+            if search_kw in reg_kw or reg_kw in search_kw:
+                matches += 1
+                break
+    return matches
+
+
+def names_match(search_normalized, search_keywords, regulated_normalized, regulated_keywords):
+    """Decide whether two pre-normalised product names match."""
+    # Check for exact match
+    if search_normalized == regulated_normalized:
+        return True
+
+    # Check for substring match
+    if search_normalized in regulated_normalized or regulated_normalized in search_normalized:
+        return True
+
+    # At least half of the search keywords overlap with the regulated keywords
+    if search_keywords:
+        matches = keyword_match_count(search_keywords, regulated_keywords)
+        if matches and matches / len(search_keywords) >= KEYWORD_MATCH_RATIO:
+            return True
+
+    # Check similarity ratio as fallback
+    return similarity_ratio(search_normalized, regulated_normalized) > SIMILARITY_THRESHOLD
+
+
+def similarity_ratio(search_normalized, regulated_normalized):
+    """difflib similarity of two normalised names (argument order matters to difflib)."""
+    return difflib.SequenceMatcher(None, search_normalized, regulated_normalized).ratio()
+
+
+def similarity_upper_bound(search_counts, search_length, regulated_counts, regulated_length):
+    """Upper bound of similarity_ratio from character counts (difflib's quick_ratio)."""
+    total = search_length + regulated_length
+    if not total:
+        return 1.0
+    common = sum(min(count, regulated_counts[char]) for char, count in search_counts.items() if char in regulated_counts)
+    return 2.0 * common / total
+
+
+def match_score(scraped_name, regulated_name):
+    """Score how well a scraped name fits a regulated name; higher is better."""
+    # Normalize names
+    scraped_norm = scraped_name.lower().strip()
+    regulated_norm = regulated_name.lower().strip()
+
+    # Calculate similarity
+    similarity = difflib.SequenceMatcher(None, scraped_norm, regulated_norm).ratio()
+
+    # Boost score for keyword matches
+    scraped_words = set(scraped_norm.split())
+    regulated_words = set(regulated_norm.split())
+    common_words = scraped_words.intersection(regulated_words)
+
+    if common_words:
+        keyword_boost = len(common_words) / max(len(scraped_words), len(regulated_words))
+        similarity += keyword_boost * 0.3
+
+    return similarity
+
+
+class RegulatedProductMatcher:
+    """In-memory index of regulated products for matching scraped names.
+
+    Holds each product's lower-cased and normalised name and its keywords,
+    plus an inverted index from keyword to products. Products keep the order
+    they were given in, which decides the winner when several fuzzy-match.
+    Fuzzy matching takes the keyword rule from the index and only runs difflib
+    for products whose length and character-count bounds don't already rule it
+    out, so it makes exactly the decisions is_product_match would.
+    """
+
+    def __init__(self, regulated_products, version=None):
+        self.products = list(regulated_products)
+        self.version = version
+        self._lower_names = [product.name.lower() for product in self.products]
+        self._normalized = [normalize_for_matching(product.name) for product in self.products]
+        self._keywords = [extract_keywords(product.name) for product in self.products]
+        self._char_counts = [Counter(name) for name in self._normalized]
+
+        self._keyword_index = defaultdict(set)
+        for position, keywords in enumerate(self._keywords):
+            for keyword in keywords:
+                self._keyword_index[keyword].add(position)
+        self._start_related_keywords_cache()
+
+    def _start_related_keywords_cache(self):
+        self._related_keywords = functools.lru_cache(maxsize=RELATED_KEYWORDS_CACHE_SIZE)(self._find_related_keywords)
+
+    def __getstate__(self):
+        # The lru_cache wrapper can't be pickled (e.g. when sent to spawned worker processes)
+        state = self.__dict__.copy()
+        del state['_related_keywords']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._start_related_keywords_cache()
+
+    @classmethod
+    def for_active_products(cls, version=None):
+        """Build a matcher over all active regulated products."""
+        from .models import RegulatedProduct
+        return cls(RegulatedProduct.objects.filter(is_active=True), version=version)
+
+    def __len__(self):
+        return len(self.products)
+
+    def _find_related_keywords(self, search_kw):
+        """Vocabulary keywords that contain, or are contained in, a search keyword (LRU-cached per matcher)."""
+        return tuple(kw for kw in self._keyword_index if search_kw in kw or kw in search_kw)
+
+    def keyword_overlaps(self, search_keywords):
+        """{position: number of search keywords it overlaps} for products sharing any keyword."""
+        counts = defaultdict(int)
+        for search_kw in search_keywords:
+            positions = set()
+            for keyword in self._related_keywords(search_kw):
+                positions |= self._keyword_index[keyword]
+            for position in positions:
+                counts[position] += 1
+        return counts
+
+    def keyword_candidates(self, name):
+        """Positions of products passing the keyword-overlap rule, via the inverted index."""
+        search_keywords = extract_keywords(name)
+        if not search_keywords:
+            return set()
+
+        needed = KEYWORD_MATCH_RATIO * len(search_keywords)
+        return {position for position, count in self.keyword_overlaps(search_keywords).items() if count >= needed}
+
+    def direct_matches(self, name):
+        """Products whose name contains `name` case-insensitively (like name__icontains)."""
+        name_lower = name.lower()
+        return [
+            product for product, lower_name in zip(self.products, self._lower_names)
+            if name_lower in lower_name
+        ]
+
+    def fuzzy_matches(self, name):
+        """Yield (position, product) for every product is_product_match accepts, in order.
+
+        The keyword rule is answered from the inverted index; difflib only runs
+        when the length and character-count upper bounds of its ratio (which
+        can only over-estimate it) clear the threshold.
+        """
+        search_normalized = normalize_for_matching(name)
+        search_counts = Counter(search_normalized)
+        search_length = len(search_normalized)
+        search_keywords = extract_keywords(name)
+
+        keyword_hits = set()
+        if search_keywords:
+            needed = KEYWORD_MATCH_RATIO * len(search_keywords)
+            keyword_hits = {
+                position for position, count in self.keyword_overlaps(search_keywords).items() if count >= needed
+            }
+
+        for position, regulated_normalized in enumerate(self._normalized):
+            if (
+                position in keyword_hits or
+                search_normalized in regulated_normalized or
+                regulated_normalized in search_normalized
+            ):
+                yield position, self.products[position]
+                continue
+
+            # difflib can't match more characters than the shorter name has
+            # (neither name is empty here, or the substring check would have matched)
+            regulated_length = len(regulated_normalized)
+            if 2.0 * min(search_length, regulated_length) / (search_length + regulated_length) <= SIMILARITY_THRESHOLD:
+                continue
+
+            upper_bound = similarity_upper_bound(
+                search_counts, search_length, self._char_counts[position], regulated_length
+            )
+            if upper_bound <= SIMILARITY_THRESHOLD:
+                continue
+
+            if similarity_ratio(search_normalized, regulated_normalized) > SIMILARITY_THRESHOLD:
+                yield position, self.products[position]
+
+    def best_match(self, name):
+        """Highest-scoring fuzzy match for `name` as (product, score), or (None, 0).
+
+        Only products that pass the match rules are scored; ties keep the earlier product.
+        """
+        best_product = None
+        best_score = 0
+        for position, product in self.fuzzy_matches(name):
+            score = match_score(name, product.name)
+            if score > best_score:
+                best_product = product
+                best_score = score
+        return best_product, best_score
+
+    def match(self, name):
+        """Regulated products a scraped product name should be checked against.
+
+        All case-insensitive substring matches if there are any, otherwise the
+        first product that fuzzy-matches, otherwise an empty list.
+        """
+        direct = self.direct_matches(name)
+        if direct:
+            return direct
+
+        for position, product in self.fuzzy_matches(name):
+            return [product]
+        return []
+
+
+# Matcher of a match worker process (set by init_match_worker)
+_worker_matcher = None
+
+
+def init_match_worker(pickled_matcher):
+    """ProcessPoolExecutor initializer: load the matcher the parent pickled.
+
+    It lives here rather than in the management command because spawned and
+    forkserver workers import it before Django is set up, and only unpickle
+    the matcher's model instances after setup().
+    """
+    global _worker_matcher
+    from django.apps import apps
+    if not apps.ready:
+        import django
+        django.setup()
+    _worker_matcher = pickle.loads(pickled_matcher)
+
+
+def best_match_ids(names):
+    """Worker: best-matching regulated product id (or None) for each name."""
+    best_ids = []
+    for name in names:
+        product, score = _worker_matcher.best_match(name)
+        best_ids.append(product.pk if product else None)
+    return best_ids
+
+
+_matcher = None
+_matcher_checked_at = 0.0
+_matcher_lock = threading.Lock()
+
+
+def get_regulated_product_matcher():
+    """Return the process-wide matcher, rebuilding it when regulated products change.
+
+    Changes made in this process invalidate it straight away (see signals.py);
+    changes from other processes are picked up through a cache version key.
+    """
+    global _matcher, _matcher_checked_at
+
+    with _matcher_lock:
+        now = time.monotonic()
+        if _matcher is not None and now - _matcher_checked_at < VERSION_CHECK_INTERVAL:
+            return _matcher
+
+        version = cache.get(MATCHER_VERSION_CACHE_KEY)
+        if version is None:
+            version = time.time()
+            cache.add(MATCHER_VERSION_CACHE_KEY, version, None)
+            version = cache.get(MATCHER_VERSION_CACHE_KEY, version)
+
+        if _matcher is None or _matcher.version != version:
+            _matcher = RegulatedProductMatcher.for_active_products(version=version)
+            logger.info(f"Built regulated product matcher with {len(_matcher)} products")
+
+        _matcher_checked_at = now
+        return _matcher
+
+
+def invalidate_regulated_product_matcher():
+    """Drop this process's matcher and tell other processes to rebuild theirs."""
+    global _matcher
+
+    with _matcher_lock:
+        _matcher = None
+
+    try:
+        cache.set(MATCHER_VERSION_CACHE_KEY, time.time(), None)
+    except Exception as e:
+        logger.warning(f"Failed to bump regulated product matcher version: {str(e)}")
@@ -0,0 +1,21 @@
+"""
+Signal handlers for regulated product changes.
+Keeps the in-memory RegulatedProductMatcher in step with the database and
+bumps the 'products' data version used by report ETags.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from price_monitoring.caching import bump_data_versions_on_commit
+
+from .models import RegulatedProduct
+from .matching import invalidate_regulated_product_matcher
+
+
+@receiver(post_save, sender=RegulatedProduct)
+@receiver(post_delete, sender=RegulatedProduct)
+def invalidate_matcher_on_change(sender, instance, **kwargs):
+    """Rebuild matchers and bump the data version after a regulated product is created, updated or deleted."""
+    invalidate_regulated_product_matcher()
+    bump_data_versions_on_commit('products')
@@ -0,0 +1,73 @@
+import pickle
+import random
+
+from django.test import SimpleTestCase
+
+from apps.products.matching import RegulatedProductMatcher
+from apps.products.models import RegulatedProduct
+from apps.scraping.tasks import is_product_match
+
+
+REGULATED_NAMES = [
+    'Sugar 1 kg', 'Brown Sugar 500g', 'Basmati Rice 5 kg', 'Rice Pack', 'pac', 'ab cde', 'cde',
+    'Cooking Oil 1 liter', 'Dalda Banaspati Ghee', 'Wheat Flour (Atta) 10kg', 'Tea [Loose] 250g',
+    'Paracetamol 500mg', 'Milk Powder', 'Salt', 'Eggs 12 pcs', 'ab', 'Lentils/Daal Masoor',
+    'Red Chilli Powder', 'Surf Excel 1kg', 'Lux Soap',
+]
+
+SCRAPED_NAMES = [
+    # Substring and near-miss pairs the keyword rule alone doesn't catch
+    'xab cd', 'rice pack', 'abc(def', 'sugr', 'suga 1kg', 'basmti rice', 'cooking oi',
+    'Dalda Ghee 1kg', 'atta', 'Loose Tea', 'paracetamol', 'panadol 500mg', 'milk',
+    'Masoor Daal 1 kg', 'chilli', 'Surf Excel Detergent', 'lux', 'soap bar', 'eggs', 'ab',
+    '', 'kg', 'Salt 800g', 'Brown Sugr', 'Red Chili Powder 100g',
+]
+
+
+def make_matcher(names):
+    return RegulatedProductMatcher([RegulatedProduct(name=name) for name in names])
+
+
+class RegulatedProductMatcherTests(SimpleTestCase):
+    """The matcher's index shortcuts must make exactly the decisions is_product_match makes."""
+
+    def assertAgreesWithIsProductMatch(self, matcher, scraped_names):
+        for scraped_name in scraped_names:
+            expected = [
+                position for position, product in enumerate(matcher.products)
+                if is_product_match(scraped_name, product.name)
+            ]
+            actual = [position for position, product in matcher.fuzzy_matches(scraped_name)]
+            self.assertEqual(actual, expected, f"matches for {scraped_name!r}")
+
+    def test_fuzzy_matches_agree_with_is_product_match(self):
+        self.assertAgreesWithIsProductMatch(make_matcher(REGULATED_NAMES), SCRAPED_NAMES)
+
+    def test_substring_and_similarity_matches_are_found(self):
+        for scraped_name, regulated_name in [('xab cd', 'ab cde'), ('rice pack', 'pac'), ('abc(def', 'cde')]:
+            self.assertTrue(is_product_match(scraped_name, regulated_name))
+            self.assertEqual(
+                [product.name for product in make_matcher(['Salt', regulated_name]).match(scraped_name)],
+                [regulated_name]
+            )
+
+    def test_random_names_agree_with_is_product_match(self):
+        rng = random.Random(5)
+        alphabet = 'abcde ()-'
+
+        def name():
+            return ''.join(rng.choice(alphabet) for i in range(rng.randint(1, 12)))
+
+        matcher = make_matcher([name() for i in range(200)])
+        self.assertAgreesWithIsProductMatch(matcher, [name() for i in range(200)])
+
+    def test_matcher_survives_pickling(self):
+        # check_all_violations --workers sends the matcher to spawned processes
+        matcher = make_matcher(REGULATED_NAMES)
+        matcher.match('brown sugar')
+        copy = pickle.loads(pickle.dumps(matcher))
+        for scraped_name in SCRAPED_NAMES:
+            self.assertEqual(
+                [product.name for product in copy.match(scraped_name)],
+                [product.name for product in matcher.match(scraped_name)]
+            )
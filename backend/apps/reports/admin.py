@@ -1 +1,62 @@
-# No admin needed for reports app
+import os
+
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import ExportJob
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ['export_type', 'format', 'status', 'progress_display', 'created_by', 'created_at', 'completed_at', 'download_link']
+    list_filter = ['export_type', 'format', 'status', 'created_at']
+    readonly_fields = [
+        'export_type', 'format', 'filters', 'status', 'file', 'rows_total', 'rows_written',
+        'error_message', 'task_id', 'created_by', 'created_at', 'started_at', 'completed_at', 'download_link'
+    ]
+    ordering = ['-created_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def progress_display(self, obj):
+        return f"{obj.progress}%"
+    progress_display.short_description = 'Progress'
+    
+    def download_link(self, obj):
+        if obj.status != 'completed' or not obj.file:
+            return '-'
+        return format_html('<a href="{}">Download</a>', reverse('admin:reports_exportjob_download', args=[obj.id]))
+    download_link.short_description = 'Download'
+    
+    def get_urls(self):
+        """Add a download URL that works with the admin session."""
+        urls = super().get_urls()
+        custom_urls = [
+            path(
+                '<int:job_id>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='reports_exportjob_download'
+            ),
+        ]
+        return custom_urls + urls
+    
+    def download_view(self, request, job_id):
+        """Serve the file written by a completed export job."""
+        job = get_object_or_404(ExportJob, id=job_id)
+        if not self.has_view_permission(request, job) or job.status != 'completed' or not job.file:
+            raise Http404("Export file not available")
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=os.path.basename(job.file.name))
+    
+    def delete_model(self, request, obj):
+        if obj.file:
+            obj.file.delete(save=False)
+        super().delete_model(request, obj)
+    
+    def delete_queryset(self, request, queryset):
+        for job in queryset.exclude(file=''):
+            job.file.delete(save=False)
+        super().delete_queryset(request, queryset)
@@ -0,0 +1,271 @@
+"""
+Report export definitions, shared by the streaming CSV downloads and the
+background export jobs.
+Every export is a values_list projection read in keyset-paginated chunks, so
+neither path holds more than one chunk of rows in memory or keeps a
+server-side cursor open (PgBouncer in transaction mode can't hold one across
+a streamed response). CSV output keeps the formatting of the original
+downloads; Parquet output keeps the raw typed values (pyarrow is only imported
+when a Parquet file is written).
+"""
+
+import csv
+import gzip
+import io
+from collections import namedtuple
+from importlib.util import find_spec
+
+from django.db.models import Q
+
+from apps.cases.models import Case
+from apps.products.models import RegulatedProduct
+from apps.violations.models import Violation, ViolationCheckReport
+
+# Rows fetched per database round trip (and per Parquet row group)
+EXPORT_CHUNK_SIZE = 2000
+
+# columns: (header, value kind) pairs; fields: the values_list projection, in column order;
+# date_field: field the date_from/date_to filters apply to; csv_row: raw row -> CSV cells
+ExportType = namedtuple('ExportType', ['columns', 'fields', 'queryset', 'date_field', 'csv_row'])
+
+
+def format_datetime(value):
+    return value.strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def violations_queryset():
+    return Violation.objects.annotate(
+        price_difference=Violation.price_difference_expression(),
+        percentage_over=Violation.percentage_over_expression()
+    )
+
+
+def violation_csv_row(row):
+    (violation_id, product_name, marketplace, listed_price, gov_price, difference, percentage,
+     violation_type, severity, penalty, violation_status, confirmed_by, created_at) = row
+    return [
+        violation_id, product_name, marketplace, listed_price, gov_price,
+        difference, f"{percentage or 0:.2f}%" if difference is not None else '',
+        violation_type, severity, penalty, violation_status,
+        confirmed_by or '', format_datetime(created_at)
+    ]
+
+
+def case_csv_row(row):
+    (case_id, product_name, investigator, case_status, final_penalty,
+     resolution_notes, created_at, closed_at) = row
+    return [
+        case_id, product_name, investigator, case_status, final_penalty or '',
+        resolution_notes, format_datetime(created_at), format_datetime(closed_at)
+    ]
+
+
+def product_csv_row(row):
+    return list(row[:-1]) + [format_datetime(row[-1])]
+
+
+COMPLIANCE_STATUS_LABELS = dict(ViolationCheckReport.COMPLIANCE_STATUS_CHOICES)
+SEVERITY_LABELS = dict(Violation.SEVERITY_CHOICES)
+
+
+def check_report_csv_row(row):
+    (product_name, marketplace, regulated_name, compliance_status, scraped_price, regulated_price,
+     price_difference, percentage_difference, severity, penalty, check_date, notes) = row
+    return [
+        product_name,
+        marketplace,
+        regulated_name or 'No Match',
+        COMPLIANCE_STATUS_LABELS.get(compliance_status, compliance_status),
+        scraped_price,
+        regulated_price or 'N/A',
+        price_difference or 'N/A',
+        f"{percentage_difference}%" if percentage_difference else 'N/A',
+        SEVERITY_LABELS.get(severity, severity) if severity else 'N/A',
+        penalty or 'N/A',
+        format_datetime(check_date),
+        notes
+    ]
+
+
+EXPORT_TYPES = {
+    'violations': ExportType(
+        columns=[
+            ('ID', 'int'), ('Product Name', 'str'), ('Marketplace', 'str'), ('Listed Price', 'decimal'),
+            ('Government Price', 'decimal'), ('Price Difference', 'decimal'), ('Percentage Over', 'float'),
+            ('Violation Type', 'str'), ('Severity', 'str'), ('Proposed Penalty', 'decimal'),
+            ('Status', 'str'), ('Confirmed By', 'str'), ('Created At', 'datetime'),
+        ],
+        fields=[
+            'id', 'regulated_product__name', 'scraped_product__marketplace',
+            'scraped_product__listed_price', 'regulated_product__gov_price',
+            'price_difference', 'percentage_over', 'violation_type', 'severity',
+            'proposed_penalty', 'status', 'confirmed_by__name', 'created_at',
+        ],
+        queryset=violations_queryset,
+        date_field='created_at',
+        csv_row=violation_csv_row,
+    ),
+    'cases': ExportType(
+        columns=[
+            ('Case ID', 'int'), ('Product Name', 'str'), ('Investigator', 'str'), ('Status', 'str'),
+            ('Final Penalty', 'decimal'), ('Resolution Notes', 'str'), ('Created At', 'datetime'),
+            ('Closed At', 'datetime'),
+        ],
+        fields=[
+            'id', 'violation__regulated_product__name', 'investigator__name', 'status',
+            'final_penalty', 'resolution_notes', 'created_at', 'closed_at',
+        ],
+        queryset=Case.objects.all,
+        date_field='created_at',
+        csv_row=case_csv_row,
+    ),
+    'products': ExportType(
+        columns=[
+            ('ID', 'int'), ('Name', 'str'), ('Category', 'str'), ('Government Price', 'decimal'),
+            ('Unit', 'str'), ('Description', 'str'), ('Is Active', 'bool'), ('Created At', 'datetime'),
+        ],
+        fields=['id', 'name', 'category', 'gov_price', 'unit', 'description', 'is_active', 'created_at'],
+        queryset=RegulatedProduct.objects.all,
+        date_field='created_at',
+        csv_row=product_csv_row,
+    ),
+    'check_reports': ExportType(
+        columns=[
+            ('Scraped Product', 'str'), ('Marketplace', 'str'), ('Regulated Product', 'str'),
+            ('Compliance Status', 'str'), ('Scraped Price', 'decimal'), ('Regulated Price', 'decimal'),
+            ('Price Difference', 'decimal'), ('Percentage Difference', 'decimal'),
+            ('Violation Severity', 'str'), ('Proposed Penalty', 'decimal'), ('Check Date', 'datetime'),
+            ('Notes', 'str'),
+        ],
+        fields=[
+            'scraped_product__product_name', 'scraped_product__marketplace', 'regulated_product__name',
+            'compliance_status', 'scraped_product__listed_price', 'regulated_product__gov_price',
+            'price_difference', 'percentage_difference', 'violation_severity', 'proposed_penalty',
+            'check_date', 'notes',
+        ],
+        queryset=ViolationCheckReport.objects.all,
+        date_field='check_date',
+        csv_row=check_report_csv_row,
+    ),
+}
+
+
+def export_queryset(export_type, filters=None):
+    """The values_list queryset for an export, newest first.
+
+    `filters` may hold 'date_from' / 'date_to' (ISO dates) and 'ids' (primary keys).
+    """
+    definition = EXPORT_TYPES[export_type]
+    filters = filters or {}
+    queryset = definition.queryset()
+
+    if filters.get('date_from'):
+        queryset = queryset.filter(**{f'{definition.date_field}__date__gte': filters['date_from']})
+    if filters.get('date_to'):
+        queryset = queryset.filter(**{f'{definition.date_field}__date__lte': filters['date_to']})
+    if filters.get('ids') is not None:
+        queryset = queryset.filter(pk__in=filters['ids'])
+
+    return queryset.values_list(*definition.fields).order_by(f'-{definition.date_field}', '-pk')
+
+
+def export_rows(export_type, filters=None):
+    """Iterate the raw rows of an export, newest first, one query per chunk.
+
+    Each chunk continues after the (date, pk) of the previous chunk's last row.
+    """
+    date_field = EXPORT_TYPES[export_type].date_field
+    keyed = export_queryset(export_type, filters).values_list(
+        *EXPORT_TYPES[export_type].fields, date_field, 'pk'
+    )
+
+    last = None
+    while True:
+        chunk = keyed
+        if last is not None:
+            last_date, last_pk = last
+            chunk = chunk.filter(
+                Q(**{f'{date_field}__lt': last_date}) | Q(**{date_field: last_date, 'pk__lt': last_pk})
+            )
+        rows = list(chunk[:EXPORT_CHUNK_SIZE])
+        for row in rows:
+            yield row[:-2]
+        if len(rows) < EXPORT_CHUNK_SIZE:
+            return
+        last = rows[-1][-2:]
+
+
+def export_header(export_type):
+    return [header for header, kind in EXPORT_TYPES[export_type].columns]
+
+
+def csv_lines(export_type, rows, writer):
+    """Yield the CSV header line and one line per row, as returned by writer.writerow()."""
+    csv_row = EXPORT_TYPES[export_type].csv_row
+    yield writer.writerow(export_header(export_type))
+    for row in rows:
+        yield writer.writerow(csv_row(row))
+
+
+def parquet_available():
+    """Whether pyarrow is installed, so Parquet exports can be written."""
+    return find_spec('pyarrow') is not None
+
+
+def write_csv_gz(export_type, rows, fileobj, progress=None):
+    """Write rows as gzip-compressed CSV to a binary file; returns the row count."""
+    count = 0
+    with gzip.GzipFile(fileobj=fileobj, mode='wb') as gz:
+        with io.TextIOWrapper(gz, encoding='utf-8', newline='') as text:
+            writer = csv.writer(text)
+            csv_row = EXPORT_TYPES[export_type].csv_row
+            writer.writerow(export_header(export_type))
+            for row in rows:
+                writer.writerow(csv_row(row))
+                count += 1
+                if progress and count % EXPORT_CHUNK_SIZE == 0:
+                    progress(count)
+    return count
+
+
+def write_parquet(export_type, rows, fileobj, progress=None):
+    """Write rows as a Parquet file, one row group per chunk; returns the row count."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    kinds = {
+        'int': pa.int64(),
+        'str': pa.string(),
+        'decimal': pa.decimal128(18, 4),
+        'float': pa.float64(),
+        'bool': pa.bool_(),
+        'datetime': pa.timestamp('us', tz='UTC'),
+    }
+    columns = EXPORT_TYPES[export_type].columns
+    schema = pa.schema([(header, kinds[kind]) for header, kind in columns])
+    converters = [float if kind == 'float' else None for header, kind in columns]
+
+    def write_batch(writer, batch):
+        arrays = []
+        for position, field in enumerate(schema):
+            values = [row[position] for row in batch]
+            if converters[position]:
+                values = [None if value is None else converters[position](value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    count = 0
+    batch = []
+    with pq.ParquetWriter(fileobj, schema, compression='snappy') as writer:
+        for row in rows:
+            batch.append(row)
+            if len(batch) == EXPORT_CHUNK_SIZE:
+                write_batch(writer, batch)
+                count += len(batch)
+                batch = []
+                if progress:
+                    progress(count)
+        if batch or not count:
+            write_batch(writer, batch)
+            count += len(batch)
+    return count
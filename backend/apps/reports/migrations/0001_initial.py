@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('export_type', models.CharField(choices=[('violations', 'Violations'), ('cases', 'Cases'), ('products', 'Regulated Products'), ('check_reports', 'Violation Check Reports')], max_length=20)),
+                ('format', models.CharField(choices=[('csv_gz', 'Compressed CSV (.csv.gz)'), ('parquet', 'Parquet')], default='csv_gz', max_length=10)),
+                ('filters', models.JSONField(blank=True, default=dict, help_text='date_from/date_to (ISO dates) and ids')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('file', models.FileField(blank=True, upload_to='exports/')),
+                ('rows_total', models.PositiveIntegerField(default=0)),
+                ('rows_written', models.PositiveIntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+                ('task_id', models.CharField(blank=True, help_text='Celery task ID', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1 +1,53 @@
-# No models needed for reports app - it generates reports from other models
+from django.db import models
+
+
+class ExportJob(models.Model):
+    """Report export written to media storage by a Celery task."""
+    
+    EXPORT_TYPE_CHOICES = [
+        ('violations', 'Violations'),
+        ('cases', 'Cases'),
+        ('products', 'Regulated Products'),
+        ('check_reports', 'Violation Check Reports'),
+    ]
+    
+    FORMAT_CHOICES = [
+        ('csv_gz', 'Compressed CSV (.csv.gz)'),
+        ('parquet', 'Parquet'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    export_type = models.CharField(max_length=20, choices=EXPORT_TYPE_CHOICES)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='csv_gz')
+    filters = models.JSONField(default=dict, blank=True, help_text="date_from/date_to (ISO dates) and ids")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to='exports/', blank=True)
+    rows_total = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    task_id = models.CharField(max_length=255, blank=True, help_text="Celery task ID")
+    created_by = models.ForeignKey('accounts.User', on_delete=models.CASCADE, related_name='export_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.get_export_type_display()} export ({self.format}) - {self.status}"
+    
+    @property
+    def progress(self):
+        """Percentage of rows written so far."""
+        if self.status == 'completed':
+            return 100
+        if self.rows_total == 0:
+            return 0
+        return min(100, round((self.rows_written / self.rows_total) * 100))
@@ -1,5 +1,9 @@
+from django.urls import reverse
 from rest_framework import serializers
 
+from .exports import parquet_available
+from .models import ExportJob
+
 
 class ReportSummarySerializer(serializers.Serializer):
     """Serializer for report summary data."""
@@ -12,3 +16,57 @@ class ReportSummarySerializer(serializers.Serializer):
     violations_by_status = serializers.DictField()
     cases_by_status = serializers.DictField()
     recent_activity = serializers.DictField()
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Serializer for ExportJob model."""
+    
+    created_by_name = serializers.CharField(source='created_by.name', read_only=True)
+    progress = serializers.ReadOnlyField()
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'export_type', 'format', 'filters', 'status', 'progress',
+            'rows_total', 'rows_written', 'error_message', 'download_url',
+            'created_by_name', 'created_at', 'started_at', 'completed_at'
+        ]
+        read_only_fields = fields
+    
+    def get_download_url(self, obj):
+        if obj.status != 'completed' or not obj.file:
+            return None
+        url = reverse('export_job_download', args=[obj.id])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class ExportJobCreateSerializer(serializers.ModelSerializer):
+    """Serializer for creating ExportJob."""
+    
+    date_from = serializers.DateField(required=False, write_only=True)
+    date_to = serializers.DateField(required=False, write_only=True)
+    
+    class Meta:
+        model = ExportJob
+        fields = ['id', 'export_type', 'format', 'date_from', 'date_to']
+        read_only_fields = ['id']
+    
+    def validate_format(self, value):
+        if value == 'parquet' and not parquet_available():
+            raise serializers.ValidationError("Parquet exports are not available on this server.")
+        return value
+    
+    def validate(self, attrs):
+        date_from = attrs.pop('date_from', None)
+        date_to = attrs.pop('date_to', None)
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError("date_from must be before date_to.")
+        
+        attrs['filters'] = {
+            key: value.isoformat()
+            for key, value in (('date_from', date_from), ('date_to', date_to))
+            if value
+        }
+        return attrs
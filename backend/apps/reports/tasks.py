@@ -0,0 +1,67 @@
+from celery import shared_task
+from django.core.files import File
+from django.utils import timezone
+from .models import ExportJob
+from .exports import export_queryset, export_rows, write_csv_gz, write_parquet
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+EXPORT_WRITERS = {
+    'csv_gz': (write_csv_gz, 'csv.gz'),
+    'parquet': (write_parquet, 'parquet'),
+}
+
+
+@shared_task(bind=True)
+def run_export_job(self, job_id):
+    """Celery task to write an export job's file to media storage.
+
+    Rows are streamed from the database in chunks into a temporary file, which
+    is then saved through the default storage; progress is recorded on the job
+    after every chunk so clients can poll it.
+    """
+
+    try:
+        job = ExportJob.objects.get(id=job_id)
+    except ExportJob.DoesNotExist:
+        logger.error(f"Celery: ExportJob with id {job_id} not found")
+        return "Job not found"
+
+    try:
+        queryset = export_queryset(job.export_type, job.filters)
+
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.task_id = self.request.id or ''
+        job.rows_total = queryset.count()
+        job.rows_written = 0
+        job.save(update_fields=['status', 'started_at', 'task_id', 'rows_total', 'rows_written'])
+
+        def progress(rows_written):
+            ExportJob.objects.filter(id=job.id).update(rows_written=rows_written)
+
+        writer, extension = EXPORT_WRITERS[job.format]
+        with tempfile.TemporaryFile() as tmp:
+            rows_written = writer(job.export_type, export_rows(job.export_type, job.filters), tmp, progress)
+            tmp.seek(0)
+            filename = f"{job.export_type}_{job.created_at.strftime('%Y%m%d_%H%M%S')}_{job.id}.{extension}"
+            job.file.save(filename, File(tmp), save=False)
+
+        job.status = 'completed'
+        job.rows_written = rows_written
+        job.completed_at = timezone.now()
+        job.save(update_fields=['file', 'status', 'rows_written', 'completed_at'])
+
+        logger.info(f"Export job {job.id} wrote {rows_written} {job.export_type} rows to {job.file.name}")
+        return f"Exported {rows_written} rows"
+
+    except Exception as e:
+        logger.error(f"Celery: Export job {job_id} failed: {str(e)}")
+        ExportJob.objects.filter(id=job_id).update(
+            status='failed',
+            error_message=str(e),
+            completed_at=timezone.now()
+        )
+        raise
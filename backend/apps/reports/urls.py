@@ -1,8 +1,16 @@
 from django.urls import path
-from .views import summary_report_view, export_csv_view, dashboard_metrics_view
+from .views import (
+    summary_report_view, export_csv_view, dashboard_metrics_view,
+    ExportJobListCreateView, ExportJobDetailView, export_job_download_view
+)
 
 urlpatterns = [
     path('summary/', summary_report_view, name='report_summary'),
     path('export/', export_csv_view, name='export_csv'),
     path('dashboard-metrics/', dashboard_metrics_view, name='dashboard_metrics'),
+    
+    # Background exports
+    path('export-jobs/', ExportJobListCreateView.as_view(), name='export_jobs'),
+    path('export-jobs/<int:pk>/', ExportJobDetailView.as_view(), name='export_job_detail'),
+    path('export-jobs/<int:pk>/download/', export_job_download_view, name='export_job_download'),
 ]
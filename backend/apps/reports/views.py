@@ -1,19 +1,30 @@
-from rest_framework import permissions, status
+from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
+from django.shortcuts import get_object_or_404
 from django.db.models import Count, Sum, Q
+from django.db.models.functions import TruncDay, TruncHour, TruncWeek
 from django.utils import timezone
-from django.http import HttpResponse
+from django.http import FileResponse, StreamingHttpResponse
 from datetime import datetime, timedelta
 import csv
 import io
+import os
 
 from apps.products.models import RegulatedProduct
 from apps.violations.models import Violation
 from apps.cases.models import Case
 from apps.scraping.models import ScrapedProduct
+from price_monitoring.conditional import conditional_response
+from price_monitoring.query_budget import query_budget
+from .exports import csv_lines, export_rows
+from .models import ExportJob
+from .serializers import ExportJobSerializer, ExportJobCreateSerializer
+from .tasks import run_export_job
 
 
+@query_budget(11)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def summary_report_view(request):
@@ -30,6 +41,18 @@ def summary_report_view(request):
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
     
+    # Cache each date range for a minute, refreshed by one request at a time;
+    # clients holding the current ETag get a 304 until any reported data changes
+    cache_key = f"summary_report:{date_from or ''}:{date_to or ''}"
+    return conditional_response(
+        request, cache_key, ['products', 'violations', 'cases', 'scraping'],
+        lambda: compute_summary_report(date_from, date_to), timeout=60
+    )
+
+
+def compute_summary_report(date_from=None, date_to=None):
+    """Aggregate the summary report for an optional date range."""
+    
     # Base querysets
     products_qs = RegulatedProduct.objects.filter(is_active=True)
     violations_qs = Violation.objects.all()
@@ -88,7 +111,7 @@ def summary_report_view(request):
         'scraped_products': recent_scraped
     }
     
-    return Response({
+    return {
         'total_products': total_products,
         'total_violations': total_violations,
         'total_cases': total_cases,
@@ -97,7 +120,7 @@ def summary_report_view(request):
         'violations_by_status': violations_by_status,
         'cases_by_status': cases_by_status,
         'recent_activity': recent_activity
-    })
+    }
 
 
 @api_view(['GET'])
@@ -113,116 +136,87 @@ def export_csv_view(request):
     
     export_type = request.GET.get('type', 'violations')
     
-    if export_type == 'violations':
-        return export_violations_csv()
-    elif export_type == 'cases':
-        return export_cases_csv()
-    elif export_type == 'products':
-        return export_products_csv()
-    else:
+    if export_type not in STREAMED_EXPORT_TYPES:
         return Response(
             {'error': 'Invalid export type'},
             status=status.HTTP_400_BAD_REQUEST
         )
+    
+    return stream_csv(export_type)
 
 
-def export_violations_csv():
-    """Export violations data as CSV."""
-    
-    violations = Violation.objects.select_related(
-        'regulated_product', 'scraped_product', 'confirmed_by'
-    ).all()
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="violations_{datetime.now().strftime("%Y%m%d")}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'ID', 'Product Name', 'Marketplace', 'Listed Price', 'Government Price',
-        'Price Difference', 'Percentage Over', 'Violation Type', 'Severity',
-        'Proposed Penalty', 'Status', 'Confirmed By', 'Created At'
-    ])
-    
-    for violation in violations:
-        writer.writerow([
-            violation.id,
-            violation.regulated_product.name,
-            violation.scraped_product.marketplace,
-            violation.scraped_product.listed_price,
-            violation.regulated_product.gov_price,
-            violation.price_difference,
-            f"{violation.percentage_over:.2f}%",
-            violation.violation_type,
-            violation.severity,
-            violation.proposed_penalty,
-            violation.status,
-            violation.confirmed_by.name if violation.confirmed_by else '',
-            violation.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        ])
-    
-    return response
+# Export types available as direct downloads; everything else goes through export jobs
+STREAMED_EXPORT_TYPES = ('violations', 'cases', 'products')
 
 
-def export_cases_csv():
-    """Export cases data as CSV."""
-    
-    cases = Case.objects.select_related(
-        'violation__regulated_product', 'investigator'
-    ).all()
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="cases_{datetime.now().strftime("%Y%m%d")}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'Case ID', 'Product Name', 'Investigator', 'Status', 'Final Penalty',
-        'Resolution Notes', 'Created At', 'Closed At'
-    ])
-    
-    for case in cases:
-        writer.writerow([
-            case.id,
-            case.violation.regulated_product.name,
-            case.investigator.name,
-            case.status,
-            case.final_penalty or '',
-            case.resolution_notes,
-            case.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            case.closed_at.strftime('%Y-%m-%d %H:%M:%S') if case.closed_at else ''
-        ])
+class Echo:
+    """File-like object whose write() just returns the line, for streaming csv.writer output."""
     
+    def write(self, value):
+        return value
+
+
+def stream_csv(export_type):
+    """Stream an export to the client as CSV without building the file in memory."""
+    lines = csv_lines(export_type, export_rows(export_type), csv.writer(Echo()))
+    response = StreamingHttpResponse(lines, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{export_type}_{datetime.now().strftime("%Y%m%d")}.csv"'
     return response
 
 
-def export_products_csv():
-    """Export regulated products data as CSV."""
-    
-    products = RegulatedProduct.objects.all()
-    
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="products_{datetime.now().strftime("%Y%m%d")}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow([
-        'ID', 'Name', 'Category', 'Government Price', 'Unit', 'Description',
-        'Is Active', 'Created At'
-    ])
-    
-    for product in products:
-        writer.writerow([
-            product.id,
-            product.name,
-            product.category,
-            product.gov_price,
-            product.unit,
-            product.description,
-            product.is_active,
-            product.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        ])
+TIMELINE_GRANULARITIES = {
+    'hour': (TruncHour, timedelta(hours=1)),
+    'day': (TruncDay, timedelta(days=1)),
+    'week': (TruncWeek, timedelta(weeks=1)),
+}
+
+# Longest range (in days) each granularity may cover
+TIMELINE_MAX_DAYS = {
+    'hour': 31,
+    'day': 365,
+    'week': 365,
+}
+
+
+def timeline_bucket_start(moment, granularity):
+    """Start of the hour/day/week bucket containing `moment` (local time)."""
+    moment = timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+    if granularity == 'hour':
+        return moment
+    moment = moment.replace(hour=0)
+    if granularity == 'week':
+        moment -= timedelta(days=moment.weekday())
+    return moment
+
+
+def build_violations_timeline(granularity='day', days=30):
+    """Violation counts per hour/day/week over the last `days` days, with empty buckets as zero."""
+    trunc, step = TIMELINE_GRANULARITIES[granularity]
+    now = timezone.now()
+    start = timeline_bucket_start(now - timedelta(days=days) + step, granularity)
+    
+    counts = {
+        timeline_bucket_start(row['bucket'], granularity): row['count']
+        for row in Violation.objects.filter(created_at__gte=start)
+        .annotate(bucket=trunc('created_at'))
+        .values('bucket')
+        .annotate(count=Count('id'))
+        .order_by()
+    }
     
-    return response
+    date_format = '%Y-%m-%dT%H:00' if granularity == 'hour' else '%Y-%m-%d'
+    timeline = []
+    bucket = start
+    while bucket <= now:
+        timeline.append({
+            'date': bucket.strftime(date_format),
+            'count': counts.get(bucket, 0)
+        })
+        bucket = timezone.localtime(bucket + step)
+    return timeline
 
 
+@query_budget(5)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def dashboard_metrics_view(request):
@@ -234,19 +228,26 @@ def dashboard_metrics_view(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    # Time series data for violations (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    violations_timeline = []
-    
-    for i in range(30):
-        date = thirty_days_ago + timedelta(days=i)
-        count = Violation.objects.filter(
-            created_at__date=date.date()
-        ).count()
-        violations_timeline.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'count': count
-        })
+    # Time series data for violations, one grouped query for the whole range
+    granularity = request.GET.get('granularity', 'day')
+    if granularity not in TIMELINE_GRANULARITIES:
+        return Response(
+            {'error': f"granularity must be one of: {', '.join(TIMELINE_GRANULARITIES)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        days = 0
+    max_days = TIMELINE_MAX_DAYS[granularity]
+    if not 1 <= days <= max_days:
+        return Response(
+            {'error': f"days must be between 1 and {max_days} for {granularity} granularity"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    violations_timeline = build_violations_timeline(granularity, days)
     
     # Top violating products
     top_violating_products = list(
@@ -275,3 +276,68 @@ def dashboard_metrics_view(request):
         'violations_by_marketplace': violations_by_marketplace,
         'avg_penalty_by_severity': avg_penalty_by_severity
     })
+
+
+class ExportJobListCreateView(generics.ListCreateAPIView):
+    """List export jobs and queue new ones."""
+    
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_serializer_class(self):
+        if self.request.method == 'POST':
+            return ExportJobCreateSerializer
+        return ExportJobSerializer
+    
+    def get_queryset(self):
+        return export_jobs_for(self.request.user)
+    
+    def perform_create(self, serializer):
+        # Only regulators and admins can export data
+        if not (self.request.user.is_regulator or self.request.user.is_admin):
+            raise PermissionDenied("Only regulators and admins can export data")
+        
+        job = serializer.save(created_by=self.request.user)
+        
+        # Start the export task
+        task = run_export_job.delay(job.id)
+        # A fast worker may already have updated the job, so don't save the whole row
+        ExportJob.objects.filter(id=job.id, task_id='').update(task_id=task.id)
+
+
+class ExportJobDetailView(generics.RetrieveDestroyAPIView):
+    """Poll an export job's progress, or delete it along with its file."""
+    
+    serializer_class = ExportJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        return export_jobs_for(self.request.user)
+    
+    def perform_destroy(self, instance):
+        if instance.file:
+            instance.file.delete(save=False)
+        instance.delete()
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_job_download_view(request, pk):
+    """Download the file written by a completed export job."""
+    
+    job = get_object_or_404(export_jobs_for(request.user), pk=pk)
+    
+    if job.status != 'completed' or not job.file:
+        return Response(
+            {'error': 'Export is not ready yet'},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    return FileResponse(job.file.open('rb'), as_attachment=True, filename=os.path.basename(job.file.name))
+
+
+def export_jobs_for(user):
+    """Export jobs a user may see: their own, or all of them for admins."""
+    queryset = ExportJob.objects.select_related('created_by')
+    if not user.is_admin:
+        queryset = queryset.filter(created_by=user)
+    return queryset
@@ -7,6 +7,7 @@ from django.utils.html import format_html
 from django.http import HttpResponseRedirect
 from .models import ScrapedProduct, ScrapingJob, ScrapingWebsite, ProductSearchList, ScrapingJobLog
 from .tasks import scrape_marketplace
+from apps.violations.counters import remove_scraped_products
 from celery import current_app
 import logging
 
@@ -35,7 +36,7 @@ class ScrapingJobLogInline(admin.TabularInline):
 
 @admin.register(ScrapingWebsite)
 class ScrapingWebsiteAdmin(admin.ModelAdmin):
-    list_display = ['name', 'base_url', 'is_active', 'rate_limit_delay', 'created_at']
+    list_display = ['name', 'base_url', 'is_active', 'rate_limit_delay', 'max_concurrency', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'base_url']
     readonly_fields = ['created_at', 'updated_at']
@@ -44,7 +45,10 @@ class ScrapingWebsiteAdmin(admin.ModelAdmin):
             'fields': ('name', 'base_url', 'is_active')
         }),
         ('Scraping Configuration', {
-            'fields': ('search_url_template', 'scraping_config', 'rate_limit_delay', 'headers')
+            'fields': (
+                'search_url_template', 'scraping_config', 'rate_limit_delay', 'max_concurrency',
+                'response_cache_ttl', 'headers'
+            )
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -194,7 +198,7 @@ class ScrapingJobAdmin(admin.ModelAdmin):
         cutoff_date = datetime.now() - timedelta(days=30)
         old_products = ScrapedProduct.objects.filter(scraped_at__lt=cutoff_date)
         products_count = old_products.count()
-        old_products.delete()
+        remove_scraped_products(old_products)
         
         self.message_user(request, f'Cleanup completed: {logs_count} old logs and {products_count} old products deleted.')
     cleanup_old_data.short_description = "Cleanup old data (logs >7 days, products >30 days)"
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ScrapingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.scraping'
+    
+    def ready(self):
+        """Import signal handlers when the app is ready."""
+        import apps.scraping.signals
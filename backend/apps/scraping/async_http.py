@@ -0,0 +1,110 @@
+"""
+Shared asyncio HTTP client for request-based scraping engines.
+One event loop thread per process owns a single HTTP/2 keep-alive client, so
+every engine, thread and job in a worker reuses the same connections. Each
+host gets its own in-flight limit, and every request is paced by the domain's
+shared DomainRateLimiter (the same Redis bucket the blocking engines use), so
+many concurrent searches stay polite to every site while hundreds are in
+flight across sites. Synchronous code submits coroutines with
+AsyncScrapingRunner.run().
+
+httpx is optional: without it get_scraping_engine keeps using the blocking
+requests-based engines.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from importlib.util import find_spec
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def async_http_available():
+    """Whether httpx is installed, so the async engine can be used."""
+    return find_spec('httpx') is not None
+
+
+class AsyncScrapingRunner:
+    """Event loop thread owning the shared HTTP client and the per-host in-flight limits."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.client = None
+        self._host_slots = {}
+        self._thread = threading.Thread(target=self.loop.run_forever, name='scraping-async-http', daemon=True)
+        self._thread.start()
+
+    def run(self, coroutine, timeout=None):
+        """Run a coroutine on the runner's loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def get_client(self):
+        if self.client is None:
+            import httpx
+
+            self.client = httpx.AsyncClient(
+                http2=find_spec('h2') is not None,
+                timeout=httpx.Timeout(30.0, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=settings.SCRAPING_ASYNC_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.SCRAPING_ASYNC_MAX_CONNECTIONS,
+                ),
+                follow_redirects=True,
+            )
+        return self.client
+
+    def host_slots(self, host, max_in_flight):
+        """The semaphore limiting a host's requests in flight, created on first use."""
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(max(max_in_flight, 1))
+        return self._host_slots[host]
+
+    async def fetch(self, url, rate_limiter, headers=None, max_in_flight=1, retries=3):
+        """GET a page politely with retries; returns the response, or None when every attempt failed.
+
+        `rate_limiter` (a DomainRateLimiter) paces every attempt, retries
+        included, and is told about each response so it backs off on 429/503.
+        """
+        import httpx
+
+        client = self.get_client()
+        slots = self.host_slots(urlsplit(url).netloc, max_in_flight)
+
+        for attempt in range(retries):
+            try:
+                async with slots:
+                    await rate_limiter.acquire_async(url)
+                    response = await client.get(url, headers=headers)
+                await rate_limiter.record_response_async(
+                    url, response.status_code, response.headers.get('Retry-After')
+                )
+                # 304 answers a conditional request for a page the caller has cached
+                if response.status_code != 304:
+                    response.raise_for_status()
+                return response
+            except httpx.HTTPError as e:
+                logger.warning(f"Request failed (attempt {attempt + 1}): {e}")
+                if attempt == retries - 1:
+                    logger.error(f"All retry attempts failed for URL: {url}")
+                    return None
+        return None
+
+
+_runner = None
+_runner_pid = None
+_runner_lock = threading.Lock()
+
+
+def get_async_runner():
+    """Return this process's runner, starting it on first use (and again after a fork)."""
+    global _runner, _runner_pid
+    with _runner_lock:
+        if _runner is None or _runner_pid != os.getpid():
+            _runner = AsyncScrapingRunner()
+            _runner_pid = os.getpid()
+        return _runner
@@ -0,0 +1,131 @@
+"""
+Live scraping job events over Redis pub/sub.
+Tasks publish log lines, per-query counters and status changes to one channel
+per job; scraping_job_events_view relays them to browsers as server-sent
+events, so watching a job costs one snapshot query instead of a poll every
+few seconds.
+"""
+
+import json
+import logging
+import time
+
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'scraping_job_events:{}'
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+# Log lines included in the snapshot a viewer gets on connecting
+SNAPSHOT_LOGS = 50
+
+# After Redis fails, stop publishing for this long so tasks don't stall on every log line
+PUBLISH_BACKOFF = 30
+
+_client = None
+_publish_paused_until = 0
+
+
+def get_redis():
+    """The process-wide Redis client used to publish job events."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.JOB_EVENTS_REDIS_URL, socket_connect_timeout=1, socket_timeout=1
+        )
+    return _client
+
+
+def publish_job_event(job_id, event, data):
+    """Publish an event for a job's viewers; failures are logged and never raised."""
+    global _publish_paused_until
+    if time.monotonic() < _publish_paused_until:
+        return
+
+    payload = json.dumps({'event': event, 'data': data}, cls=DjangoJSONEncoder)
+    try:
+        get_redis().publish(CHANNEL.format(job_id), payload)
+    except redis.RedisError as e:
+        _publish_paused_until = time.monotonic() + PUBLISH_BACKOFF
+        logger.warning(f"Failed to publish events for job {job_id}, pausing for {PUBLISH_BACKOFF}s: {str(e)}")
+
+
+def job_status_data(job):
+    """The status event payload for a job."""
+    return {
+        'status': job.status,
+        'products_scraped': job.products_scraped,
+        'products_found': job.products_found,
+        'errors_count': job.errors_count,
+        'current_progress': job.current_progress,
+        'error_message': job.error_message,
+        'started_at': job.started_at,
+        'completed_at': job.completed_at,
+    }
+
+
+def load_job_snapshot(job_id):
+    """A job's current state and latest log lines, sent when a viewer connects."""
+    from .models import ScrapingJob, ScrapingJobLog
+
+    job = ScrapingJob.objects.get(id=job_id)
+    logs = ScrapingJobLog.objects.filter(job_id=job_id).order_by('-timestamp').values(
+        'level', 'message', 'timestamp'
+    )[:SNAPSHOT_LOGS]
+    return {'id': job.id, 'name': job.name, **job_status_data(job), 'logs': list(reversed(logs))}
+
+
+def format_event(event, data):
+    """One server-sent event message."""
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+def format_retry(milliseconds):
+    """Tell EventSource clients how long to wait before reconnecting."""
+    return f"retry: {milliseconds}\n\n"
+
+
+async def job_event_stream(job_id, load_snapshot):
+    """Yield a job's snapshot and then its published events as server-sent events.
+
+    Subscribes before awaiting load_snapshot() so nothing published in between
+    is lost. Ends when the job reaches a terminal status or after
+    JOB_EVENTS_MAX_STREAM_SECONDS; clients then reconnect on their own.
+    """
+    import redis.asyncio as aioredis
+
+    heartbeat = settings.JOB_EVENTS_HEARTBEAT
+    deadline = time.monotonic() + settings.JOB_EVENTS_MAX_STREAM_SECONDS
+
+    client = aioredis.Redis.from_url(settings.JOB_EVENTS_REDIS_URL)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(CHANNEL.format(job_id))
+
+        snapshot = await load_snapshot()
+        yield format_retry(settings.JOB_EVENTS_RETRY_MS)
+        yield format_event('snapshot', snapshot)
+        if snapshot['status'] in TERMINAL_STATUSES:
+            return
+
+        last_sent = time.monotonic()
+        while time.monotonic() < deadline:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=heartbeat)
+            if message is None:
+                if time.monotonic() - last_sent >= heartbeat:
+                    # Comment line: keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    last_sent = time.monotonic()
+                continue
+
+            payload = json.loads(message['data'])
+            yield format_event(payload['event'], payload['data'])
+            last_sent = time.monotonic()
+            if payload['event'] == 'status' and payload['data']['status'] in TERMINAL_STATUSES:
+                return
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
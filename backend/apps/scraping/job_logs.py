@@ -0,0 +1,142 @@
+"""
+Buffered writer for scraping job logs.
+Collects ScrapingJobLog entries in memory and saves them in batches instead of
+one INSERT plus one job UPDATE per message. A background thread flushes
+writers on a timer, so entries still reach the database while a long search
+blocks the task, and current_progress is written at most once per
+progress_interval however many batches are flushed.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import ScrapingJob, ScrapingJobLog
+
+logger = logging.getLogger(__name__)
+
+# How often the background thread looks for writers with due entries
+FLUSH_TICK = 1.0
+
+
+class JobLogWriter:
+    """Buffer log entries for one job and flush them with bulk_create.
+
+    A flush happens once `batch_size` entries are waiting or `flush_interval`
+    seconds have passed since the previous flush. current_progress is updated
+    with the newest message at most once per `progress_interval` seconds (and
+    always on the final flush).
+    """
+
+    def __init__(self, job_id, batch_size=50, flush_interval=2.0, progress_interval=2.0):
+        self.job_id = job_id
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.progress_interval = progress_interval
+        self._buffer = []
+        self._progress = None
+        self._last_flush = time.monotonic()
+        self._last_progress = self._last_flush - progress_interval
+        self._lock = threading.Lock()
+
+    def write(self, level, message):
+        """Queue a log entry, flushing if the size or time threshold is reached."""
+        with self._lock:
+            self._buffer.append(ScrapingJobLog(
+                job_id=self.job_id,
+                level=level,
+                message=message,
+                timestamp=timezone.now()
+            ))
+            self._progress = message
+            due = (
+                len(self._buffer) >= self.batch_size or
+                time.monotonic() - self._last_flush >= self.flush_interval
+            )
+
+        if due:
+            self.flush()
+
+    def flush_if_due(self):
+        """Flush if entries have waited flush_interval or a progress update is due."""
+        now = time.monotonic()
+        with self._lock:
+            due = (
+                (self._buffer and now - self._last_flush >= self.flush_interval) or
+                (self._progress and now - self._last_progress >= self.progress_interval)
+            )
+
+        if due:
+            self.flush()
+
+    def flush(self, final=False):
+        """Save all queued entries, and the latest progress message if its interval has passed."""
+        now = time.monotonic()
+        with self._lock:
+            entries, self._buffer = self._buffer, []
+            self._last_flush = now
+
+            progress = None
+            if self._progress and (final or now - self._last_progress >= self.progress_interval):
+                progress, self._progress = self._progress, None
+                self._last_progress = now
+
+        try:
+            if entries:
+                ScrapingJobLog.objects.bulk_create(entries)
+            if progress:
+                ScrapingJob.objects.filter(pk=self.job_id).update(current_progress=progress)
+        except Exception as e:
+            logger.error(f"Failed to save {len(entries)} logs to database: {str(e)}")
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+_flusher_pid = None
+
+
+def flush_writers_forever():
+    """Background loop flushing every writer with due entries."""
+    while True:
+        time.sleep(FLUSH_TICK)
+        try:
+            close_old_connections()
+            with _writers_lock:
+                writers = list(_writers.values())
+            for writer in writers:
+                writer.flush_if_due()
+        except Exception as e:
+            logger.error(f"Job log flusher failed: {str(e)}")
+
+
+def start_flusher():
+    """Start this process's flusher thread (again after a fork). Call with _writers_lock held."""
+    global _flusher_pid
+    if _flusher_pid != os.getpid():
+        _flusher_pid = os.getpid()
+        threading.Thread(target=flush_writers_forever, name='scraping-job-logs', daemon=True).start()
+
+
+def get_job_log_writer(job_id):
+    """Return the process-wide log writer for a job, creating it if needed."""
+    with _writers_lock:
+        start_flusher()
+        writer = _writers.get(job_id)
+        if writer is None:
+            writer = _writers[job_id] = JobLogWriter(job_id)
+        return writer
+
+
+def close_job_log_writer(job_id):
+    """Flush and discard a job's log writer. Call when the job (or chunk) finishes or fails."""
+    with _writers_lock:
+        writer = _writers.pop(job_id, None)
+
+    if writer:
+        writer.flush(final=True)
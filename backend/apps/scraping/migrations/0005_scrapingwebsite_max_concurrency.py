@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:16
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0004_scrapingwebsite_fallback_to_selenium_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingwebsite',
+            name='max_concurrency',
+            field=models.PositiveIntegerField(default=1, help_text='Number of search queries to run in parallel (requests still respect rate_limit_delay)', validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:19
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0005_scrapingwebsite_max_concurrency'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scrapingjoblog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
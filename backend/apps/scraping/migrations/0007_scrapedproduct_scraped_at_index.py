@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0006_scrapingjoblog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scrapedproduct',
+            index=models.Index(fields=['scraped_at'], name='scraping_sc_scraped_def478_idx'),
+        ),
+    ]
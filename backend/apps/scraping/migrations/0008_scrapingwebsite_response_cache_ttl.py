@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0007_scrapedproduct_scraped_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingwebsite',
+            name='response_cache_ttl',
+            field=models.PositiveIntegerField(default=0, help_text='Seconds a fetched search page is reused without asking the site again (0 always revalidates)'),
+        ),
+    ]
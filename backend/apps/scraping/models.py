@@ -1,5 +1,6 @@
 from django.db import models
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 import json
 
 
@@ -12,7 +13,16 @@ class ScrapingWebsite(models.Model):
     is_active = models.BooleanField(default=True)
     scraping_config = models.JSONField(default=dict, help_text="CSS selectors and parsing rules")
     rate_limit_delay = models.FloatField(default=1.0, help_text="Delay between requests in seconds")
+    max_concurrency = models.PositiveIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        help_text="Number of search queries to run in parallel (requests still respect rate_limit_delay)"
+    )
     headers = models.JSONField(default=dict, help_text="Custom headers for requests")
+    response_cache_ttl = models.PositiveIntegerField(
+        default=0,
+        help_text="Seconds a fetched search page is reused without asking the site again (0 always revalidates)"
+    )
     
     # Selenium Configuration
     use_selenium = models.BooleanField(default=False, help_text="Use Selenium for scraping this website")
@@ -89,6 +99,7 @@ class ScrapedProduct(models.Model):
         indexes = [
             models.Index(fields=['marketplace', 'scraped_at']),
             models.Index(fields=['product_name', 'marketplace']),
+            models.Index(fields=['scraped_at']),
         ]
     
     def __str__(self):
@@ -145,7 +156,8 @@ class ScrapingJobLog(models.Model):
     job = models.ForeignKey(ScrapingJob, on_delete=models.CASCADE, related_name='logs')
     level = models.CharField(max_length=10, choices=LOG_LEVEL_CHOICES, default='info')
     message = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the message is logged, not when the buffered batch is saved
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     
     class Meta:
         ordering = ['-timestamp']
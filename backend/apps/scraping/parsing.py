@@ -0,0 +1,224 @@
+"""
+HTML parsing backends for request-based scraping engines.
+A PageExtractor compiles an engine's container and field selectors once and
+then pulls every field out of each product container in a single loop, using
+lxml (CSS compiled to XPath), selectolax or BeautifulSoup with precompiled
+soupsieve selectors. SCRAPING_HTML_PARSER picks the backend; a backend whose
+library is missing, or that can't compile a website's selectors, falls back to
+BeautifulSoup.
+"""
+
+import logging
+from collections import namedtuple
+from importlib.util import find_spec
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# selectors: CSS selectors tried in order, the first one matching wins;
+# attr: attribute to read (None reads the element's text);
+# many: return the values of every match of the first selector instead of one value
+FieldSpec = namedtuple('FieldSpec', ['selectors', 'attr', 'many'], defaults=(None, False))
+
+
+class LxmlBackend:
+    """lxml.html documents with CSS selectors compiled to XPath by cssselect."""
+
+    name = 'lxml'
+
+    @staticmethod
+    def available():
+        return find_spec('lxml') is not None and find_spec('cssselect') is not None
+
+    def __init__(self):
+        import lxml.html
+        from cssselect import HTMLTranslator
+        from lxml import etree
+
+        self._html = lxml.html
+        self._xpath = etree.XPath
+        self._translator = HTMLTranslator()
+
+    def compile(self, selector):
+        # CSSSelector matches descendant-or-self; like soupsieve's select(), only
+        # match below the node, so a field selector never returns its own container
+        return self._xpath(self._translator.css_to_xpath(selector, prefix='descendant::'))
+
+    def parse(self, content):
+        try:
+            # Most pages are UTF-8; decoding here keeps lxml from guessing latin-1
+            text = content.decode('utf-8') if isinstance(content, bytes) else content
+            return self._html.document_fromstring(text)
+        except UnicodeDecodeError:
+            return self._html.document_fromstring(content)
+        except ValueError:
+            # str input with an XML encoding declaration; let lxml decode the bytes itself
+            return self._html.document_fromstring(content.encode('utf-8') if isinstance(content, str) else content)
+
+    def select(self, node, compiled):
+        return compiled(node)
+
+    def select_first(self, node, compiled):
+        matches = compiled(node)
+        return matches[0] if matches else None
+
+    def text(self, node):
+        return node.text_content()
+
+    def attr(self, node, name):
+        return node.get(name)
+
+
+class SelectolaxBackend:
+    """selectolax (Lexbor) documents; selectors are parsed by the engine on each query."""
+
+    name = 'selectolax'
+
+    @staticmethod
+    def available():
+        return find_spec('selectolax') is not None
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+
+        self._parser = LexborHTMLParser
+
+    def compile(self, selector):
+        # Validate up front so a bad selector falls back like with the other backends
+        self._parser('<html></html>').css(selector)
+        return selector
+
+    def parse(self, content):
+        return self._parser(content)
+
+    def select(self, node, compiled):
+        # Lexbor also matches the node itself; keep to descendants like the other backends
+        node_id = getattr(node, 'mem_id', None)
+        return [match for match in node.css(compiled) if match.mem_id != node_id]
+
+    def select_first(self, node, compiled):
+        match = node.css_first(compiled)
+        if match is not None and match.mem_id == getattr(node, 'mem_id', None):
+            matches = self.select(node, compiled)
+            return matches[0] if matches else None
+        return match
+
+    def text(self, node):
+        return node.text(deep=True)
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+
+class SoupBackend:
+    """BeautifulSoup's html.parser with selectors precompiled by soupsieve."""
+
+    name = 'bs4'
+
+    @staticmethod
+    def available():
+        return True
+
+    def __init__(self):
+        import soupsieve
+        from bs4 import BeautifulSoup
+
+        self._soup = BeautifulSoup
+        self._soupsieve = soupsieve
+
+    def compile(self, selector):
+        return self._soupsieve.compile(selector)
+
+    def parse(self, content):
+        return self._soup(content, 'html.parser')
+
+    def select(self, node, compiled):
+        return compiled.select(node)
+
+    def select_first(self, node, compiled):
+        return compiled.select_one(node)
+
+    def text(self, node):
+        return node.get_text()
+
+    def attr(self, node, name):
+        return node.get(name)
+
+
+PARSER_BACKENDS = {
+    'lxml': LxmlBackend,
+    'selectolax': SelectolaxBackend,
+    'bs4': SoupBackend,
+}
+
+_backends = {}
+
+
+def get_parser_backend(name=None):
+    """The backend named `name` (default SCRAPING_HTML_PARSER), or BeautifulSoup if it isn't installed."""
+    name = name or getattr(settings, 'SCRAPING_HTML_PARSER', 'lxml')
+    backend_class = PARSER_BACKENDS.get(name, SoupBackend)
+    if not backend_class.available():
+        backend_class = SoupBackend
+
+    if backend_class.name not in _backends:
+        _backends[backend_class.name] = backend_class()
+    return _backends[backend_class.name]
+
+
+class PageExtractor:
+    """Compiled selectors for one kind of search results page.
+
+    `fields` maps output names to FieldSpecs. extract() returns one dict of raw
+    values (text, attribute or list of those; None when nothing matched) per
+    product container.
+    """
+
+    def __init__(self, container_selector, fields, backend=None):
+        self.backend = get_parser_backend(backend)
+        try:
+            self._compile(container_selector, fields)
+        except Exception as e:
+            if self.backend.name == SoupBackend.name:
+                raise
+            logger.warning(f"{self.backend.name} can't compile these selectors, using BeautifulSoup: {str(e)}")
+            self.backend = get_parser_backend(SoupBackend.name)
+            self._compile(container_selector, fields)
+
+    def _compile(self, container_selector, fields):
+        self.container = self.backend.compile(container_selector)
+        self.fields = [
+            (name, [self.backend.compile(selector) for selector in spec.selectors if selector], spec)
+            for name, spec in fields.items()
+        ]
+
+    def extract(self, content, max_results):
+        """Raw field values for up to `max_results` product containers on the page."""
+        backend = self.backend
+        try:
+            document = backend.parse(content)
+        except Exception as e:
+            logger.warning(f"Could not parse search page: {str(e)}")
+            return []
+
+        rows = []
+        for container in backend.select(document, self.container)[:max_results]:
+            row = {}
+            for name, compiled, spec in self.fields:
+                row[name] = self._field_value(container, compiled, spec)
+            rows.append(row)
+        return rows
+
+    def _field_value(self, container, compiled, spec):
+        backend = self.backend
+        read = backend.text if spec.attr is None else (lambda node: backend.attr(node, spec.attr))
+
+        if spec.many:
+            return [read(node) for node in backend.select(container, compiled[0])] if compiled else []
+
+        for selector in compiled:
+            node = backend.select_first(container, selector)
+            if node is not None:
+                return read(node)
+        return None
@@ -0,0 +1,279 @@
+"""
+Rate limiting helpers for scraping engines.
+Keeps concurrent workers scraping the same website within its politeness limit.
+
+DomainRateLimiter keeps one token bucket per domain in Redis, so every thread
+and Celery worker scraping a site shares it. The interval between requests
+adapts AIMD-style: a 429 or 503 doubles it (and Retry-After blocks the domain
+for as long as the site asks), each successful response adds back a little
+request rate until the website's rate_limit_delay is reached again. Without
+Redis the limiter falls back to an in-process TokenBucket per domain.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Response statuses asking us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+# After Redis fails, use the in-process buckets for this long before trying it again
+REDIS_BACKOFF = 30
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all workers scraping one website."""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_delay(cls, delay: float, capacity: float = 1) -> 'TokenBucket':
+        """Build a bucket that allows one request every `delay` seconds."""
+        rate = 1.0 / delay if delay and delay > 0 else 0
+        return cls(rate, capacity)
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold the next token back for at least `seconds`."""
+        if self.rate <= 0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+
+# KEYS[1]: domain state hash; ARGV: base interval, capacity, key TTL.
+# Reserves a token (the count may go negative) and returns how long the caller
+# must wait before using it, or "blocked:<seconds>" while a Retry-After holds.
+ACQUIRE_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated', 'interval', 'blocked_until')
+local base = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+
+local blocked_until = tonumber(state[4]) or 0
+if now < blocked_until then
+    return 'blocked:' .. tostring(blocked_until - now)
+end
+
+local interval = math.max(tonumber(state[3]) or base, base)
+if interval <= 0 then
+    return '0'
+end
+
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) / interval) - 1
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now), 'interval', tostring(interval))
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens * interval)
+"""
+
+# KEYS[1]: domain state hash; ARGV: throttled (0/1), Retry-After seconds (0 if none),
+# base interval, max interval, recovery rate, key TTL.
+# Throttled: double the interval and drop saved-up tokens; otherwise add the
+# recovery rate (requests/second) back until the base interval is reached.
+FEEDBACK_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local base = tonumber(ARGV[3])
+local interval = math.max(tonumber(redis.call('HGET', KEYS[1], 'interval')) or base, base)
+
+if ARGV[1] == '1' then
+    interval = math.min(math.max(interval * 2, 1), math.max(tonumber(ARGV[4]), base))
+    local tokens = math.min(tonumber(redis.call('HGET', KEYS[1], 'tokens')) or 0, 0)
+    redis.call('HSET', KEYS[1], 'interval', tostring(interval), 'tokens', tostring(tokens), 'updated', tostring(now))
+    local retry_after = tonumber(ARGV[2])
+    if retry_after > 0 then
+        redis.call('HSET', KEYS[1], 'blocked_until', tostring(now + retry_after))
+    end
+elseif interval > base then
+    interval = math.max(base, 1 / (1 / interval + tonumber(ARGV[5])))
+    redis.call('HSET', KEYS[1], 'interval', tostring(interval))
+end
+
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+return tostring(interval)
+"""
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def request_domain(url):
+    return urlsplit(url).netloc.lower()
+
+
+_redis_client = None
+_redis_paused_until = 0
+_scripts = {}
+
+_local_buckets = {}
+_local_buckets_lock = threading.Lock()
+
+
+def get_redis():
+    """The process-wide Redis client holding the shared domain buckets."""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.SCRAPING_RATE_LIMIT['REDIS_URL'], socket_connect_timeout=1, socket_timeout=1
+        )
+        _scripts['acquire'] = _redis_client.register_script(ACQUIRE_SCRIPT)
+        _scripts['feedback'] = _redis_client.register_script(FEEDBACK_SCRIPT)
+    return _redis_client
+
+
+def local_bucket(domain, delay):
+    """In-process bucket for a domain, used while Redis is unreachable."""
+    with _local_buckets_lock:
+        if domain not in _local_buckets:
+            _local_buckets[domain] = TokenBucket.from_delay(delay)
+        return _local_buckets[domain]
+
+
+class DomainRateLimiter:
+    """Adaptive per-domain token bucket shared through Redis by all workers.
+
+    `delay` is the website's rate_limit_delay: the fastest a domain is ever
+    requested. Call acquire(url) before each request and record_response()
+    with its outcome.
+    """
+
+    def __init__(self, delay: float = 1.0, capacity: float = 1):
+        self.delay = max(delay or 0, 0)
+        self.capacity = capacity
+        self.config = settings.SCRAPING_RATE_LIMIT
+
+    def acquire(self, url: str):
+        """Block until the URL's domain may be requested again."""
+        domain = request_domain(url)
+        while True:
+            result = self._reserve(domain)
+            if result is None:
+                local_bucket(domain, self.delay).acquire()
+                return
+
+            wait, blocked = result
+            if wait > 0:
+                time.sleep(wait)
+            if not blocked:
+                return
+
+    async def acquire_async(self, url: str):
+        """acquire() for coroutines: waits on the event loop, Redis and the fallback run in a thread."""
+        domain = request_domain(url)
+        while True:
+            result = await asyncio.to_thread(self._reserve, domain)
+            if result is None:
+                await asyncio.to_thread(local_bucket(domain, self.delay).acquire)
+                return
+
+            wait, blocked = result
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if not blocked:
+                return
+
+    def _reserve(self, domain):
+        """Reserve a token; returns (seconds to wait, blocked), or None without Redis.
+
+        `blocked` means a Retry-After is being waited out: after the wait the
+        caller reserves again and takes a token like everyone else.
+        """
+        result = self._call('acquire', domain, [self.delay, self.capacity, self.config['STATE_TTL']])
+        if result is None:
+            return None
+        if result.startswith('blocked:'):
+            return float(result.split(':', 1)[1]), True
+        return float(result), False
+
+    def record_response(self, url: str, status_code: int, retry_after=None):
+        """Adapt the domain's rate to a response: back off on 429/503, recover otherwise."""
+        domain = request_domain(url)
+        throttled = status_code in THROTTLE_STATUSES
+        wait = parse_retry_after(retry_after) if throttled else None
+        if wait is not None:
+            wait = min(wait, self.config['MAX_RETRY_AFTER'])
+
+        if throttled:
+            logger.warning(
+                f"{domain} answered {status_code}, backing off"
+                + (f" for {wait:.0f}s (Retry-After)" if wait else "")
+            )
+
+        result = self._call('feedback', domain, [
+            1 if throttled else 0, wait or 0, self.delay,
+            self.config['MAX_DELAY'], self.config['RECOVERY_RATE'], self.config['STATE_TTL']
+        ])
+        if result is None and throttled:
+            local_bucket(domain, self.delay).pause(wait or max(self.delay * 2, 1))
+
+    async def record_response_async(self, url: str, status_code: int, retry_after=None):
+        """record_response() for coroutines (the Redis call runs in a thread)."""
+        await asyncio.to_thread(self.record_response, url, status_code, retry_after)
+
+    def _call(self, script, domain, args):
+        """Run a limiter script for a domain; None when Redis is unavailable."""
+        global _redis_paused_until
+        if time.monotonic() < _redis_paused_until:
+            return None
+
+        try:
+            get_redis()
+            result = _scripts[script](keys=[f'scraping_rate:{domain}'], args=args)
+        except redis.RedisError as e:
+            _redis_paused_until = time.monotonic() + REDIS_BACKOFF
+            logger.warning(f"Rate limiter can't reach Redis, limiting in-process for {REDIS_BACKOFF}s: {str(e)}")
+            return None
+        return result.decode() if isinstance(result, bytes) else result
@@ -0,0 +1,111 @@
+"""
+Shared cache of fetched search pages, keyed by URL.
+Jobs that search the same products (hourly runs, overlapping search lists)
+reuse a page for the website's response_cache_ttl without touching the
+network. After that the page is kept for SCRAPING_RESPONSE_CACHE['MAX_STALE']
+seconds more, and the next fetch sends its ETag / Last-Modified so an
+unchanged page comes back as a body-less 304 instead of being downloaded.
+A fetched page is only held until the engine has parsed it, and is cached
+only if it had products in it, so bot-challenge and error pages never are.
+"""
+
+import hashlib
+import logging
+import time
+import zlib
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+KEY = 'scraping_response:{}'
+
+
+def cache_key(url):
+    return KEY.format(hashlib.sha256(url.encode()).hexdigest())
+
+
+class ResponseCache:
+    """Cached search pages for one website, fresh for `ttl` seconds."""
+
+    def __init__(self, ttl):
+        self.ttl = max(ttl or 0, 0)
+        self.max_stale = settings.SCRAPING_RESPONSE_CACHE['MAX_STALE']
+        self._held = {}
+
+    def get(self, url):
+        """The cached entry for a URL, or None."""
+        try:
+            return cache.get(cache_key(url))
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed for {url}: {str(e)}")
+            return None
+
+    def is_fresh(self, entry):
+        return time.time() - entry['fetched_at'] < self.ttl
+
+    def conditional_headers(self, entry):
+        """Revalidation headers for a stale entry."""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, content, headers, encoding=None):
+        """Cache a 200 response body with its validators."""
+        entry = {
+            'content': zlib.compress(content),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'encoding': encoding,
+            'fetched_at': time.time(),
+        }
+        self._save(url, entry)
+
+    def hold(self, url, content, headers, encoding=None):
+        """Keep a fetched 200 page until the engine has parsed it (see accept())."""
+        self._held[url] = (content, headers, encoding)
+
+    def accept(self, url, products):
+        """Cache the page held for a URL if the engine found products in it; forget it either way."""
+        held = self._held.pop(url, None)
+        if held and products:
+            self.store(url, *held)
+
+    def revalidated(self, url, entry, headers):
+        """The site answered 304: the entry is fresh again (with any updated validators)."""
+        entry = dict(entry, fetched_at=time.time())
+        entry['etag'] = headers.get('ETag') or entry.get('etag')
+        entry['last_modified'] = headers.get('Last-Modified') or entry.get('last_modified')
+        self._save(url, entry)
+        return entry
+
+    def content(self, entry):
+        return zlib.decompress(entry['content'])
+
+    def as_response(self, url, entry):
+        """A requests.Response serving a cached page, for code expecting make_request()'s result."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = self.content(entry)
+        response.encoding = entry.get('encoding')
+        response.headers = CaseInsensitiveDict(
+            {name: value for name, value in (('ETag', entry.get('etag')), ('Last-Modified', entry.get('last_modified'))) if value}
+        )
+        return response
+
+    def _save(self, url, entry):
+        # Pages without validators can't be revalidated, so keep them only while fresh
+        timeout = self.ttl + (self.max_stale if entry['etag'] or entry['last_modified'] else 0)
+        if not timeout:
+            return
+        try:
+            cache.set(cache_key(url), entry, timeout)
+        except Exception as e:
+            logger.warning(f"Response cache store failed for {url}: {str(e)}")
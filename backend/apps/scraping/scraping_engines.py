@@ -4,27 +4,24 @@ Each engine handles the specific structure and parsing logic for different e-com
 """
 
 import requests
-from bs4 import BeautifulSoup
+import asyncio
 import time
 import re
 import logging
 import os
-import random
 from urllib.parse import urljoin, quote_plus
 from decimal import Decimal, InvalidOperation
-from typing import Dict, List, Optional, Any
-from selenium import webdriver
+from typing import Dict, List, Optional, Any, Tuple
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.common.exceptions import TimeoutException, WebDriverException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
 from django.conf import settings
+from .async_http import async_http_available, get_async_runner
+from .parsing import FieldSpec, PageExtractor
+from .rate_limiting import DomainRateLimiter
+from .response_cache import ResponseCache
+from .webdriver_pool import get_webdriver_pool
 
 logger = logging.getLogger(__name__)
 
@@ -32,14 +29,31 @@ logger = logging.getLogger(__name__)
 class BaseScrapingEngine:
     """Base class for all scraping engines."""
     
-    def __init__(self, website_config: Dict[str, Any]):
+    # Search results page layout for request-based engines (see parsing.py)
+    container_selector = ''
+    fields = {}
+    
+    def __init__(self, website_config: Dict[str, Any], rate_limiter=None):
         self.config = website_config
+        self.rate_limiter = rate_limiter or DomainRateLimiter(website_config.get('rate_limit_delay', 1.0))
         self.session = requests.Session()
         self.session.headers.update(website_config.get('headers', {}))
+        self.response_cache = ResponseCache(website_config.get('response_cache_ttl', 0))
+        self._extractor = None
         
     def search_products(self, query: str, max_results: int = 20) -> List[Dict[str, Any]]:
         """Search for products on the website."""
         raise NotImplementedError
+    
+    def get_page_layout(self):
+        """(container selector, {field: FieldSpec}) describing this engine's search results pages."""
+        return self.container_selector, self.fields
+    
+    def extract_rows(self, content: bytes, max_results: int) -> List[Dict[str, Any]]:
+        """Raw field values per product container, with selectors compiled once per engine."""
+        if self._extractor is None:
+            self._extractor = PageExtractor(*self.get_page_layout())
+        return self._extractor.extract(content, max_results)
         
     def parse_price(self, price_text: str) -> Optional[float]:
         """Parse price from text and return as float (for better JSON serialization)."""
@@ -85,13 +99,35 @@ class BaseScrapingEngine:
         return re.sub(r'\s+', ' ', text.strip())
     
     def make_request(self, url: str, retries: int = 3) -> Optional[requests.Response]:
-        """Make HTTP request with retries and rate limiting."""
+        """Make HTTP request with retries and rate limiting.
+        
+        The domain's shared limiter paces every attempt, retries included, and
+        slows down when the site answers 429/503 (see rate_limiting.py). Pages
+        still fresh in the response cache are served without a request; stale
+        ones are revalidated with ETag / Last-Modified (see response_cache.py).
+        A fetched page is only cached once the caller passes the products it
+        parsed from it to response_cache.accept().
+        """
+        cached = self.response_cache.get(url)
+        if cached and self.response_cache.is_fresh(cached):
+            logger.info(f"Using cached page for URL: {url}")
+            return self.response_cache.as_response(url, cached)
+        
         for attempt in range(retries):
             try:
-                time.sleep(self.config.get('rate_limit_delay', 1.0))
+                self.rate_limiter.acquire(url)
                 
                 # Make request with proper encoding handling
-                response = self.session.get(url, timeout=30, stream=True)
+                response = self.session.get(
+                    url, timeout=30, stream=True, headers=self.response_cache.conditional_headers(cached)
+                )
+                self.rate_limiter.record_response(url, response.status_code, response.headers.get('Retry-After'))
+                
+                if response.status_code == 304 and cached:
+                    logger.info(f"Page not modified, using cached copy for URL: {url}")
+                    cached = self.response_cache.revalidated(url, cached, response.headers)
+                    return self.response_cache.as_response(url, cached)
+                
                 response.raise_for_status()
                 
                 # Ensure proper content encoding
@@ -108,6 +144,8 @@ class BaseScrapingEngine:
                 except:
                     pass
                 
+                if response.status_code == 200:
+                    self.response_cache.hold(url, response.content, response.headers, response.encoding)
                 return response
                 
             except requests.RequestException as e:
@@ -115,13 +153,22 @@ class BaseScrapingEngine:
                 if attempt == retries - 1:
                     logger.error(f"All retry attempts failed for URL: {url}")
                     return None
-                time.sleep(2 ** attempt)  # Exponential backoff
         return None
 
 
 class AmazonScrapingEngine(BaseScrapingEngine):
     """Scraping engine for Amazon."""
     
+    container_selector = 'div[data-component-type="s-search-result"]'
+    fields = {
+        'name': FieldSpec(('h2.a-size-mini', 'span.a-size-medium')),
+        'price': FieldSpec(('span.a-price-whole', 'span.a-offscreen')),
+        'url': FieldSpec(('h2.a-size-mini a', 'a.a-link-normal'), attr='href'),
+        'image_url': FieldSpec(('img.s-image',), attr='src'),
+        'rating': FieldSpec(('span.a-icon-alt',)),
+        'labels': FieldSpec(('span',), many=True),
+    }
+    
     def search_products(self, query: str, max_results: int = 20) -> List[Dict[str, Any]]:
         """Search for products on Amazon."""
         search_url = f"https://www.amazon.com/s?k={quote_plus(query)}"
@@ -130,66 +177,50 @@ class AmazonScrapingEngine(BaseScrapingEngine):
         if not response:
             return []
         
-        soup = BeautifulSoup(response.content, 'html.parser')
         products = []
         
-        # Amazon product containers
-        product_containers = soup.find_all('div', {'data-component-type': 's-search-result'})
-        
-        for container in product_containers[:max_results]:
+        for row in self.extract_rows(response.content, max_results):
             try:
-                product_data = self._parse_amazon_product(container)
+                product_data = self._parse_amazon_product(row)
                 if product_data:
                     products.append(product_data)
             except Exception as e:
                 logger.error(f"Error parsing Amazon product: {e}")
                 continue
         
+        self.response_cache.accept(search_url, products)
         return products
     
-    def _parse_amazon_product(self, container) -> Optional[Dict[str, Any]]:
+    def _parse_amazon_product(self, row) -> Optional[Dict[str, Any]]:
         """Parse individual Amazon product."""
         try:
             # Product name
-            name_elem = container.find('h2', class_='a-size-mini')
-            if not name_elem:
-                name_elem = container.find('span', class_='a-size-medium')
-            name = self.clean_text(name_elem.get_text()) if name_elem else ""
+            name = self.clean_text(row['name'] or "")
             
             if not name:
                 return None
             
             # Price
-            price_elem = container.find('span', class_='a-price-whole')
-            if not price_elem:
-                price_elem = container.find('span', class_='a-offscreen')
-            price_text = price_elem.get_text() if price_elem else ""
-            price = self.parse_price(price_text)
+            price = self.parse_price(row['price'] or "")
             
             if not price:
                 return None
             
             # URL
-            link_elem = container.find('h2', class_='a-size-mini').find('a') if container.find('h2', class_='a-size-mini') else None
-            if not link_elem:
-                link_elem = container.find('a', class_='a-link-normal')
-            url = urljoin("https://www.amazon.com", link_elem.get('href')) if link_elem else ""
+            url = urljoin("https://www.amazon.com", row['url']) if row['url'] else ""
             
             # Image
-            img_elem = container.find('img', class_='s-image')
-            image_url = img_elem.get('src') if img_elem else ""
+            image_url = row['image_url'] or ""
             
             # Rating
-            rating_elem = container.find('span', class_='a-icon-alt')
             rating = None
-            if rating_elem:
-                rating_text = rating_elem.get_text()
-                rating_match = re.search(r'(\d+\.?\d*)', rating_text)
+            if row['rating']:
+                rating_match = re.search(r'(\d+\.?\d*)', row['rating'])
                 if rating_match:
                     rating = float(rating_match.group(1))
             
             # Availability
-            availability = not bool(container.find('span', string=re.compile(r'Currently unavailable')))
+            availability = not any('Currently unavailable' in label for label in row['labels'])
             
             return {
                 'name': name,
@@ -209,6 +240,14 @@ class AmazonScrapingEngine(BaseScrapingEngine):
 class EbayScrapingEngine(BaseScrapingEngine):
     """Scraping engine for eBay."""
     
+    container_selector = 'div.s-item'
+    fields = {
+        'name': FieldSpec(('h3.s-item__title',)),
+        'price': FieldSpec(('span.s-item__price',)),
+        'url': FieldSpec(('a.s-item__link',), attr='href'),
+        'image_url': FieldSpec(('img.s-item__image',), attr='src'),
+    }
+    
     def search_products(self, query: str, max_results: int = 20) -> List[Dict[str, Any]]:
         """Search for products on eBay."""
         search_url = f"https://www.ebay.com/sch/i.html?_nkw={quote_plus(query)}"
@@ -217,48 +256,40 @@ class EbayScrapingEngine(BaseScrapingEngine):
         if not response:
             return []
         
-        soup = BeautifulSoup(response.content, 'html.parser')
         products = []
         
-        # eBay product containers
-        product_containers = soup.find_all('div', class_='s-item')
-        
-        for container in product_containers[:max_results]:
+        for row in self.extract_rows(response.content, max_results):
             try:
-                product_data = self._parse_ebay_product(container)
+                product_data = self._parse_ebay_product(row)
                 if product_data:
                     products.append(product_data)
             except Exception as e:
                 logger.error(f"Error parsing eBay product: {e}")
                 continue
         
+        self.response_cache.accept(search_url, products)
         return products
     
-    def _parse_ebay_product(self, container) -> Optional[Dict[str, Any]]:
+    def _parse_ebay_product(self, row) -> Optional[Dict[str, Any]]:
         """Parse individual eBay product."""
         try:
             # Product name
-            name_elem = container.find('h3', class_='s-item__title')
-            name = self.clean_text(name_elem.get_text()) if name_elem else ""
+            name = self.clean_text(row['name'] or "")
             
             if not name or "Shop on eBay" in name:
                 return None
             
             # Price
-            price_elem = container.find('span', class_='s-item__price')
-            price_text = price_elem.get_text() if price_elem else ""
-            price = self.parse_price(price_text)
+            price = self.parse_price(row['price'] or "")
             
             if not price:
                 return None
             
             # URL
-            link_elem = container.find('a', class_='s-item__link')
-            url = link_elem.get('href') if link_elem else ""
+            url = row['url'] or ""
             
             # Image
-            img_elem = container.find('img', class_='s-item__image')
-            image_url = img_elem.get('src') if img_elem else ""
+            image_url = row['image_url'] or ""
             
             # Availability (eBay items are generally available if listed)
             availability = True
@@ -280,6 +311,15 @@ class EbayScrapingEngine(BaseScrapingEngine):
 class WalmartScrapingEngine(BaseScrapingEngine):
     """Scraping engine for Walmart."""
     
+    container_selector = 'div[data-testid="item-stack"]'
+    fields = {
+        'name': FieldSpec(('span[data-automation-id="product-title"]',)),
+        'price': FieldSpec(('span[data-automation-id="product-price"]',)),
+        'url': FieldSpec(('a[data-automation-id="product-title"]',), attr='href'),
+        'image_url': FieldSpec(('img[data-testid="product-image"]',), attr='src'),
+        'labels': FieldSpec(('span',), many=True),
+    }
+    
     def search_products(self, query: str, max_results: int = 20) -> List[Dict[str, Any]]:
         """Search for products on Walmart."""
         search_url = f"https://www.walmart.com/search?q={quote_plus(query)}"
@@ -288,51 +328,43 @@ class WalmartScrapingEngine(BaseScrapingEngine):
         if not response:
             return []
         
-        soup = BeautifulSoup(response.content, 'html.parser')
         products = []
         
-        # Walmart product containers
-        product_containers = soup.find_all('div', {'data-testid': 'item-stack'})
-        
-        for container in product_containers[:max_results]:
+        for row in self.extract_rows(response.content, max_results):
             try:
-                product_data = self._parse_walmart_product(container)
+                product_data = self._parse_walmart_product(row)
                 if product_data:
                     products.append(product_data)
             except Exception as e:
                 logger.error(f"Error parsing Walmart product: {e}")
                 continue
         
+        self.response_cache.accept(search_url, products)
         return products
     
-    def _parse_walmart_product(self, container) -> Optional[Dict[str, Any]]:
+    def _parse_walmart_product(self, row) -> Optional[Dict[str, Any]]:
         """Parse individual Walmart product."""
         try:
             # Product name
-            name_elem = container.find('span', {'data-automation-id': 'product-title'})
-            name = self.clean_text(name_elem.get_text()) if name_elem else ""
+            name = self.clean_text(row['name'] or "")
             
             if not name:
                 return None
             
             # Price
-            price_elem = container.find('span', {'data-automation-id': 'product-price'})
-            price_text = price_elem.get_text() if price_elem else ""
-            price = self.parse_price(price_text)
+            price = self.parse_price(row['price'] or "")
             
             if not price:
                 return None
             
             # URL
-            link_elem = container.find('a', {'data-automation-id': 'product-title'})
-            url = urljoin("https://www.walmart.com", link_elem.get('href')) if link_elem else ""
+            url = urljoin("https://www.walmart.com", row['url']) if row['url'] else ""
             
             # Image
-            img_elem = container.find('img', {'data-testid': 'product-image'})
-            image_url = img_elem.get('src') if img_elem else ""
+            image_url = row['image_url'] or ""
             
             # Availability
-            availability = not bool(container.find('span', string=re.compile(r'Out of stock')))
+            availability = not any('Out of stock' in label for label in row['labels'])
             
             return {
                 'name': name,
@@ -353,87 +385,97 @@ class GenericScrapingEngine(BaseScrapingEngine):
     
     def search_products(self, query: str, max_results: int = 20) -> List[Dict[str, Any]]:
         """Search for products using custom configuration."""
+        search_url = self.build_search_url(query)
+        if not search_url:
+            return []
+        
+        response = self.make_request(search_url)
+        if not response:
+            return []
+        
+        products = self.parse_search_page(response.content, max_results)
+        self.response_cache.accept(search_url, products)
+        return products
+    
+    def build_search_url(self, query: str) -> Optional[str]:
+        """The search page URL for a query, or None when the website has no template."""
         config = self.config.get('scraping_config', {})
         # Check both top-level and nested search_url_template
         search_url_template = self.config.get('search_url_template') or config.get('search_url_template', '')
         
         if not search_url_template:
             logger.error("No search URL template configured")
-            return []
+            return None
         
         search_url = search_url_template.format(query=quote_plus(query))
-        logger.info(f"GenericScrapingEngine: Using search URL: {search_url}")
-        
-        response = self.make_request(search_url)
-        if not response:
-            return []
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
+        logger.info(f"{type(self).__name__}: Using search URL: {search_url}")
+        return search_url
+    
+    def get_page_layout(self):
+        """Container and field selectors from the website's scraping_config."""
+        config = self.config.get('scraping_config', {})
+        selectors = config.get('selectors', {})
+        
+        return config.get('product_container_selector', ''), {
+            'name': FieldSpec((selectors.get('name', ''),)),
+            'price': FieldSpec((selectors.get('price', ''),)),
+            'url': FieldSpec((selectors.get('url', ''),), attr='href'),
+            'image_url': FieldSpec((selectors.get('image', ''),), attr='src'),
+            'availability': FieldSpec((selectors.get('availability', ''),)),
+        }
+    
+    def parse_search_page(self, content: bytes, max_results: int) -> List[Dict[str, Any]]:
+        """Parse the products on a search results page."""
+        config = self.config.get('scraping_config', {})
         products = []
         
         # Get product containers using configured selector
-        container_selector = config.get('product_container_selector', '')
-        if not container_selector:
+        if not config.get('product_container_selector', ''):
             logger.error("No product container selector configured")
             return []
         
-        product_containers = soup.select(container_selector)
-        
-        for container in product_containers[:max_results]:
+        for row in self.extract_rows(content, max_results):
             try:
-                product_data = self._parse_generic_product(container, config)
+                product_data = self._parse_generic_product(row, config)
                 if product_data:
                     products.append(product_data)
             except Exception as e:
                 logger.error(f"Error parsing generic product: {e}")
                 continue
         
+        self.response_cache.accept(search_url, products)
         return products
     
-    def _parse_generic_product(self, container, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _parse_generic_product(self, row, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Parse individual product using custom selectors."""
         try:
-            selectors = config.get('selectors', {})
-            
             # Product name
-            name_selector = selectors.get('name', '')
-            name_elem = container.select_one(name_selector) if name_selector else None
-            name = self.clean_text(name_elem.get_text()) if name_elem else ""
+            name = self.clean_text(row['name'] or "")
             
             if not name:
                 return None
             
             # Price
-            price_selector = selectors.get('price', '')
-            price_elem = container.select_one(price_selector) if price_selector else None
-            price_text = price_elem.get_text() if price_elem else ""
-            price = self.parse_price(price_text)
+            price = self.parse_price(row['price'] or "")
             
             if not price:
                 return None
             
             # URL
-            url_selector = selectors.get('url', '')
-            url_elem = container.select_one(url_selector) if url_selector else None
-            url = url_elem.get('href') if url_elem else ""
+            url = row['url'] or ""
             if url and not url.startswith('http'):
                 url = urljoin(self.config.get('base_url', ''), url)
             
             # Image
-            image_selector = selectors.get('image', '')
-            img_elem = container.select_one(image_selector) if image_selector else None
-            image_url = img_elem.get('src') if img_elem else ""
+            image_url = row['image_url'] or ""
             if image_url and not image_url.startswith('http'):
                 image_url = urljoin(self.config.get('base_url', ''), image_url)
             
             # Availability
-            availability_selector = selectors.get('availability', '')
             availability = True
-            if availability_selector:
-                availability_elem = container.select_one(availability_selector)
-                if availability_elem:
-                    availability_text = availability_elem.get_text().lower()
-                    availability = 'out of stock' not in availability_text and 'unavailable' not in availability_text
+            if row['availability'] is not None:
+                availability_text = row['availability'].lower()
+                availability = 'out of stock' not in availability_text and 'unavailable' not in availability_text
             
             return {
                 'name': name,
@@ -449,125 +491,98 @@ class GenericScrapingEngine(BaseScrapingEngine):
             return None
 
 
+class AsyncHttpScrapingEngine(GenericScrapingEngine):
+    """Generic engine fetching pages through the shared asyncio HTTP client (see async_http.py).
+    
+    search_many() keeps a whole batch of searches in flight at once, limited
+    per host by the website's max_concurrency and paced by the engine's shared
+    DomainRateLimiter.
+    """
+    
+    def search_products(self, query: str, max_results: int = 20) -> List[Dict[str, Any]]:
+        """Search for products using custom configuration."""
+        return self.search_many([query], max_results)[0]
+    
+    def search_many(self, queries: List[str], max_results: int = 20) -> List[List[Dict[str, Any]]]:
+        """Search several queries concurrently; returns one product list per query, in order."""
+        results = []
+        # Parse here rather than on the event loop, which keeps serving other searches meanwhile
+        for url, content in self.fetch_pages(queries):
+            products = self.parse_search_page(content, max_results) if content else []
+            self.response_cache.accept(url, products)
+            results.append(products)
+        return results
+    
+    def fetch_pages(self, queries: List[str]) -> List[Tuple[Optional[str], Optional[bytes]]]:
+        """Fetch the search page of every query concurrently, as (url, content) pairs.
+        
+        content is None for pages that couldn't be fetched. Fetched pages are
+        held by the response cache until passed to response_cache.accept().
+        """
+        urls = [self.build_search_url(query) for query in queries]
+        cached = [self.response_cache.get(url) if url else None for url in urls]
+        
+        # Pages still fresh in the response cache don't go to the network at all
+        fetch_urls = [
+            None if entry and self.response_cache.is_fresh(entry) else url for url, entry in zip(urls, cached)
+        ]
+        responses = get_async_runner().run(self._fetch_all(fetch_urls, cached))
+        return [(url, self._page_content(url, entry, response)) for url, entry, response in zip(urls, cached, responses)]
+    
+    def _page_content(self, url, entry, response) -> Optional[bytes]:
+        """A search page's body from the response cache or its fetch; None when it couldn't be fetched."""
+        if response is None:
+            fresh = entry and self.response_cache.is_fresh(entry)
+            return self.response_cache.content(entry) if fresh else None
+        
+        if response.status_code == 304 and entry:
+            logger.info(f"Page not modified, using cached copy for URL: {url}")
+            return self.response_cache.content(self.response_cache.revalidated(url, entry, response.headers))
+        
+        if response.status_code == 200:
+            self.response_cache.hold(url, response.content, response.headers)
+        return response.content
+    
+    async def _fetch_all(self, urls, cached):
+        runner = get_async_runner()
+        
+        async def fetch(url, entry):
+            if not url:
+                return None
+            headers = {**(self.config.get('headers') or {}), **self.response_cache.conditional_headers(entry)}
+            return await runner.fetch(
+                url,
+                self.rate_limiter,
+                headers=headers or None,
+                max_in_flight=self.config.get('max_concurrency') or 1
+            )
+        
+        return await asyncio.gather(*(fetch(url, entry) for url, entry in zip(urls, cached)))
+
+
 class SeleniumScrapingEngine(BaseScrapingEngine):
     """Selenium-based scraping engine for websites with anti-scraping protection."""
     
-    def __init__(self, website_config: Dict[str, Any]):
-        super().__init__(website_config)
+    def __init__(self, website_config: Dict[str, Any], rate_limiter=None):
+        super().__init__(website_config, rate_limiter)
         self.driver = None
         self.selenium_config = getattr(settings, 'SELENIUM_CONFIG', {})
         self.wait = None
+        self._lease = None
         
     def _setup_driver(self):
-        """Setup and configure the WebDriver."""
+        """Lease a warm WebDriver from the process-wide pool (see webdriver_pool.py)."""
         try:
-            browser = self.selenium_config.get('BROWSER', 'chrome').lower()
-            
-            if browser == 'chrome':
-                self.driver = self._setup_chrome_driver()
-            elif browser == 'firefox':
-                self.driver = self._setup_firefox_driver()
-            else:
-                raise ValueError(f"Unsupported browser: {browser}")
-            
-            # Configure timeouts
-            self.driver.implicitly_wait(self.selenium_config.get('IMPLICIT_WAIT', 10))
-            self.driver.set_page_load_timeout(self.selenium_config.get('PAGE_LOAD_TIMEOUT', 30))
-            
-            # Set window size
-            window_size = self.selenium_config.get('WINDOW_SIZE', (1920, 1080))
-            self.driver.set_window_size(window_size[0], window_size[1])
+            self._lease = get_webdriver_pool().acquire(self.selenium_config.get('POOL_ACQUIRE_TIMEOUT', 120))
+            self.driver = self._lease.driver
             
             # Setup wait object
             self.wait = WebDriverWait(self.driver, self.selenium_config.get('IMPLICIT_WAIT', 10))
             
-            logger.info(f"Selenium WebDriver initialized successfully with {browser}")
-            
         except Exception as e:
             logger.error(f"Failed to setup WebDriver: {str(e)}")
             raise
     
-    def _setup_chrome_driver(self):
-        """Setup Chrome WebDriver with optimized options."""
-        options = ChromeOptions()
-        
-        # Basic options
-        if self.selenium_config.get('HEADLESS', True):
-            options.add_argument('--headless')
-        
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--disable-extensions')
-        options.add_argument('--disable-plugins')
-        if self.selenium_config.get('DISABLE_IMAGES', True):
-            options.add_argument('--disable-images')
-        if self.selenium_config.get('DISABLE_JS', False):
-            options.add_argument('--disable-javascript')
-        if self.selenium_config.get('DISABLE_CSS', False):
-            options.add_argument('--disable-css')
-        
-        # User agent
-        user_agent = self.selenium_config.get('USER_AGENT', '')
-        if user_agent:
-            options.add_argument(f'--user-agent={user_agent}')
-        
-        # Performance optimizations
-        options.add_argument('--disable-background-timer-throttling')
-        options.add_argument('--disable-backgrounding-occluded-windows')
-        options.add_argument('--disable-renderer-backgrounding')
-        options.add_argument('--disable-features=TranslateUI')
-        options.add_argument('--disable-ipc-flooding-protection')
-        
-        # Memory optimizations
-        options.add_argument('--memory-pressure-off')
-        options.add_argument('--max_old_space_size=4096')
-        
-        # Anti-detection measures
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        
-        # Setup service with correct architecture
-        try:
-            # Try to get the correct ChromeDriver for the system
-            driver_path = ChromeDriverManager().install()
-            service = ChromeService(driver_path)
-        except Exception as e:
-            logger.error(f"Failed to setup ChromeDriver: {str(e)}")
-            raise
-        
-        driver = webdriver.Chrome(service=service, options=options)
-        
-        # Execute script to remove webdriver property
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        
-        return driver
-    
-    def _setup_firefox_driver(self):
-        """Setup Firefox WebDriver with optimized options."""
-        options = FirefoxOptions()
-        
-        # Basic options
-        if self.selenium_config.get('HEADLESS', True):
-            options.add_argument('--headless')
-        
-        # Performance optimizations
-        options.set_preference('dom.webdriver.enabled', False)
-        options.set_preference('useAutomationExtension', False)
-        options.set_preference('general.useragent.override', self.selenium_config.get('USER_AGENT', ''))
-        
-        if self.selenium_config.get('DISABLE_IMAGES', True):
-            options.set_preference('permissions.default.image', 2)
-        
-        if self.selenium_config.get('DISABLE_JS', False):
-            options.set_preference('javascript.enabled', False)
-        
-        # Setup service
-        service = FirefoxService(GeckoDriverManager().install())
-        
-        return webdriver.Firefox(service=service, options=options)
-    
     def _take_screenshot(self, filename_prefix="error"):
         """Take a screenshot for debugging purposes."""
         try:
@@ -584,13 +599,11 @@ class SeleniumScrapingEngine(BaseScrapingEngine):
             logger.error(f"Failed to take screenshot: {str(e)}")
         return None
     
-    def _random_delay(self, min_delay=1, max_delay=3):
-        """Add random delay to mimic human behavior."""
-        delay = random.uniform(min_delay, max_delay)
-        time.sleep(delay)
-    
     def search_products(self, query: str, max_results: int = 20) -> List[Dict[str, Any]]:
-        """Search for products using Selenium."""
+        """Search for products using Selenium.
+        
+        The driver is leased for this one search and returned to the pool afterwards.
+        """
         if not self.driver:
             self._setup_driver()
         
@@ -605,9 +618,10 @@ class SeleniumScrapingEngine(BaseScrapingEngine):
             search_url = search_url_template.format(query=quote_plus(query))
             logger.info(f"SeleniumScrapingEngine: Using search URL: {search_url}")
             
-            # Navigate to search page
+            # Navigate to search page, paced by the domain's shared limiter
+            self.rate_limiter.acquire(search_url)
+            self._lease.pages += 1
             self.driver.get(search_url)
-            self._random_delay(2, 4)
             
             # Wait for page to load
             try:
@@ -628,7 +642,12 @@ class SeleniumScrapingEngine(BaseScrapingEngine):
             logger.error(f"Selenium search failed: {str(e)}")
             if self.selenium_config.get('SCREENSHOT_ON_ERROR', True):
                 self._take_screenshot("search_error")
+            if isinstance(e, WebDriverException) and not isinstance(e, TimeoutException):
+                # The browser itself failed; start a fresh one next time
+                self._lease.broken = True
             return []
+        finally:
+            self.close()
     
     def _parse_selenium_products(self, config: Dict[str, Any], max_results: int) -> List[Dict[str, Any]]:
         """Parse products from Selenium page."""
@@ -735,30 +754,40 @@ class SeleniumScrapingEngine(BaseScrapingEngine):
             return None
     
     def close(self):
-        """Close the WebDriver and cleanup resources."""
-        if self.driver:
+        """Return the leased WebDriver to the pool."""
+        if self._lease:
             try:
-                self.driver.quit()
-                logger.info("WebDriver closed successfully")
+                get_webdriver_pool().release(self._lease)
             except Exception as e:
-                logger.error(f"Error closing WebDriver: {str(e)}")
+                logger.error(f"Error releasing WebDriver: {str(e)}")
             finally:
+                self._lease = None
                 self.driver = None
                 self.wait = None
-    
-    def __del__(self):
-        """Ensure WebDriver is closed when object is destroyed."""
-        self.close()
 
 
 class HybridScrapingEngine(BaseScrapingEngine):
-    """Hybrid engine that tries direct requests first, falls back to Selenium."""
+    """Hybrid engine that tries direct requests first, falls back to Selenium.
+    
+    When the async HTTP engine is configured for the website (see
+    async_http_configured), the direct requests go through it, and
+    search_many() fetches a whole batch of queries concurrently.
+    """
+    
+    # Direct requests build and parse search pages exactly like GenericScrapingEngine
+    build_search_url = GenericScrapingEngine.build_search_url
+    get_page_layout = GenericScrapingEngine.get_page_layout
+    parse_search_page = GenericScrapingEngine.parse_search_page
+    _parse_generic_product = GenericScrapingEngine._parse_generic_product
     
-    def __init__(self, website_config: Dict[str, Any]):
-        super().__init__(website_config)
+    def __init__(self, website_config: Dict[str, Any], rate_limiter=None):
+        super().__init__(website_config, rate_limiter)
         self.selenium_engine = None
         self.use_selenium = website_config.get('use_selenium', False)
         self.fallback_to_selenium = website_config.get('fallback_to_selenium', True)
+        self.async_engine = None
+        if not self.use_selenium and async_http_configured(website_config):
+            self.async_engine = AsyncHttpScrapingEngine(website_config, self.rate_limiter)
     
     def search_products(self, query: str, max_results: int = 20) -> List[Dict[str, Any]]:
         """Try direct request first, fall back to Selenium if needed."""
@@ -767,6 +796,9 @@ class HybridScrapingEngine(BaseScrapingEngine):
         if self.use_selenium:
             return self._search_with_selenium(query, max_results)
         
+        if self.async_engine:
+            return self.search_many([query], max_results)[0]
+        
         # Try direct HTTP request first
         try:
             logger.info(f"Trying direct HTTP request for query: {query}")
@@ -791,16 +823,43 @@ class HybridScrapingEngine(BaseScrapingEngine):
         
         return []
     
+    def search_many(self, queries: List[str], max_results: int = 20) -> List[List[Dict[str, Any]]]:
+        """Search several queries; returns one product list per query, in order.
+        
+        With the async HTTP engine the direct requests are fetched concurrently;
+        queries whose page looks protected then fall back to Selenium one at a time.
+        """
+        if not self.async_engine:
+            return [self.search_products(query, max_results) for query in queries]
+        
+        try:
+            logger.info(f"Trying direct HTTP requests for {len(queries)} queries")
+            pages = self.async_engine.fetch_pages(queries)
+        except Exception as e:
+            logger.warning(f"Direct requests failed: {str(e)}")
+            if self.fallback_to_selenium:
+                logger.info("Falling back to Selenium")
+                return [self._search_with_selenium(query, max_results) for query in queries]
+            return [[] for query in queries]
+        
+        results = []
+        for query, (url, content) in zip(queries, pages):
+            products = self.parse_search_page(content, max_results) if content else []
+            self.async_engine.response_cache.accept(url, products)
+            if products:
+                logger.info(f"Direct request successful, found {len(products)} products for query: {query}")
+            elif content and self.fallback_to_selenium and self._is_protected_content(content):
+                logger.warning("Detected protected content, falling back to Selenium")
+                products = self._search_with_selenium(query, max_results)
+            results.append(products)
+        return results
+    
     def _search_with_requests(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Search using direct HTTP requests (existing logic)."""
-        config = self.config.get('scraping_config', {})
-        search_url_template = self.config.get('search_url_template') or config.get('search_url_template', '')
-        
-        if not search_url_template:
-            logger.error("No search URL template configured")
+        search_url = self.build_search_url(query)
+        if not search_url:
             return []
         
-        search_url = search_url_template.format(query=quote_plus(query))
         response = self.make_request(search_url)
         
         if not response:
@@ -809,25 +868,8 @@ class HybridScrapingEngine(BaseScrapingEngine):
         # Store response for content analysis
         self._last_response = response
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        products = []
-        
-        container_selector = config.get('product_container_selector', '')
-        if not container_selector:
-            logger.error("No product container selector configured")
-            return []
-        
-        product_containers = soup.select(container_selector)
-        
-        for container in product_containers[:max_results]:
-            try:
-                product_data = self._parse_generic_product(container, config)
-                if product_data:
-                    products.append(product_data)
-            except Exception as e:
-                logger.error(f"Error parsing generic product: {e}")
-                continue
-        
+        products = self.parse_search_page(response.content, max_results)
+        self.response_cache.accept(search_url, products)
         return products
     
     def _search_with_selenium(self, query: str, max_results: int) -> List[Dict[str, Any]]:
@@ -841,13 +883,17 @@ class HybridScrapingEngine(BaseScrapingEngine):
             logger.error(f"Selenium search failed: {str(e)}")
             return []
     
-    def _is_protected_content(self) -> bool:
-        """Check if the response contains protected/encoded content."""
-        if not hasattr(self, '_last_response'):
+    def _is_protected_content(self, page: Optional[bytes] = None) -> bool:
+        """Check if the response (or the given page body) contains protected/encoded content."""
+        if page is None and not hasattr(self, '_last_response'):
             return False
         
         try:
-            content = self._last_response.text[:1000]  # Check first 1000 chars
+            # Check first 1000 chars
+            if page is None:
+                content = self._last_response.text[:1000]
+            else:
+                content = page[:1000].decode('utf-8', errors='replace')
             
             # Check for common protection indicators
             protection_indicators = [
@@ -882,64 +928,6 @@ class HybridScrapingEngine(BaseScrapingEngine):
             logger.error(f"Error checking protected content: {str(e)}")
             return False
     
-    def _parse_generic_product(self, container, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Parse individual product using custom selectors (from GenericScrapingEngine)."""
-        try:
-            selectors = config.get('selectors', {})
-            
-            # Product name
-            name_selector = selectors.get('name', '')
-            name_elem = container.select_one(name_selector) if name_selector else None
-            name = self.clean_text(name_elem.get_text()) if name_elem else ""
-            
-            if not name:
-                return None
-            
-            # Price
-            price_selector = selectors.get('price', '')
-            price_elem = container.select_one(price_selector) if price_selector else None
-            price_text = price_elem.get_text() if price_elem else ""
-            price = self.parse_price(price_text)
-            
-            if not price:
-                return None
-            
-            # URL
-            url_selector = selectors.get('url', '')
-            url_elem = container.select_one(url_selector) if url_selector else None
-            url = url_elem.get('href') if url_elem else ""
-            if url and not url.startswith('http'):
-                url = urljoin(self.config.get('base_url', ''), url)
-            
-            # Image
-            image_selector = selectors.get('image', '')
-            img_elem = container.select_one(image_selector) if image_selector else None
-            image_url = img_elem.get('src') if img_elem else ""
-            if image_url and not image_url.startswith('http'):
-                image_url = urljoin(self.config.get('base_url', ''), image_url)
-            
-            # Availability
-            availability_selector = selectors.get('availability', '')
-            availability = True
-            if availability_selector:
-                availability_elem = container.select_one(availability_selector)
-                if availability_elem:
-                    availability_text = availability_elem.get_text().lower()
-                    availability = 'out of stock' not in availability_text and 'unavailable' not in availability_text
-            
-            return {
-                'name': name,
-                'price': price,
-                'url': url,
-                'image_url': image_url,
-                'availability': availability,
-                'marketplace': config.get('marketplace', 'other')
-            }
-            
-        except Exception as e:
-            logger.error(f"Error parsing generic product container: {str(e)}")
-            return None
-    
     def close(self):
         """Close any open resources."""
         if self.selenium_engine:
@@ -947,22 +935,48 @@ class HybridScrapingEngine(BaseScrapingEngine):
             self.selenium_engine = None
 
 
-def get_scraping_engine(website_config: Dict[str, Any]) -> BaseScrapingEngine:
-    """Factory function to get the appropriate scraping engine."""
+def get_scraping_engine_class(website_config: Dict[str, Any]) -> type:
+    """The scraping engine class for a website configuration."""
     marketplace = website_config.get('marketplace', 'other').lower()
     use_selenium = website_config.get('use_selenium', False)
     fallback_to_selenium = website_config.get('fallback_to_selenium', True)
     
     # Check if we should use hybrid approach
     if use_selenium or fallback_to_selenium:
-        return HybridScrapingEngine(website_config)
+        return HybridScrapingEngine
     
     # Use specific engines for known marketplaces
     if marketplace == 'amazon':
-        return AmazonScrapingEngine(website_config)
+        return AmazonScrapingEngine
     elif marketplace == 'ebay':
-        return EbayScrapingEngine(website_config)
+        return EbayScrapingEngine
     elif marketplace == 'walmart':
-        return WalmartScrapingEngine(website_config)
-    else:
-        return GenericScrapingEngine(website_config)
+        return WalmartScrapingEngine
+    
+    if async_http_configured(website_config):
+        return AsyncHttpScrapingEngine
+    return GenericScrapingEngine
+
+
+def async_http_configured(website_config: Dict[str, Any]) -> bool:
+    """Whether a website's direct requests should go through the async HTTP engine."""
+    # scraping_config['http_engine'] overrides SCRAPING_HTTP_ENGINE per website
+    http_engine = website_config.get('scraping_config', {}).get('http_engine') or settings.SCRAPING_HTTP_ENGINE
+    return http_engine == 'async' and async_http_available()
+
+
+def searches_in_batches(website_config: Dict[str, Any]) -> bool:
+    """Whether the website's engine fetches a list of queries at once with search_many()."""
+    engine_class = get_scraping_engine_class(website_config)
+    if engine_class is HybridScrapingEngine:
+        return not website_config.get('use_selenium', False) and async_http_configured(website_config)
+    return hasattr(engine_class, 'search_many')
+
+
+def get_scraping_engine(website_config: Dict[str, Any], rate_limiter=None) -> BaseScrapingEngine:
+    """Factory function to get the appropriate scraping engine.
+    
+    Engines pace requests with a DomainRateLimiter for the website's rate_limit_delay
+    unless a `rate_limiter` is passed.
+    """
+    return get_scraping_engine_class(website_config)(website_config, rate_limiter)
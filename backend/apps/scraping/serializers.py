@@ -9,7 +9,8 @@ class ScrapingWebsiteSerializer(serializers.ModelSerializer):
         model = ScrapingWebsite
         fields = [
             'id', 'name', 'base_url', 'search_url_template', 'is_active',
-            'scraping_config', 'rate_limit_delay', 'headers', 'created_at', 'updated_at'
+            'scraping_config', 'rate_limit_delay', 'max_concurrency', 'response_cache_ttl', 'headers',
+            'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
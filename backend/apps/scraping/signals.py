@@ -0,0 +1,30 @@
+"""
+Signal handlers for scraping data changes.
+Bumps the 'scraping' data version, which the ETags of scraping statistics and
+reports are derived from, and pushes job status changes to live viewers.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from price_monitoring.caching import bump_data_versions_on_commit
+
+from .job_events import job_status_data, publish_job_event
+from .models import ScrapedProduct, ScrapingJob
+
+
+@receiver(post_save, sender=ScrapedProduct)
+@receiver(post_delete, sender=ScrapedProduct)
+@receiver(post_save, sender=ScrapingJob)
+@receiver(post_delete, sender=ScrapingJob)
+def bump_scraping_version(sender, instance, **kwargs):
+    """Mark scraping data as changed once the current transaction commits."""
+    bump_data_versions_on_commit('scraping')
+
+
+@receiver(post_save, sender=ScrapingJob)
+def publish_job_status(sender, instance, **kwargs):
+    """Send the job's status and counters to its event stream once the save commits."""
+    data = job_status_data(instance)
+    transaction.on_commit(lambda: publish_job_event(instance.id, 'status', data))
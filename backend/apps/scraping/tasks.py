@@ -1,38 +1,54 @@
-from celery import shared_task
+from celery import shared_task, chord
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
 from django.utils import timezone
 from decimal import Decimal
-from .models import ScrapingJob, ScrapedProduct, ScrapingWebsite, ProductSearchList, ScrapingJobLog
+from .models import ScrapingJob, ScrapedProduct, ScrapingWebsite, ProductSearchList
 from apps.products.models import RegulatedProduct
-from apps.violations.models import Violation, ViolationCheckReport
-from .scraping_engines import get_scraping_engine
+from apps.products.matching import (
+    extract_keywords, get_regulated_product_matcher, names_match, normalize_for_matching
+)
+from apps.violations.caching import invalidate_violation_caches
+from apps.violations.counters import remove_scraped_products
+from apps.violations.writer import write_violation_checks
+from .scraping_engines import get_scraping_engine, searches_in_batches
+from .rate_limiting import DomainRateLimiter
+from .job_logs import get_job_log_writer, close_job_log_writer
+from .job_events import publish_job_event
+from price_monitoring.caching import bump_data_versions_on_commit
 import logging
 import json
+import queue
+import threading
 
 logger = logging.getLogger(__name__)
 
 
 def log_job_progress(job, level, message):
-    """Log progress to both database and console."""
+    """Log progress to the console, publish it to live viewers and queue it for the database.
+    
+    Database entries are buffered by JobLogWriter and saved in batches; the
+    buffer is flushed whenever a job or chunk finishes or fails.
+    """
     # Log to console
     logger.info(f"Celery: [{level.upper()}] {message}")
     
-    # Log to database
-    try:
-        ScrapingJobLog.objects.create(
-            job=job,
-            level=level,
-            message=message
-        )
-        # Update current progress
-        job.current_progress = message
-        job.save(update_fields=['current_progress'])
-    except Exception as e:
-        logger.error(f"Failed to save log to database: {str(e)}")
+    # Push to anyone watching the job's event stream
+    publish_job_event(job.id, 'log', {'level': level, 'message': message, 'timestamp': timezone.now()})
+    
+    # Queue for the database
+    job.current_progress = message
+    get_job_log_writer(job.id).write(level, message)
 
 
 @shared_task(bind=True)
 def scrape_marketplace(self, job_id):
-    """Celery task to scrape products from a marketplace."""
+    """Celery task to scrape products from a marketplace.
+    
+    Large search lists are split into chunks of SCRAPING_CHUNK_SIZE queries and
+    fanned out as a chord of scrape_search_chunk subtasks; finalize_scraping_job
+    aggregates their counters once every chunk has finished.
+    """
     
     logger.info(f"Celery: Starting scrape_marketplace task for job_id: {job_id}")
     logger.info(f"Celery: Task ID: {self.request.id}")
@@ -70,97 +86,25 @@ def scrape_marketplace(self, job_id):
         
         log_job_progress(job, 'info', f"Products to search: {', '.join(search_products[:3])}...")  # Show first 3 products
         
-        # Initialize scraping engine
-        website_config = {
-            'base_url': website.base_url,
-            'search_url_template': website.search_url_template,
-            'scraping_config': website.scraping_config,
-            'rate_limit_delay': website.rate_limit_delay,
-            'headers': website.headers,
-            'marketplace': job.marketplace,
-            'use_selenium': website.use_selenium,
-            'fallback_to_selenium': website.fallback_to_selenium,
-            'selenium_config': website.selenium_config
-        }
-        
-        log_job_progress(job, 'info', f"Initializing scraping engine for marketplace: {job.marketplace}")
-        scraping_engine = get_scraping_engine(website_config)
-        log_job_progress(job, 'info', f"Scraping engine initialized: {type(scraping_engine).__name__}")
-        
-        products_scraped = 0
-        products_found = 0
-        errors_count = 0
+        total = len(search_products)
+        queries = list(enumerate(search_products, 1))
         
-        log_job_progress(job, 'info', f"Starting scraping for {len(search_products)} products")
-        
-        for i, product_name in enumerate(search_products, 1):
-            try:
-                log_job_progress(job, 'info', f"[{i}/{len(search_products)}] Searching for: {product_name}")
-                
-                # Search for products
-                scraped_products = scraping_engine.search_products(product_name, max_results=10)
-                log_job_progress(job, 'info', f"Found {len(scraped_products)} results for '{product_name}'")
-                
-                for j, scraped_data in enumerate(scraped_products):
-                    try:
-                        log_job_progress(job, 'info', f"Processing result {j+1} for '{product_name}': {scraped_data.get('name', 'Unknown')}")
-                        
-                        # Create scraped product record
-                        scraped_product = ScrapedProduct.objects.create(
-                            product_name=scraped_data['name'],
-                            marketplace=job.marketplace,
-                            website=website,
-                            search_query=product_name,
-                            listed_price=scraped_data['price'],
-                            original_price=scraped_data.get('original_price'),
-                            url=scraped_data['url'],
-                            image_url=scraped_data.get('image_url', ''),
-                            description=scraped_data.get('description', ''),
-                            availability=scraped_data.get('availability', True),
-                            stock_status=scraped_data.get('stock_status', ''),
-                            seller_name=scraped_data.get('seller_name', ''),
-                            rating=scraped_data.get('rating'),
-                            review_count=scraped_data.get('review_count'),
-                            scraping_job=job
-                        )
-                        
-                        log_job_progress(job, 'success', f"Saved product: {scraped_product.product_name} - ${scraped_product.listed_price}")
-                        
-                        # Check for violations
-                        check_price_violation_for_product(product_name, scraped_product)
-                        
-                        products_scraped += 1
-                        products_found += 1
-                        
-                    except Exception as e:
-                        log_job_progress(job, 'error', f"Error saving scraped product {scraped_data.get('name', 'Unknown')}: {str(e)}")
-                        errors_count += 1
-                
-                if not scraped_products:
-                    log_job_progress(job, 'warning', f"No products found for: {product_name}")
-                
-            except Exception as e:
-                log_job_progress(job, 'error', f"Error scraping product {product_name}: {str(e)}")
-                errors_count += 1
-        
-        # Update job status
-        log_job_progress(job, 'info', f"Updating job status to 'completed'")
-        job.status = 'completed'
-        job.products_scraped = products_scraped
-        job.products_found = products_found
-        job.errors_count = errors_count
-        job.completed_at = timezone.now()
-        job.current_progress = f"Completed - Products scraped: {products_scraped}, Found: {products_found}, Errors: {errors_count}"
-        job.save()
-        
-        # Invalidate cache after scraping completes
-        from django.core.cache import cache
-        cache.delete('full_violation_report')
-        cache.delete('violation_stats')
+        # Fan large lists out to one subtask per chunk so extra workers can share the load
+        chunk_size = getattr(settings, 'SCRAPING_CHUNK_SIZE', 0)
+        if chunk_size and total > chunk_size:
+            chunks = [queries[i:i + chunk_size] for i in range(0, total, chunk_size)]
+            header = [scrape_search_chunk.s(job.id, chunk, total) for chunk in chunks]
+            chord(header)(finalize_scraping_job.s(job.id))
+            
+            log_job_progress(job, 'info', f"Dispatched {len(chunks)} chunk tasks of up to {chunk_size} products each")
+            return f"Scraping dispatched in {len(chunks)} chunks"
         
-        log_job_progress(job, 'success', f"Scraping job completed. Products scraped: {products_scraped}, Found: {products_found}, Errors: {errors_count}")
+        website_config = build_website_config(website, job.marketplace)
+        products_scraped, products_found, errors_count = run_search_queries(
+            job, website, website_config, queries, total
+        )
         
-        return f"Scraping completed. Products scraped: {products_scraped}, Found: {products_found}, Errors: {errors_count}"
+        return complete_scraping_job(job, products_scraped, products_found, errors_count)
         
     except ScrapingJob.DoesNotExist:
         logger.error(f"Celery: ScrapingJob with id {job_id} not found")
@@ -178,195 +122,380 @@ def scrape_marketplace(self, job_id):
         except Exception as save_error:
             logger.error(f"Celery: Failed to update job status: {str(save_error)}")
         raise
+    finally:
+        close_job_log_writer(job_id)
 
 
-def check_price_violation_for_product(product_name, scraped_product):
-    """Check if scraped price violates government regulations for a specific product."""
+@shared_task(bind=True, acks_late=True, reject_on_worker_lost=True, max_retries=2, default_retry_delay=30)
+def scrape_search_chunk(self, job_id, queries, total):
+    """Scrape one chunk of a job's search list as part of a chord.
     
+    `queries` is a list of [index, product_name] pairs. Returns the chunk's
+    [products_scraped, products_found, errors_count] for finalize_scraping_job.
+    A chunk that keeps failing is reported as errors instead of failing the chord.
+    """
     try:
-        # Use scraped product name for matching, not the search query
-        scraped_product_name = scraped_product.product_name
+        job = ScrapingJob.objects.select_related('website').get(id=job_id)
+        if job.status == 'cancelled':
+            return [0, 0, 0]
         
-        # Find matching regulated product using scraped product name
-        regulated_products = RegulatedProduct.objects.filter(
-            name__icontains=scraped_product_name,
-            is_active=True
-        )
+        website = job.website
+        website_config = build_website_config(website, job.marketplace)
+        log_job_progress(job, 'info', f"Chunk started: products {queries[0][0]}-{queries[-1][0]} of {total}")
         
-        if not regulated_products.exists():
-            # Try fuzzy matching against all regulated products
-            regulated_products = RegulatedProduct.objects.filter(
-                is_active=True
-            )
-            
-            for regulated_product in regulated_products:
-                if is_product_match(scraped_product_name, regulated_product.name):
-                    logger.info(f"Matched '{scraped_product_name}' with '{regulated_product.name}'")
-                    check_single_violation(regulated_product, scraped_product)
-                    break
-            else:
-                logger.info(f"No match found for scraped product: '{scraped_product_name}'")
-        else:
-            # Check against all matching regulated products
-            for regulated_product in regulated_products:
-                logger.info(f"Direct match found: '{scraped_product_name}' with '{regulated_product.name}'")
-                check_single_violation(regulated_product, scraped_product)
-                
+        return list(run_search_queries(job, website, website_config, queries, total))
+        
+    except ScrapingJob.DoesNotExist:
+        logger.error(f"Celery: ScrapingJob with id {job_id} not found")
+        return [0, 0, 0]
     except Exception as e:
-        logger.error(f"Error checking violations for {scraped_product_name}: {str(e)}")
+        if self.request.retries < self.max_retries:
+            logger.warning(f"Celery: Chunk for job {job_id} failed, retrying: {str(e)}")
+            raise self.retry(exc=e)
+        logger.error(f"Celery: Chunk for job {job_id} failed after {self.max_retries} retries: {str(e)}")
+        return [0, 0, len(queries)]
+    finally:
+        close_job_log_writer(job_id)
 
 
-def is_product_match(search_name, regulated_name):
-    """Check if two product names are similar enough to be considered a match."""
-    import difflib
-    import re
+@shared_task
+def finalize_scraping_job(chunk_results, job_id):
+    """Chord callback: aggregate chunk counters and mark the job completed."""
+    products_scraped = sum(result[0] for result in chunk_results)
+    products_found = sum(result[1] for result in chunk_results)
+    errors_count = sum(result[2] for result in chunk_results)
+    
+    try:
+        job = ScrapingJob.objects.get(id=job_id)
+    except ScrapingJob.DoesNotExist:
+        logger.error(f"Celery: ScrapingJob with id {job_id} not found")
+        return "Job not found"
+    
+    if job.status == 'cancelled':
+        return "Job was cancelled"
+    
+    return complete_scraping_job(job, products_scraped, products_found, errors_count)
+
+
+def build_website_config(website, marketplace):
+    """Build the scraping engine configuration for a website."""
+    return {
+        'base_url': website.base_url,
+        'search_url_template': website.search_url_template,
+        'scraping_config': website.scraping_config,
+        'rate_limit_delay': website.rate_limit_delay,
+        'max_concurrency': website.max_concurrency,
+        'response_cache_ttl': website.response_cache_ttl,
+        'headers': website.headers,
+        'marketplace': marketplace,
+        'use_selenium': website.use_selenium,
+        'fallback_to_selenium': website.fallback_to_selenium,
+        'selenium_config': website.selenium_config
+    }
+
+
+def complete_scraping_job(job, products_scraped, products_found, errors_count):
+    """Store final counters on the job, mark it completed and invalidate report caches."""
+    log_job_progress(job, 'info', f"Updating job status to 'completed'")
+    job.status = 'completed'
+    job.products_scraped = products_scraped
+    job.products_found = products_found
+    job.errors_count = errors_count
+    job.completed_at = timezone.now()
+    job.current_progress = f"Completed - Products scraped: {products_scraped}, Found: {products_found}, Errors: {errors_count}"
+    job.save()
     
-    def extract_keywords(name):
-        """Extract meaningful keywords from product name."""
-        # Remove common words and extract key terms
-        name = name.lower().strip()
+    # Invalidate cache after scraping completes
+    invalidate_violation_caches()
+    
+    log_job_progress(job, 'success', f"Scraping job completed. Products scraped: {products_scraped}, Found: {products_found}, Errors: {errors_count}")
+    close_job_log_writer(job.id)
+    
+    return f"Scraping completed. Products scraped: {products_scraped}, Found: {products_found}, Errors: {errors_count}"
+
+
+def run_search_queries(job, website, website_config, queries, total):
+    """Scrape a list of (index, product_name) queries for one website.
+    
+    Engines with search_many() fetch every query at once on the shared event
+    loop; otherwise a pool of worker threads is used when the website allows
+    more than one concurrent query. Returns (products_scraped, products_found, errors_count).
+    """
+    if searches_in_batches(website_config):
+        return run_search_queries_batched(job, website, website_config, queries, total)
+    
+    concurrency = min(website.max_concurrency or 1, len(queries))
+    
+    if concurrency > 1:
+        log_job_progress(job, 'info', f"Starting scraping for {len(queries)} products with {concurrency} parallel workers")
+        return run_search_queries_concurrently(job, website, website_config, queries, total, concurrency)
+    
+    log_job_progress(job, 'info', f"Initializing scraping engine for marketplace: {job.marketplace}")
+    scraping_engine = get_scraping_engine(website_config)
+    log_job_progress(job, 'info', f"Scraping engine initialized: {type(scraping_engine).__name__}")
+    
+    products_scraped = 0
+    products_found = 0
+    errors_count = 0
+    
+    log_job_progress(job, 'info', f"Starting scraping for {len(queries)} products")
+    
+    for i, product_name in queries:
+        scraped, found, errors = scrape_search_query(
+            job, website, scraping_engine, product_name, i, total
+        )
+        products_scraped += scraped
+        products_found += found
+        errors_count += errors
+    
+    return products_scraped, products_found, errors_count
+
+
+def run_search_queries_batched(job, website, website_config, queries, total):
+    """Fetch all queries concurrently with the engine's search_many(), then save them in order.
+    
+    Returns (products_scraped, products_found, errors_count).
+    """
+    log_job_progress(job, 'info', f"Initializing scraping engine for marketplace: {job.marketplace}")
+    scraping_engine = get_scraping_engine(website_config)
+    log_job_progress(job, 'info', f"Fetching {len(queries)} products concurrently with {type(scraping_engine).__name__}")
+    
+    try:
+        results = scraping_engine.search_many([product_name for i, product_name in queries], max_results=10)
+    except Exception as e:
+        log_job_progress(job, 'error', f"Batch search failed: {str(e)}")
+        return 0, 0, len(queries)
+    
+    totals = [0, 0, 0]
+    for (i, product_name), scraped_products in zip(queries, results):
+        counts = scrape_search_query(job, website, scraping_engine, product_name, i, total, scraped_products)
+        for k, count in enumerate(counts):
+            totals[k] += count
+    
+    return totals[0], totals[1], totals[2]
+
+
+def scrape_search_query(job, website, scraping_engine, product_name, index, total, scraped_products=None):
+    """Search one product name, save its results and check them for violations.
+    
+    Pass `scraped_products` when the search results were already fetched.
+    Returns a (products_scraped, products_found, errors_count) tuple for this query.
+    """
+    products_scraped = 0
+    products_found = 0
+    errors_count = 0
+    
+    try:
+        log_job_progress(job, 'info', f"[{index}/{total}] Searching for: {product_name}")
         
-        # Remove common words that don't help with matching
-        stop_words = ['the', 'and', 'or', 'of', 'in', 'on', 'at', 'to', 'for', 'with', 'by', 'kg', 'liter', 'l', 'piece', 'pcs', 'pack', 'bag', 'box']
+        # Search for products
+        if scraped_products is None:
+            scraped_products = scraping_engine.search_products(product_name, max_results=10)
+        log_job_progress(job, 'info', f"Found {len(scraped_products)} results for '{product_name}'")
         
-        # Split by common separators and clean
-        words = re.split(r'[\s\-_\(\)\[\]\/]+', name)
-        keywords = [word for word in words if word and word not in stop_words and len(word) > 2]
+        # Build this query's records first, then save them in a single batch
+        pending_products = []
+        for j, scraped_data in enumerate(scraped_products):
+            try:
+                log_job_progress(job, 'info', f"Processing result {j+1} for '{product_name}': {scraped_data.get('name', 'Unknown')}")
+                pending_products.append(build_scraped_product(job, website, product_name, scraped_data))
+            except Exception as e:
+                log_job_progress(job, 'error', f"Error saving scraped product {scraped_data.get('name', 'Unknown')}: {str(e)}")
+                errors_count += 1
         
-        return keywords
-    
-    def normalize_for_matching(name):
-        """Normalize product name for better matching."""
-        name = name.lower().strip()
+        if pending_products:
+            saved_products, save_errors = save_scraped_products(job, product_name, pending_products)
+            for scraped_product in saved_products:
+                log_job_progress(job, 'success', f"Saved product: {scraped_product.product_name} - ${scraped_product.listed_price}")
+            
+            products_scraped += len(saved_products)
+            products_found += len(saved_products)
+            errors_count += save_errors
         
-        # Remove common variations
-        name = re.sub(r'\d+kg', '', name)  # Remove weight specifications
-        name = re.sub(r'\d+liter?', '', name)  # Remove volume specifications
-        name = re.sub(r'\d+pc?s?', '', name)  # Remove piece specifications
-        name = re.sub(r'[\(\)\[\]]', '', name)  # Remove brackets
-        name = re.sub(r'\s+', ' ', name)  # Normalize spaces
+        if not scraped_products:
+            log_job_progress(job, 'warning', f"No products found for: {product_name}")
         
-        return name.strip()
-    
-    # Normalize names
-    search_normalized = normalize_for_matching(search_name)
-    regulated_normalized = normalize_for_matching(regulated_name)
+    except Exception as e:
+        log_job_progress(job, 'error', f"Error scraping product {product_name}: {str(e)}")
+        errors_count += 1
     
-    # Check for exact match
-    if search_normalized == regulated_normalized:
-        return True
+    # Counters are only saved when the job completes; viewers add these up as they arrive
+    publish_job_event(job.id, 'query', {
+        'index': index,
+        'total': total,
+        'product_name': product_name,
+        'products_scraped': products_scraped,
+        'products_found': products_found,
+        'errors_count': errors_count,
+    })
     
-    # Check for substring match
-    if search_normalized in regulated_normalized or regulated_normalized in search_normalized:
-        return True
+    return products_scraped, products_found, errors_count
+
+
+def build_scraped_product(job, website, product_name, scraped_data):
+    """Build an unsaved ScrapedProduct from one search result."""
+    original_price = scraped_data.get('original_price')
     
-    # Extract keywords and check for keyword overlap
-    search_keywords = extract_keywords(search_name)
-    regulated_keywords = extract_keywords(regulated_name)
+    return ScrapedProduct(
+        product_name=scraped_data['name'],
+        marketplace=job.marketplace,
+        website=website,
+        search_query=product_name,
+        # Engines return float prices; store Decimals so violation maths works on the instance
+        listed_price=Decimal(str(scraped_data['price'])),
+        original_price=Decimal(str(original_price)) if original_price is not None else None,
+        url=scraped_data['url'],
+        image_url=scraped_data.get('image_url', ''),
+        description=scraped_data.get('description', ''),
+        availability=scraped_data.get('availability', True),
+        stock_status=scraped_data.get('stock_status', ''),
+        seller_name=scraped_data.get('seller_name', ''),
+        rating=scraped_data.get('rating'),
+        review_count=scraped_data.get('review_count'),
+        scraping_job=job
+    )
+
+
+def save_scraped_products(job, product_name, scraped_products):
+    """Insert one query's scraped products with bulk_create and check them for violations.
     
-    # Check if any significant keywords match
-    keyword_matches = 0
-    for search_kw in search_keywords:
-        for reg_kw in regulated_keywords:
-            if search_kw in reg_kw or reg_kw in search_kw:
-                keyword_matches += 1
-                break
+    The insert and the violation checks share one transaction. If the database
+    rejects the batch, rows are saved one at a time so a bad row only loses itself.
+    Returns (saved_products, errors_count).
+    """
+    try:
+        with transaction.atomic():
+            saved_products = ScrapedProduct.objects.bulk_create(scraped_products)
+            check_price_violations(product_name, saved_products)
+            # bulk_create doesn't send the signals that bump the scraping version
+            bump_data_versions_on_commit('scraping')
+        return saved_products, 0
+    except DatabaseError as e:
+        logger.warning(f"Bulk insert failed for '{product_name}', saving rows individually: {str(e)}")
     
-    # If we have keyword matches, it's likely a match
-    if keyword_matches > 0 and len(search_keywords) > 0:
-        match_ratio = keyword_matches / len(search_keywords)
-        if match_ratio >= 0.5:  # At least 50% of keywords match
-            return True
+    saved_products = []
+    errors_count = 0
+    for scraped_product in scraped_products:
+        try:
+            with transaction.atomic():
+                scraped_product.save()
+                check_price_violation_for_product(product_name, scraped_product)
+            saved_products.append(scraped_product)
+        except Exception as e:
+            log_job_progress(job, 'error', f"Error saving scraped product {scraped_product.product_name}: {str(e)}")
+            errors_count += 1
     
-    # Check similarity ratio as fallback
-    similarity = difflib.SequenceMatcher(None, search_normalized, regulated_normalized).ratio()
-    return similarity > 0.6  # Lowered threshold for better matching
+    return saved_products, errors_count
 
 
-def check_single_violation(regulated_product, scraped_product):
-    """Check violation for a single regulated product against scraped product."""
+def run_search_queries_concurrently(job, website, website_config, queries, total, concurrency):
+    """Run search queries for one website on a bounded pool of worker threads.
     
-    violation_threshold = regulated_product.price_violation_threshold
-    scraped_price = scraped_product.listed_price
-    regulated_price = regulated_product.gov_price
-    
-    # Calculate differences
-    price_difference = scraped_price - regulated_price
-    percentage_difference = (price_difference / regulated_price) * 100 if regulated_price > 0 else 0
-    
-    # Determine compliance status
-    has_violation = scraped_price > violation_threshold
-    compliance_status = 'violation' if has_violation else 'ok'
-    
-    # Calculate severity and penalty if violation
-    violation_severity = None
-    proposed_penalty = None
-    
-    if has_violation:
-        if percentage_difference <= 20:
-            violation_severity = 'low'
-            proposed_penalty = Decimal('100')
-        elif percentage_difference <= 50:
-            violation_severity = 'medium'
-            proposed_penalty = Decimal('500')
-        elif percentage_difference <= 100:
-            violation_severity = 'high'
-            proposed_penalty = Decimal('1000')
-        else:
-            violation_severity = 'critical'
-            proposed_penalty = Decimal('2000')
-    
-    # Create notes
-    notes = f"Scraped: Rs.{scraped_price} | Regulated: Rs.{regulated_price} | "
-    notes += f"Difference: Rs.{price_difference} ({percentage_difference:.1f}%)"
-    
-    if has_violation:
-        notes += f" | Severity: {violation_severity} | Penalty: Rs.{proposed_penalty}"
-    
-    # Create or update violation check report
-    report, report_created = ViolationCheckReport.objects.get_or_create(
-        regulated_product=regulated_product,
-        scraped_product=scraped_product,
-        defaults={
-            'has_violation': has_violation,
-            'compliance_status': compliance_status,
-            'price_difference': price_difference,
-            'percentage_difference': Decimal(str(round(percentage_difference, 2))),
-            'violation_severity': violation_severity,
-            'proposed_penalty': proposed_penalty,
-            'notes': notes,
-        }
-    )
+    Each worker owns its own scraping engine and database connection. All workers
+    share the site's per-domain limiter, so requests stay within rate_limit_delay
+    (across Celery workers too) and slow down together when the site pushes back.
+    """
+    rate_limiter = DomainRateLimiter(website.rate_limit_delay)
+    
+    pending = queue.Queue()
+    for i, product_name in queries:
+        pending.put((i, product_name))
+    
+    totals = [0, 0, 0]
+    totals_lock = threading.Lock()
     
-    # Create violation record if needed
-    violation_record = None
-    if has_violation:
-        existing_violation = Violation.objects.filter(
-            regulated_product=regulated_product,
-            scraped_product=scraped_product,
-            status='pending'
-        ).first()
+    def worker():
+        try:
+            scraping_engine = get_scraping_engine(website_config, rate_limiter)
+        except Exception as e:
+            log_job_progress(job, 'error', f"Failed to initialize scraping engine: {str(e)}")
+            connection.close()
+            return
         
-        if not existing_violation:
-            # Create violation
-            violation_record = Violation.objects.create(
-                regulated_product=regulated_product,
-                scraped_product=scraped_product,
-                violation_type='price_exceeded',
-                severity=violation_severity,
-                proposed_penalty=proposed_penalty,
-                status='pending',
-                notes=notes
-            )
-            
-            logger.info(f"Created violation: {regulated_product.name} - {violation_severity} severity")
-        else:
-            violation_record = existing_violation
+        try:
+            while True:
+                try:
+                    i, product_name = pending.get_nowait()
+                except queue.Empty:
+                    break
+                
+                counts = scrape_search_query(job, website, scraping_engine, product_name, i, total)
+                with totals_lock:
+                    for k, count in enumerate(counts):
+                        totals[k] += count
+        finally:
+            if hasattr(scraping_engine, 'close'):
+                scraping_engine.close()
+            # Worker threads open their own DB connections; don't leave them dangling
+            connection.close()
+    
+    workers = [
+        threading.Thread(target=worker, name=f"scrape-job-{job.id}-{n}", daemon=True)
+        for n in range(concurrency)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    
+    # Queries left behind by workers that failed to start count as errors
+    errors_left = pending.qsize()
+    return totals[0], totals[1], totals[2] + errors_left
+
+
+def check_price_violation_for_product(product_name, scraped_product):
+    """Check if scraped price violates government regulations for a specific product."""
+    check_price_violations(product_name, [scraped_product])
+
+
+def check_price_violations(product_name, scraped_products):
+    """Match scraped products against regulated products and record the results in one batch."""
+    try:
+        pairs = []
+        for scraped_product in scraped_products:
+            # Use scraped product name for matching, not the search query
+            for regulated_product in find_regulated_matches(scraped_product.product_name):
+                pairs.append((scraped_product, regulated_product))
         
-        # Link violation record to report
-        if violation_record and not report.violation_record:
-            report.violation_record = violation_record
-            report.save()
+        # Savepoint keeps a failed check from aborting the caller's transaction
+        with transaction.atomic():
+            write_violation_checks(pairs)
+    except Exception as e:
+        logger.error(f"Error checking violations for '{product_name}': {str(e)}")
+
+
+def find_regulated_matches(scraped_product_name):
+    """Regulated products a scraped product should be checked against."""
+    matcher = get_regulated_product_matcher()
+    
+    # Case-insensitive substring matches first, then the first fuzzy match
+    direct_matches = matcher.direct_matches(scraped_product_name)
+    if direct_matches:
+        for regulated_product in direct_matches:
+            logger.info(f"Direct match found: '{scraped_product_name}' with '{regulated_product.name}'")
+        return direct_matches
+    
+    for position, regulated_product in matcher.fuzzy_matches(scraped_product_name):
+        logger.info(f"Matched '{scraped_product_name}' with '{regulated_product.name}'")
+        return [regulated_product]
+    
+    logger.info(f"No match found for scraped product: '{scraped_product_name}'")
+    return []
+
+
+def is_product_match(search_name, regulated_name):
+    """Check if two product names are similar enough to be considered a match."""
+    return names_match(
+        normalize_for_matching(search_name),
+        extract_keywords(search_name),
+        normalize_for_matching(regulated_name),
+        extract_keywords(regulated_name)
+    )
+
+
+def check_single_violation(regulated_product, scraped_product):
+    """Check violation for a single regulated product against scraped product."""
+    write_violation_checks([(scraped_product, regulated_product)])
 
 
 @shared_task
@@ -379,7 +508,7 @@ def cleanup_old_scraped_products(days_old=30):
     old_products = ScrapedProduct.objects.filter(scraped_at__lt=cutoff_date)
     
     count = old_products.count()
-    old_products.delete()
+    remove_scraped_products(old_products)
     
     logger.info(f"Cleaned up {count} old scraped products")
     return f"Cleaned up {count} old scraped products"
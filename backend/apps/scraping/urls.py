@@ -4,7 +4,7 @@ from .views import (
     ScrapingWebsiteListCreateView, ScrapingWebsiteDetailView,
     ProductSearchListListCreateView, ProductSearchListDetailView,
     scraping_stats_view, trigger_scraping_view, cancel_scraping_job_view,
-    cleanup_old_data_view, test_website_scraping_view
+    cleanup_old_data_view, test_website_scraping_view, scraping_job_events_view
 )
 
 urlpatterns = [
@@ -15,6 +15,7 @@ urlpatterns = [
     path('jobs/', ScrapingJobListCreateView.as_view(), name='scraping_jobs'),
     path('jobs/<int:pk>/', ScrapingJobDetailView.as_view(), name='scraping_job_detail'),
     path('jobs/<int:job_id>/cancel/', cancel_scraping_job_view, name='cancel_scraping_job'),
+    path('jobs/<int:job_id>/events/', scraping_job_events_view, name='scraping_job_events'),
     
     # Scraping Websites
     path('websites/', ScrapingWebsiteListCreateView.as_view(), name='scraping_websites'),
@@ -4,23 +4,35 @@ from rest_framework.response import Response
 from django.db.models import Q, Count
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
-from django.core.cache import cache
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django.utils.cache import add_never_cache_headers
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+import functools
 
 from .models import ScrapedProduct, ScrapingJob, ScrapingWebsite, ProductSearchList
 from .serializers import (
     ScrapedProductSerializer, ScrapingJobSerializer, ScrapingJobCreateSerializer,
     ScrapingJobUpdateSerializer, ScrapingWebsiteSerializer, ProductSearchListSerializer
 )
-from .tasks import scrape_marketplace, cleanup_old_scraped_products
+from .tasks import build_website_config, scrape_marketplace, cleanup_old_scraped_products
+from .job_events import format_event, format_retry, job_event_stream, load_job_snapshot
+from price_monitoring.conditional import conditional_response
+from price_monitoring.query_budget import QueryBudgetMixin, query_budget
+from price_monitoring.pagination import OptionalCursorPagination
 
 
-class ScrapedProductListView(generics.ListAPIView):
+class ScrapedProductListView(QueryBudgetMixin, generics.ListAPIView):
     """List scraped products."""
     
     serializer_class = ScrapedProductSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 3
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ('-scraped_at', '-id')
     
     def get_queryset(self):
         queryset = ScrapedProduct.objects.select_related('website', 'scraping_job')
@@ -190,17 +202,19 @@ class ProductSearchListDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 
 
+@query_budget(7)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
-@cache_page(60 * 5)  # Cache for 5 minutes
 def scraping_stats_view(request):
     """Get scraping statistics."""
     
-    # Check cache first
-    cache_key = 'scraping_stats'
-    cached_stats = cache.get(cache_key)
-    if cached_stats:
-        return Response(cached_stats)
+    # Cache the stats for 5 minutes, refreshed by one request at a time; clients
+    # holding the current ETag get a 304 until scraping data changes
+    return conditional_response(request, 'scraping_stats', ['scraping'], compute_scraping_stats, timeout=300)
+
+
+def compute_scraping_stats():
+    """Aggregate the scraping statistics served by scraping_stats_view."""
     
     # Total products scraped
     total_products = ScrapedProduct.objects.count()
@@ -239,10 +253,7 @@ def scraping_stats_view(request):
         'avg_prices': list(avg_prices),
     }
     
-    # Cache the stats for 5 minutes
-    cache.set(cache_key, stats_data, 300)
-    
-    return Response(stats_data)
+    return stats_data
 
 
 @api_view(['POST'])
@@ -380,15 +391,8 @@ def test_website_scraping_view(request, website_id):
         website = get_object_or_404(ScrapingWebsite, id=website_id)
         test_query = request.query_params.get('query', 'test product')
         
-        # Initialize scraping engine
-        website_config = {
-            'base_url': website.base_url,
-            'search_url_template': website.search_url_template,
-            'scraping_config': website.scraping_config,
-            'rate_limit_delay': website.rate_limit_delay,
-            'headers': website.headers,
-            'marketplace': 'other'
-        }
+        # Initialize scraping engine with the same configuration (and response cache) jobs use
+        website_config = build_website_config(website, 'other')
         
         from .scraping_engines import get_scraping_engine
         scraping_engine = get_scraping_engine(website_config)
@@ -409,3 +413,57 @@ def test_website_scraping_view(request, website_id):
             {'error': f'Test failed: {str(e)}'},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+def authenticate_event_stream(request):
+    """The user behind a job event stream request, or None.
+    
+    EventSource can't send an Authorization header, so the (short-lived)
+    access token may also be passed as ?token=.
+    """
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    raw_token = header[7:] if header.startswith('Bearer ') else request.GET.get('token')
+    if not raw_token:
+        return None
+    
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def scraping_job_events_view(request, job_id):
+    """Stream a scraping job's log lines, counters and status as server-sent events.
+    
+    Served through ASGI the response stays open and relays the job's Redis
+    channel (see job_events.py). Under WSGI a long-lived response would tie up
+    a worker, so only the snapshot is sent and EventSource reconnects after
+    JOB_EVENTS_RETRY_MS, i.e. it polls.
+    """
+    
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    
+    user = await sync_to_async(authenticate_event_stream)(request)
+    if user is None or not user.is_active:
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+    
+    if not await ScrapingJob.objects.filter(id=job_id).aexists():
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    
+    load_snapshot = sync_to_async(functools.partial(load_job_snapshot, job_id))
+    if isinstance(request, ASGIRequest):
+        response = StreamingHttpResponse(job_event_stream(job_id, load_snapshot), content_type='text/event-stream')
+        # Keep nginx and similar proxies from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+    else:
+        snapshot = await load_snapshot()
+        response = HttpResponse(
+            format_retry(settings.JOB_EVENTS_RETRY_MS) + format_event('snapshot', snapshot),
+            content_type='text/event-stream'
+        )
+    
+    # Also keeps the site-wide cache middleware from storing the snapshot
+    add_never_cache_headers(response)
+    return response
@@ -0,0 +1,325 @@
+"""
+Process-wide pool of Selenium WebDrivers.
+Starting a browser costs seconds, so SeleniumScrapingEngine leases warm
+drivers from this pool for each search instead of launching its own. A driver
+is recycled once it has loaded POOL_MAX_PAGES pages or lived POOL_MAX_AGE
+seconds, is checked before every lease, and every driver is quit when the
+worker process shuts down.
+"""
+
+import atexit
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.firefox.service import Service as FirefoxService
+
+logger = logging.getLogger(__name__)
+
+
+class WebDriverPoolTimeout(Exception):
+    """No driver became available within the lease timeout."""
+
+
+@functools.lru_cache(maxsize=None)
+def driver_binary_path(browser):
+    """Path of the chromedriver / geckodriver binary, resolved once per process.
+
+    SELENIUM_CONFIG['DRIVER_PATH'] skips webdriver-manager altogether.
+    """
+    configured = getattr(settings, 'SELENIUM_CONFIG', {}).get('DRIVER_PATH')
+    if configured:
+        return configured
+
+    if browser == 'chrome':
+        from webdriver_manager.chrome import ChromeDriverManager
+        return ChromeDriverManager().install()
+    from webdriver_manager.firefox import GeckoDriverManager
+    return GeckoDriverManager().install()
+
+
+def create_chrome_driver(selenium_config):
+    """Start Chrome with optimized options."""
+    options = ChromeOptions()
+
+    # Basic options
+    if selenium_config.get('HEADLESS', True):
+        options.add_argument('--headless')
+
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-plugins')
+    if selenium_config.get('DISABLE_IMAGES', True):
+        options.add_argument('--disable-images')
+    if selenium_config.get('DISABLE_JS', False):
+        options.add_argument('--disable-javascript')
+    if selenium_config.get('DISABLE_CSS', False):
+        options.add_argument('--disable-css')
+
+    # User agent
+    user_agent = selenium_config.get('USER_AGENT', '')
+    if user_agent:
+        options.add_argument(f'--user-agent={user_agent}')
+
+    # Performance optimizations
+    options.add_argument('--disable-background-timer-throttling')
+    options.add_argument('--disable-backgrounding-occluded-windows')
+    options.add_argument('--disable-renderer-backgrounding')
+    options.add_argument('--disable-features=TranslateUI')
+    options.add_argument('--disable-ipc-flooding-protection')
+
+    # Memory optimizations
+    options.add_argument('--memory-pressure-off')
+    options.add_argument('--max_old_space_size=4096')
+
+    # Anti-detection measures
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument('--disable-blink-features=AutomationControlled')
+
+    driver = webdriver.Chrome(service=ChromeService(driver_binary_path('chrome')), options=options)
+
+    # Hide the webdriver property on every page the browser loads, not just the current one
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+        'source': "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+    })
+
+    return driver
+
+
+def create_firefox_driver(selenium_config):
+    """Start Firefox with optimized options."""
+    options = FirefoxOptions()
+
+    # Basic options
+    if selenium_config.get('HEADLESS', True):
+        options.add_argument('--headless')
+
+    # Performance optimizations
+    options.set_preference('dom.webdriver.enabled', False)
+    options.set_preference('useAutomationExtension', False)
+    options.set_preference('general.useragent.override', selenium_config.get('USER_AGENT', ''))
+
+    if selenium_config.get('DISABLE_IMAGES', True):
+        options.set_preference('permissions.default.image', 2)
+
+    if selenium_config.get('DISABLE_JS', False):
+        options.set_preference('javascript.enabled', False)
+
+    return webdriver.Firefox(service=FirefoxService(driver_binary_path('firefox')), options=options)
+
+
+DRIVER_FACTORIES = {
+    'chrome': create_chrome_driver,
+    'firefox': create_firefox_driver,
+}
+
+
+def create_driver(browser, selenium_config):
+    """Start a configured WebDriver for `browser`."""
+    if browser not in DRIVER_FACTORIES:
+        raise ValueError(f"Unsupported browser: {browser}")
+
+    driver = DRIVER_FACTORIES[browser](selenium_config)
+    try:
+        # Configure timeouts
+        driver.implicitly_wait(selenium_config.get('IMPLICIT_WAIT', 10))
+        driver.set_page_load_timeout(selenium_config.get('PAGE_LOAD_TIMEOUT', 30))
+
+        # Set window size
+        window_size = selenium_config.get('WINDOW_SIZE', (1920, 1080))
+        driver.set_window_size(window_size[0], window_size[1])
+    except Exception:
+        quit_driver(driver)
+        raise
+
+    logger.info(f"Selenium WebDriver started with {browser}")
+    return driver
+
+
+def quit_driver(driver):
+    """Quit a driver, making sure its driver process is gone even if the browser has crashed."""
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.warning(f"Error quitting WebDriver, stopping its service: {str(e)}")
+        try:
+            driver.service.stop()
+        except Exception:
+            pass
+
+
+class PooledDriver:
+    """A pooled WebDriver and its usage, for recycling decisions."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+        self.released_at = self.created_at
+        self.broken = False
+
+    def is_alive(self):
+        """Whether the driver process and its browser still respond."""
+        process = getattr(self.driver.service, 'process', None)
+        if process is not None and process.poll() is not None:
+            return False
+        try:
+            self.driver.current_url
+        except Exception:
+            return False
+        return True
+
+
+class WebDriverPool:
+    """Thread-safe pool of up to `max_size` warm drivers for one browser."""
+
+    def __init__(self, browser, selenium_config, max_size=2, max_pages=50, max_age=1800, idle_timeout=600):
+        self.browser = browser
+        self.selenium_config = selenium_config
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self.idle_timeout = idle_timeout
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout=120):
+        """Lease a healthy driver, starting one if the pool isn't full."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                stale = self._take_stale()
+                pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    if self._size < self.max_size:
+                        self._size += 1
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise WebDriverPoolTimeout(f"No {self.browser} WebDriver free after {timeout}s")
+                        self._condition.wait(remaining)
+                        continue
+
+            for driver in stale:
+                quit_driver(driver)
+
+            if pooled is None:
+                # Start the browser outside the lock; other threads keep leasing meanwhile
+                try:
+                    return PooledDriver(create_driver(self.browser, self.selenium_config))
+                except Exception:
+                    self._discard_slot()
+                    raise
+
+            if pooled.is_alive():
+                return pooled
+
+            logger.warning(f"Discarding unresponsive {self.browser} WebDriver after {pooled.pages} pages")
+            self._retire(pooled)
+
+    def release(self, pooled):
+        """Return a leased driver, recycling it if it is broken, worn out or too old."""
+        worn_out = pooled.pages >= self.max_pages or time.monotonic() - pooled.created_at >= self.max_age
+        if pooled.broken or worn_out or self._closed:
+            self._retire(pooled)
+            return
+
+        try:
+            # Stop the last page's scripts while the browser sits idle
+            pooled.driver.get('about:blank')
+        except Exception:
+            self._retire(pooled)
+            return
+
+        pooled.released_at = time.monotonic()
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout=120):
+        """Context manager leasing a driver for the duration of the block."""
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled
+        finally:
+            self.release(pooled)
+
+    def close(self):
+        """Quit every idle driver; leased ones are quit when released."""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._closed = True
+        for pooled in idle:
+            self._retire(pooled)
+
+    def _retire(self, pooled):
+        quit_driver(pooled.driver)
+        self._discard_slot()
+
+    def _discard_slot(self):
+        with self._condition:
+            self._size = max(self._size - 1, 0)
+            self._condition.notify()
+
+    def _take_stale(self):
+        """Remove drivers idle longer than idle_timeout and return them for quitting.
+
+        Called with the lock held; the caller quits them after releasing it.
+        """
+        now = time.monotonic()
+        stale = [pooled for pooled in self._idle if now - pooled.released_at >= self.idle_timeout]
+        if stale:
+            self._idle = [pooled for pooled in self._idle if pooled not in stale]
+            self._size -= len(stale)
+        return [pooled.driver for pooled in stale]
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_webdriver_pool(browser=None):
+    """Return the process-wide pool for the configured (or given) browser."""
+    selenium_config = getattr(settings, 'SELENIUM_CONFIG', {})
+    browser = (browser or selenium_config.get('BROWSER', 'chrome')).lower()
+
+    with _pools_lock:
+        pool = _pools.get(browser)
+        if pool is None:
+            pool = _pools[browser] = WebDriverPool(
+                browser,
+                selenium_config,
+                max_size=selenium_config.get('POOL_SIZE', 2),
+                max_pages=selenium_config.get('POOL_MAX_PAGES', 50),
+                max_age=selenium_config.get('POOL_MAX_AGE', 1800),
+                idle_timeout=selenium_config.get('POOL_IDLE_TIMEOUT', 600),
+            )
+        return pool
+
+
+def close_webdriver_pools(**kwargs):
+    """Quit every pooled driver in this process."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+# Don't leave browsers behind when a Celery worker process or the interpreter exits
+worker_process_shutdown.connect(close_webdriver_pools, weak=False)
+atexit.register(close_webdriver_pools)
@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Violation, ViolationCheckReport
+from .counters import add_report_instances, apply_deltas, new_deltas, queryset_deltas, remove_reports
+from .models import Violation, ViolationCheckReport, ViolationCheckRun
 
 
 @admin.register(Violation)
@@ -37,28 +38,42 @@ class ViolationAdmin(admin.ModelAdmin):
     
     def confirm_violations(self, request, queryset):
         """Confirm selected violations and create cases."""
+        from django.db import transaction
         from django.utils import timezone
         from apps.cases.models import Case
+        from price_monitoring.caching import bump_data_versions_on_commit
+        from .caching import invalidate_violation_caches
         
-        confirmed_count = 0
-        cases_created = 0
-        
-        for violation in queryset.filter(status='pending'):
-            violation.status = 'confirmed'
-            violation.confirmed_by = request.user
-            violation.confirmed_at = timezone.now()
-            violation.save()
-            confirmed_count += 1
+        with transaction.atomic():
+            # Lock the pending rows so a concurrent confirm can't also create their cases
+            pending = dict(
+                Violation.objects.select_for_update()
+                .filter(id__in=queryset.values('id'), status='pending')
+                .values_list('id', 'violation_type')
+            )
+            confirmed_count = Violation.objects.filter(id__in=pending).update(
+                status='confirmed',
+                confirmed_by=request.user,
+                confirmed_at=timezone.now()
+            )
             
-            # Create case if it doesn't exist
-            if not Case.objects.filter(violation=violation).exists():
-                Case.objects.create(
-                    violation=violation,
+            # Create cases for violations that don't have one yet
+            existing_cases = set(Case.objects.filter(violation_id__in=pending).values_list('violation_id', flat=True))
+            new_cases = Case.objects.bulk_create([
+                Case(
+                    violation_id=violation_id,
                     investigator=request.user,
                     status='open',
-                    notes=f"Case created from confirmed violation: {violation.violation_type}"
+                    notes=f"Case created from confirmed violation: {violation_type}"
                 )
-                cases_created += 1
+                for violation_id, violation_type in pending.items()
+                if violation_id not in existing_cases
+            ])
+            cases_created = len(new_cases)
+            
+            invalidate_violation_caches()
+            # bulk_create doesn't send the signals that bump the cases version
+            bump_data_versions_on_commit('cases')
         
         self.message_user(
             request,
@@ -68,15 +83,17 @@ class ViolationAdmin(admin.ModelAdmin):
     
     def dismiss_violations(self, request, queryset):
         """Dismiss selected violations."""
+        from django.db import transaction
         from django.utils import timezone
+        from .caching import invalidate_violation_caches
         
-        dismissed_count = 0
-        for violation in queryset.filter(status='pending'):
-            violation.status = 'dismissed'
-            violation.confirmed_by = request.user
-            violation.confirmed_at = timezone.now()
-            violation.save()
-            dismissed_count += 1
+        with transaction.atomic():
+            dismissed_count = queryset.filter(status='pending').update(
+                status='dismissed',
+                confirmed_by=request.user,
+                confirmed_at=timezone.now()
+            )
+            invalidate_violation_caches()
         
         self.message_user(
             request,
@@ -161,6 +178,24 @@ class ViolationCheckReportAdmin(admin.ModelAdmin):
             'regulated_product', 'scraped_product', 'violation_record'
         )
     
+    def save_model(self, request, obj, form, change):
+        """Save a report and move it between report counter buckets if its counted fields changed."""
+        from django.db import transaction
+        
+        with transaction.atomic():
+            deltas = queryset_deltas(ViolationCheckReport.objects.filter(pk=obj.pk)) if change else new_deltas()
+            super().save_model(request, obj, form, change)
+            add_report_instances(deltas, 1, [obj])
+            apply_deltas(deltas)
+    
+    def delete_model(self, request, obj):
+        """Delete a report and take it out of the report counters."""
+        remove_reports(ViolationCheckReport.objects.filter(pk=obj.pk))
+    
+    def delete_queryset(self, request, queryset):
+        """Delete reports and take them out of the report counters."""
+        remove_reports(queryset)
+    
     fieldsets = (
         ('Product Information', {
             'fields': ('scraped_product', 'regulated_product', 'compliance_status')
@@ -267,35 +302,32 @@ class ViolationCheckReportAdmin(admin.ModelAdmin):
     run_violation_check.short_description = "Run violation check on selected products"
     
     def export_violation_report(self, request, queryset):
-        """Export violation report for selected items."""
-        import csv
-        from django.http import HttpResponse
+        """Queue a compressed CSV export of the selected reports."""
+        from apps.reports.models import ExportJob
+        from apps.reports.tasks import run_export_job
         
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="violation_report.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Scraped Product', 'Marketplace', 'Regulated Product', 'Compliance Status',
-            'Scraped Price', 'Regulated Price', 'Price Difference', 'Percentage Difference',
-            'Violation Severity', 'Proposed Penalty', 'Check Date', 'Notes'
-        ])
-        
-        for report in queryset:
-            writer.writerow([
-                report.scraped_product.product_name,
-                report.marketplace,
-                report.regulated_product.name if report.regulated_product else 'No Match',
-                report.get_compliance_status_display(),
-                report.scraped_price,
-                report.regulated_price or 'N/A',
-                report.price_difference or 'N/A',
-                f"{report.percentage_difference}%" if report.percentage_difference else 'N/A',
-                report.get_violation_severity_display() if report.violation_severity else 'N/A',
-                report.proposed_penalty or 'N/A',
-                report.check_date.strftime('%Y-%m-%d %H:%M:%S'),
-                report.notes
-            ])
+        job = ExportJob.objects.create(
+            export_type='check_reports',
+            format='csv_gz',
+            filters={'ids': list(queryset.values_list('id', flat=True))},
+            created_by=request.user
+        )
+        run_export_job.delay(job.id)
         
-        return response
-    export_violation_report.short_description = "Export violation report to CSV"
+        job_url = reverse('admin:reports_exportjob_change', args=[job.id])
+        self.message_user(
+            request,
+            format_html(
+                'Export of {} reports queued. <a href="{}">Download it here</a> once it has completed.',
+                len(job.filters['ids']), job_url
+            )
+        )
+    export_violation_report.short_description = "Export violation report to CSV (background job)"
+
+
+@admin.register(ViolationCheckRun)
+class ViolationCheckRunAdmin(admin.ModelAdmin):
+    list_display = ['mode', 'started_at', 'completed_at', 'watermark', 'products_checked', 'violations_found']
+    list_filter = ['mode', 'started_at']
+    readonly_fields = ['mode', 'started_at', 'completed_at', 'watermark', 'products_checked', 'violations_found']
+    ordering = ['-started_at']
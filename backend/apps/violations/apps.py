@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ViolationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.violations'
+    
+    def ready(self):
+        """Import signal handlers when the app is ready."""
+        import apps.violations.signals
@@ -0,0 +1,45 @@
+"""
+Cache invalidation for violation statistics.
+Invalidation is deferred until the surrounding transaction commits, so readers
+never re-cache data that is about to change, and every change made in one
+transaction is flushed together. Values are expired rather than deleted, so
+readers keep getting the stale value while one of them refreshes it (see
+price_monitoring.caching). Each flush also bumps the 'violations' data
+version, which changes the ETag of every endpoint built on violations.
+"""
+
+import logging
+import threading
+
+from django.db import transaction
+
+from price_monitoring.caching import bump_data_versions, expire_cached
+
+logger = logging.getLogger(__name__)
+
+VIOLATION_CACHE_KEYS = ('violation_stats',)
+
+_pending = threading.local()
+
+
+def invalidate_violation_caches(keys=VIOLATION_CACHE_KEYS):
+    """Expire violation cache keys when the current transaction commits (at once outside one)."""
+    pending_keys = getattr(_pending, 'keys', None)
+    if pending_keys is None:
+        pending_keys = _pending.keys = set()
+    pending_keys.update(keys)
+    transaction.on_commit(_flush_pending_invalidations)
+
+
+def _flush_pending_invalidations():
+    """Expire every key queued in this thread; later callbacks of the same commit find nothing left."""
+    keys = getattr(_pending, 'keys', None)
+    _pending.keys = None
+    if not keys:
+        return
+
+    try:
+        expire_cached(keys)
+        bump_data_versions(('violations',))
+    except Exception as e:
+        logger.warning(f"Failed to invalidate violation caches: {str(e)}")
@@ -0,0 +1,179 @@
+"""
+Materialized counters for the full violation report.
+Check report counts (plus percentage and penalty sums, and how many
+violations have a percentage) are kept per day, marketplace, compliance
+status and severity in ViolationReportCounter. Code
+that writes or deletes check reports passes the change here, in the same
+transaction (cascade deletes are caught by the receivers in signals.py), so the report reads a few dozen counter rows instead of scanning
+every check report.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ViolationCheckReport, ViolationReportCounter
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+def new_deltas():
+    """Empty counter changes: bucket -> [report_count, percentage_count, percentage_sum, penalty_sum]."""
+    return defaultdict(lambda: [0, 0, Decimal('0'), Decimal('0')])
+
+
+def add_report_delta(deltas, sign, check_date, marketplace, compliance_status, violation_severity,
+                     percentage_difference, proposed_penalty):
+    """Count one check report in (sign=1) or out (sign=-1) of its bucket."""
+    bucket = (
+        timezone.localdate(check_date),
+        marketplace,
+        compliance_status,
+        violation_severity or '',
+    )
+    delta = deltas[bucket]
+    delta[0] += sign
+    if compliance_status == 'violation':
+        if percentage_difference is not None:
+            delta[1] += sign
+            delta[2] += sign * percentage_difference
+        delta[3] += sign * (proposed_penalty or 0)
+
+
+def add_report_instances(deltas, sign, reports):
+    """Count ViolationCheckReport instances whose scraped_product is already loaded."""
+    for report in reports:
+        add_report_delta(
+            deltas, sign, report.check_date, report.scraped_product.marketplace,
+            report.compliance_status, report.violation_severity,
+            report.percentage_difference, report.proposed_penalty
+        )
+
+
+def queryset_deltas(queryset, sign=-1):
+    """Counter changes for every report in a queryset, grouped in the database (use before deleting)."""
+    deltas = new_deltas()
+    grouped = queryset.order_by().values(
+        'compliance_status', 'violation_severity',
+        day=TruncDate('check_date'),
+        marketplace=F('scraped_product__marketplace'),
+    ).annotate(
+        report_count=Count('id'),
+        percentage_count=Count('percentage_difference'),
+        percentage_sum=Sum('percentage_difference'),
+        penalty_sum=Sum('proposed_penalty'),
+    )
+    for row in grouped:
+        bucket = (row['day'], row['marketplace'], row['compliance_status'], row['violation_severity'] or '')
+        delta = deltas[bucket]
+        delta[0] += sign * row['report_count']
+        if row['compliance_status'] == 'violation':
+            delta[1] += sign * row['percentage_count']
+            delta[2] += sign * (row['percentage_sum'] or 0)
+            delta[3] += sign * (row['penalty_sum'] or 0)
+    return deltas
+
+
+def apply_deltas(deltas):
+    """Add counter changes to the counter rows, creating missing buckets.
+
+    Buckets are updated in sorted order so concurrent writers lock rows in the
+    same order. Call inside the transaction that changes the reports.
+    """
+    changes = sorted((bucket, delta) for bucket, delta in deltas.items() if any(delta))
+    if not changes:
+        return
+
+    with transaction.atomic():
+        ViolationReportCounter.objects.bulk_create(
+            [
+                ViolationReportCounter(
+                    day=day, marketplace=marketplace,
+                    compliance_status=compliance_status, violation_severity=violation_severity
+                )
+                for (day, marketplace, compliance_status, violation_severity), delta in changes
+            ],
+            ignore_conflicts=True
+        )
+        for (day, marketplace, compliance_status, violation_severity), delta in changes:
+            ViolationReportCounter.objects.filter(
+                day=day,
+                marketplace=marketplace,
+                compliance_status=compliance_status,
+                violation_severity=violation_severity
+            ).update(
+                report_count=F('report_count') + delta[0],
+                percentage_count=F('percentage_count') + delta[1],
+                percentage_sum=F('percentage_sum') + delta[2],
+                penalty_sum=F('penalty_sum') + delta[3]
+            )
+
+
+def remove_reports(queryset):
+    """Delete check reports and take them out of the counters."""
+    with transaction.atomic():
+        deltas = queryset_deltas(queryset)
+        deleted, per_model = queryset.delete()
+        apply_deltas(deltas)
+    return deleted
+
+
+@contextmanager
+def signals_paused():
+    """Stop the delete signal receivers from updating counters (for bulk deletes that apply their own deltas)."""
+    previous = getattr(_state, 'paused', False)
+    _state.paused = True
+    try:
+        yield
+    finally:
+        _state.paused = previous
+
+
+def signals_active():
+    """Whether the delete signal receivers should update counters in this thread."""
+    return not getattr(_state, 'paused', False)
+
+
+def remove_scraped_products(queryset):
+    """Delete scraped products in bulk, taking their cascade-deleted reports out of the counters in one pass."""
+    with transaction.atomic(), signals_paused():
+        deltas = queryset_deltas(ViolationCheckReport.objects.filter(scraped_product__in=queryset))
+        deleted, per_model = queryset.delete()
+        apply_deltas(deltas)
+    return deleted
+
+
+def remove_related_reports(**filters):
+    """Take the reports matching `filters` out of the counters (they are about to be cascade-deleted)."""
+    apply_deltas(queryset_deltas(ViolationCheckReport.objects.filter(**filters)))
+
+
+def rebuild_counters():
+    """Recompute every counter from the check reports (e.g. after reports were changed by hand)."""
+    with transaction.atomic():
+        ViolationReportCounter.objects.all().delete()
+        deltas = queryset_deltas(ViolationCheckReport.objects.all(), sign=1)
+        ViolationReportCounter.objects.bulk_create([
+            ViolationReportCounter(
+                day=day,
+                marketplace=marketplace,
+                compliance_status=compliance_status,
+                violation_severity=violation_severity,
+                report_count=delta[0],
+                percentage_count=delta[1],
+                percentage_sum=delta[2],
+                penalty_sum=delta[3]
+            )
+            for (day, marketplace, compliance_status, violation_severity), delta in deltas.items()
+        ])
+    logger.info(f"Rebuilt {len(deltas)} violation report counters")
+    return len(deltas)
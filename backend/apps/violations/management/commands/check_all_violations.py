@@ -1,11 +1,16 @@
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
-from decimal import Decimal
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from concurrent.futures import ProcessPoolExecutor
 from apps.scraping.models import ScrapedProduct
 from apps.products.models import RegulatedProduct
-from apps.violations.models import Violation, ViolationCheckReport
-from apps.scraping.tasks import is_product_match
+from apps.products.matching import RegulatedProductMatcher, best_match_ids, init_match_worker, match_score
+from apps.violations.counters import add_report_instances, apply_deltas, new_deltas, remove_reports
+from apps.violations.models import ViolationCheckReport, ViolationCheckRun, ViolationReportCounter
+from apps.violations.writer import assess_violation, write_violation_checks
 import logging
+import pickle
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +34,17 @@ class Command(BaseCommand):
             type=int,
             help='Limit number of scraped products to check (for testing)',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of processes used to match scraped products (default: 1)',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only re-check products scraped, or matched to regulated products changed, since the last completed run',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(
@@ -42,22 +58,41 @@ class Command(BaseCommand):
                 self.stdout.write(f"Would clear {count} existing violation check reports")
             else:
                 count = ViolationCheckReport.objects.count()
-                ViolationCheckReport.objects.all().delete()
+                with transaction.atomic():
+                    ViolationCheckReport.objects.all().delete()
+                    ViolationReportCounter.objects.all().delete()
                 self.stdout.write(
                     self.style.WARNING(f"Cleared {count} existing violation check reports")
                 )
         
-        # Get all scraped products
-        scraped_products = ScrapedProduct.objects.all()
+        run_started_at = timezone.now()
+        watermark = None
+        if options['incremental']:
+            if options['clear_existing']:
+                raise CommandError('--incremental cannot be combined with --clear-existing')
+            watermark = ViolationCheckRun.last_watermark()
+            if watermark is None:
+                self.stdout.write('No completed run found - checking all scraped products')
+            else:
+                self.stdout.write(f"Re-checking changes since {watermark:%Y-%m-%d %H:%M:%S}")
+        
+        # Get all scraped products (or only the changed ones)
+        scraped_products = self._changed_scraped_products(watermark) if watermark else ScrapedProduct.objects.all()
         if options['limit']:
-            scraped_products = scraped_products[:options['limit']]
+            limited_ids = list(scraped_products.values_list('pk', flat=True)[:options['limit']])
+            scraped_products = ScrapedProduct.objects.filter(pk__in=limited_ids)
         
         total_scraped = scraped_products.count()
         self.stdout.write(f"Checking {total_scraped} scraped products...")
         
-        # Get all regulated products
-        regulated_products = RegulatedProduct.objects.filter(is_active=True)
-        total_regulated = regulated_products.count()
+        if watermark and total_scraped == 0:
+            self.stdout.write(self.style.SUCCESS('Nothing changed since the last run'))
+            self._record_run(options, run_started_at, watermark, 0, 0)
+            return
+        
+        # Index all active regulated products once
+        matcher = RegulatedProductMatcher.for_active_products()
+        total_regulated = len(matcher)
         self.stdout.write(f"Against {total_regulated} regulated products...")
         
         if total_scraped == 0:
@@ -76,54 +111,25 @@ class Command(BaseCommand):
             'reports_created': 0,
         }
         
-        # Process each scraped product with batch optimization
-        batch_size = 50
-        processed_count = 0
+        workers = max(1, options['workers'])
+        batch_size = 500
         
-        for i, scraped_product in enumerate(scraped_products, 1):
-            if i % 10 == 0:  # Show progress every 10 products
-                self.stdout.write(f"[{i}/{total_scraped}] Checking: {scraped_product.product_name}")
-            
-            best_match = None
-            best_match_score = 0
-            
-            # Find best matching regulated product
-            for regulated_product in regulated_products:
-                if is_product_match(scraped_product.product_name, regulated_product.name):
-                    # Calculate match score (simple scoring for now)
-                    score = self._calculate_match_score(
-                        scraped_product.product_name, 
-                        regulated_product.name
-                    )
-                    if score > best_match_score:
-                        best_match = regulated_product
-                        best_match_score = score
-            
-            # Create violation check report
-            if best_match:
-                report_data = self._create_violation_report(
-                    scraped_product, best_match, options['dry_run']
-                )
-                stats['reports_created'] += 1
-                
-                if report_data['has_violation']:
-                    stats['violations_found'] += 1
-                    if report_data.get('violation_created'):
-                        stats['new_violations_created'] += 1
-                else:
-                    stats['compliant_products'] += 1
-            else:
-                # No matching regulated product found
-                if not options['dry_run']:
-                    ViolationCheckReport.objects.create(
-                        scraped_product=scraped_product,
-                        compliance_status='no_match',
-                        notes=f"No matching regulated product found for '{scraped_product.product_name}'"
-                    )
-                stats['no_matches'] += 1
-                stats['reports_created'] += 1
-            
-            stats['total_checked'] += 1
+        pool = None
+        if workers > 1:
+            # Forked workers must not inherit open database connections
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=init_match_worker, initargs=(pickle.dumps(matcher),))
+            self.stdout.write(f"Matching with {workers} worker processes...")
+        
+        try:
+            i = 0
+            for batch in self._scraped_batches(scraped_products, batch_size):
+                i = self._check_batch(i, total_scraped, batch, matcher, pool, workers, stats, options['dry_run'], watermark)
+        finally:
+            if pool:
+                pool.shutdown()
+        
+        self._record_run(options, run_started_at, watermark, stats['total_checked'], stats['violations_found'])
         
         # Display results
         self.stdout.write('\n' + '='*60)
@@ -148,111 +154,143 @@ class Command(BaseCommand):
                 'You can now view the results in Django admin under "Violation Check Reports"'
             )
 
-    def _calculate_match_score(self, scraped_name, regulated_name):
-        """Calculate a simple match score between two product names."""
-        import difflib
-        
-        # Normalize names
-        scraped_norm = scraped_name.lower().strip()
-        regulated_norm = regulated_name.lower().strip()
+    def _changed_scraped_products(self, watermark):
+        """Scraped products that need re-checking because something changed after `watermark`."""
+        changed = (
+            Q(scraped_at__gt=watermark) |
+            Q(check_reports__regulated_product__updated_at__gt=watermark) |
+            Q(check_reports__isnull=True)
+        )
         
-        # Calculate similarity
-        similarity = difflib.SequenceMatcher(None, scraped_norm, regulated_norm).ratio()
+        # New or edited regulated products may now match previously unmatched products
+        if RegulatedProduct.objects.filter(is_active=True, updated_at__gt=watermark).exists():
+            changed |= Q(check_reports__compliance_status='no_match')
         
-        # Boost score for keyword matches
-        scraped_words = set(scraped_norm.split())
-        regulated_words = set(regulated_norm.split())
-        common_words = scraped_words.intersection(regulated_words)
+        return ScrapedProduct.objects.filter(changed).distinct()
+    
+    def _scraped_batches(self, scraped_products, batch_size):
+        """Yield scraped products in pk order, one keyset-paginated query per batch.
         
-        if common_words:
-            keyword_boost = len(common_words) / max(len(scraped_words), len(regulated_words))
-            similarity += keyword_boost * 0.3
+        Unlike iterator() this holds no server-side cursor between batches, which the
+        pooled (PgBouncer, transaction mode) database endpoint can't keep open.
+        """
+        last_pk = None
+        while True:
+            page = scraped_products.order_by('pk')
+            if last_pk is not None:
+                page = page.filter(pk__gt=last_pk)
+            batch = list(page[:batch_size])
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+            last_pk = batch[-1].pk
+    
+    def _check_batch(self, i, total_scraped, batch, matcher, pool, workers, stats, dry_run, watermark=None):
+        """Match and record one batch of scraped products; returns the updated progress counter."""
+        if not batch:
+            return i
         
-        return similarity
-
-    def _create_violation_report(self, scraped_product, regulated_product, dry_run=False):
-        """Create a violation check report for a matched product pair."""
-        violation_threshold = regulated_product.price_violation_threshold
-        scraped_price = scraped_product.listed_price
-        regulated_price = regulated_product.gov_price
+        best_matches = self._match_batch(batch, matcher, pool, workers)
         
-        # Calculate differences
-        price_difference = scraped_price - regulated_price
-        percentage_difference = (price_difference / regulated_price) * 100 if regulated_price > 0 else 0
+        pairs = []
+        unmatched = []
+        for scraped_product, best_match in zip(batch, best_matches):
+            i += 1
+            if i % 10 == 0:  # Show progress every 10 products
+                self.stdout.write(f"[{i}/{total_scraped}] Checking: {scraped_product.product_name}")
+            
+            if best_match:
+                pairs.append((scraped_product, best_match))
+            else:
+                unmatched.append(scraped_product)
         
-        # Determine compliance status
-        has_violation = scraped_price > violation_threshold
-        compliance_status = 'violation' if has_violation else 'ok'
+        with transaction.atomic():
+            if watermark and not dry_run:
+                # Replace the previous results for re-checked products
+                remove_reports(ViolationCheckReport.objects.filter(scraped_product__in=batch))
+            
+            # Create violation check reports
+            for report_data in self._create_violation_reports(pairs, dry_run):
+                if report_data['has_violation']:
+                    stats['violations_found'] += 1
+                    if report_data['violation_created']:
+                        stats['new_violations_created'] += 1
+                else:
+                    stats['compliant_products'] += 1
+            
+            # No matching regulated product found
+            if unmatched and not dry_run:
+                no_match_reports = ViolationCheckReport.objects.bulk_create([
+                    ViolationCheckReport(
+                        scraped_product=scraped_product,
+                        compliance_status='no_match',
+                        notes=f"No matching regulated product found for '{scraped_product.product_name}'"
+                    )
+                    for scraped_product in unmatched
+                ])
+                deltas = new_deltas()
+                add_report_instances(deltas, 1, no_match_reports)
+                apply_deltas(deltas)
         
-        # Calculate severity and penalty if violation
-        violation_severity = None
-        proposed_penalty = None
+        stats['no_matches'] += len(unmatched)
+        stats['reports_created'] += len(batch)
+        stats['total_checked'] += len(batch)
+        return i
+    
+    def _record_run(self, options, started_at, watermark, products_checked, violations_found):
+        """Save the run so the next incremental check starts from it (skipped for dry and limited runs)."""
+        if options['dry_run'] or options['limit']:
+            return
         
-        if has_violation:
-            if percentage_difference <= 20:
-                violation_severity = 'low'
-                proposed_penalty = Decimal('100')
-            elif percentage_difference <= 50:
-                violation_severity = 'medium'
-                proposed_penalty = Decimal('500')
-            elif percentage_difference <= 100:
-                violation_severity = 'high'
-                proposed_penalty = Decimal('1000')
-            else:
-                violation_severity = 'critical'
-                proposed_penalty = Decimal('2000')
+        ViolationCheckRun.objects.create(
+            mode='incremental' if watermark else 'full',
+            started_at=started_at,
+            completed_at=timezone.now(),
+            watermark=watermark,
+            products_checked=products_checked,
+            violations_found=violations_found
+        )
+    
+    def _match_batch(self, batch, matcher, pool=None, workers=1):
+        """Best-matching regulated product (or None) for each scraped product in a batch.
         
-        # Create notes
-        notes = f"Scraped: Rs.{scraped_price} | Regulated: Rs.{regulated_price} | "
-        notes += f"Difference: Rs.{price_difference} ({percentage_difference:.1f}%)"
+        Candidates come from the matcher's inverted indexes (see RegulatedProductMatcher.fuzzy_matches),
+        and each distinct name is matched once, however many products share it.
+        """
+        if not batch:
+            return []
         
-        if has_violation:
-            notes += f" | Severity: {violation_severity} | Penalty: Rs.{proposed_penalty}"
+        names = list(dict.fromkeys(scraped_product.product_name for scraped_product in batch))
         
-        violation_created = False
+        if pool is None:
+            best_by_name = {name: matcher.best_match(name)[0] for name in names}
+        else:
+            chunk_size = -(-len(names) // workers)
+            chunks = [names[k:k + chunk_size] for k in range(0, len(names), chunk_size)]
+            
+            regulated_by_id = {product.pk: product for product in matcher.products}
+            best_ids = [best_id for chunk_ids in pool.map(best_match_ids, chunks) for best_id in chunk_ids]
+            best_by_name = {name: regulated_by_id.get(best_id) for name, best_id in zip(names, best_ids)}
         
+        return [best_by_name[scraped_product.product_name] for scraped_product in batch]
+    
+    def _calculate_match_score(self, scraped_name, regulated_name):
+        """Calculate a simple match score between two product names."""
+        return match_score(scraped_name, regulated_name)
+
+    def _create_violation_reports(self, pairs, dry_run=False):
+        """Create violation check reports for matched (scraped, regulated) product pairs."""
         if not dry_run:
-            # Create or update violation check report
-            report, created = ViolationCheckReport.objects.get_or_create(
-                regulated_product=regulated_product,
-                scraped_product=scraped_product,
-                defaults={
-                    'has_violation': has_violation,
-                    'compliance_status': compliance_status,
-                    'price_difference': price_difference,
-                    'percentage_difference': Decimal(str(round(percentage_difference, 2))),
-                    'violation_severity': violation_severity,
-                    'proposed_penalty': proposed_penalty,
-                    'notes': notes,
-                }
-            )
-            
-            # Create violation record if needed
-            if has_violation:
-                violation, violation_created = Violation.objects.get_or_create(
-                    regulated_product=regulated_product,
-                    scraped_product=scraped_product,
-                    status='pending',
-                    defaults={
-                        'violation_type': 'price_exceeded',
-                        'severity': violation_severity,
-                        'proposed_penalty': proposed_penalty,
-                        'notes': notes,
-                    }
-                )
-                
-                if violation_created:
-                    report.violation_record = violation
-                    report.save()
-        else:
-            # Dry run - just show what would be created
-            self.stdout.write(f"  Would create report: {compliance_status}")
-            if has_violation:
-                self.stdout.write(f"  Would create violation: {violation_severity} severity")
-                violation_created = True
+            return write_violation_checks(pairs)
         
-        return {
-            'has_violation': has_violation,
-            'compliance_status': compliance_status,
-            'violation_created': violation_created,
-        }
+        # Dry run - just show what would be created
+        results = []
+        for scraped_product, regulated_product in pairs:
+            report_data = assess_violation(scraped_product, regulated_product)
+            self.stdout.write(f"  Would create report: {report_data['compliance_status']}")
+            if report_data['has_violation']:
+                self.stdout.write(f"  Would create violation: {report_data['violation_severity']} severity")
+            report_data['violation_created'] = report_data['has_violation']
+            results.append(report_data)
+        return results
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from apps.violations.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized violation report counters from the check reports'
+
+    def handle(self, *args, **options):
+        buckets = rebuild_counters()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt violation report counters ({buckets} buckets)")
+        )
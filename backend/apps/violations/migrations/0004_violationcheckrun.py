@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:24
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('violations', '0003_add_performance_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViolationCheckRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental')], max_length=20)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('watermark', models.DateTimeField(blank=True, help_text='Changes after this time were re-checked (incremental runs only)', null=True)),
+                ('products_checked', models.PositiveIntegerField(default=0)),
+                ('violations_found', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:32
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def populate_counters(apps, schema_editor):
+    """Fill the counters from the check reports that already exist."""
+    ViolationCheckReport = apps.get_model('violations', 'ViolationCheckReport')
+    ViolationReportCounter = apps.get_model('violations', 'ViolationReportCounter')
+    
+    grouped = ViolationCheckReport.objects.order_by().values(
+        'compliance_status', 'violation_severity',
+        day=TruncDate('check_date'),
+        marketplace=F('scraped_product__marketplace'),
+    ).annotate(
+        report_count=Count('id'),
+        percentage_sum=Sum('percentage_difference'),
+        penalty_sum=Sum('proposed_penalty'),
+    )
+    ViolationReportCounter.objects.bulk_create([
+        ViolationReportCounter(
+            day=row['day'],
+            marketplace=row['marketplace'],
+            compliance_status=row['compliance_status'],
+            violation_severity=row['violation_severity'] or '',
+            report_count=row['report_count'],
+            percentage_sum=(row['percentage_sum'] or 0) if row['compliance_status'] == 'violation' else 0,
+            penalty_sum=(row['penalty_sum'] or 0) if row['compliance_status'] == 'violation' else 0,
+        )
+        for row in grouped
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('violations', '0004_violationcheckrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViolationReportCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('marketplace', models.CharField(max_length=50)),
+                ('compliance_status', models.CharField(choices=[('ok', 'Compliant'), ('violation', 'Violation'), ('no_match', 'No Matching Regulated Product')], max_length=20)),
+                ('violation_severity', models.CharField(blank=True, default='', max_length=20)),
+                ('report_count', models.IntegerField(default=0)),
+                ('percentage_sum', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('penalty_sum', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='violationcheckreport',
+            index=models.Index(fields=['has_violation', 'percentage_difference'], name='violations__has_vio_fdd759_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='violationreportcounter',
+            unique_together={('day', 'marketplace', 'compliance_status', 'violation_severity')},
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
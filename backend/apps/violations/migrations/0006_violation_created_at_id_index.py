@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('violations', '0005_violationreportcounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='violation',
+            index=models.Index(fields=['created_at', 'id'], name='violations__created_be6d1e_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:32
+
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+
+
+def populate_percentage_counts(apps, schema_editor):
+    """Count the violations with a percentage in each existing counter bucket."""
+    ViolationCheckReport = apps.get_model('violations', 'ViolationCheckReport')
+    ViolationReportCounter = apps.get_model('violations', 'ViolationReportCounter')
+    
+    grouped = ViolationCheckReport.objects.filter(compliance_status='violation').order_by().values(
+        'compliance_status', 'violation_severity',
+        day=TruncDate('check_date'),
+        marketplace=F('scraped_product__marketplace'),
+    ).annotate(
+        percentage_count=Count('percentage_difference'),
+    )
+    for row in grouped:
+        ViolationReportCounter.objects.filter(
+            day=row['day'],
+            marketplace=row['marketplace'],
+            compliance_status=row['compliance_status'],
+            violation_severity=row['violation_severity'] or '',
+        ).update(percentage_count=row['percentage_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('violations', '0006_violation_created_at_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='violationreportcounter',
+            name='percentage_count',
+            field=models.IntegerField(default=0, help_text='Violations counted in percentage_sum (their percentage is set)'),
+        ),
+        migrations.RunPython(populate_percentage_counts, migrations.RunPython.noop),
+    ]
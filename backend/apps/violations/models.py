@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import ExpressionWrapper, F, Value
+from django.db.models.functions import Coalesce, NullIf
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from decimal import Decimal
@@ -62,6 +64,7 @@ class Violation(models.Model):
         indexes = [
             models.Index(fields=['status', 'severity']),
             models.Index(fields=['regulated_product', 'status']),
+            models.Index(fields=['created_at', 'id']),
         ]
     
     def __str__(self):
@@ -79,49 +82,77 @@ class Violation(models.Model):
             return (self.price_difference / self.regulated_product.gov_price) * 100
         return 0
     
+    @staticmethod
+    def price_difference_expression():
+        """price_difference computed in SQL, for values() and annotate()."""
+        return ExpressionWrapper(
+            F('scraped_product__listed_price') - F('regulated_product__gov_price'),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2)
+        )
+    
+    @staticmethod
+    def percentage_over_expression():
+        """percentage_over computed in SQL (0 when the regulated price is 0)."""
+        return Coalesce(
+            ExpressionWrapper(
+                (F('scraped_product__listed_price') - F('regulated_product__gov_price')) * 100 /
+                NullIf(F('regulated_product__gov_price'), 0),
+                output_field=models.DecimalField(max_digits=12, decimal_places=4)
+            ),
+            Value(Decimal('0')),
+            output_field=models.DecimalField(max_digits=12, decimal_places=4)
+        )
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded field values so save() can spot status changes without a query."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
     def save(self, *args, **kwargs):
         """Override save to automatically create cases when status changes to confirmed."""
-        from django.core.cache import cache
+        from .caching import invalidate_violation_caches
         
         # Check if this is an update and status is changing to 'confirmed'
         if self.pk:  # This is an update, not a new creation
-            try:
-                old_violation = Violation.objects.get(pk=self.pk)
-                old_status = old_violation.status
+            old_status = self._loaded_status()
+            
+            # If status is changing from something else to 'confirmed'
+            if old_status is not None and old_status != 'confirmed' and self.status == 'confirmed':
+                # Set confirmed_by and confirmed_at if not already set
+                if not self.confirmed_by_id:
+                    # This is a fallback - ideally this should be set by the admin/API
+                    from django.contrib.auth import get_user_model
+                    User = get_user_model()
+                    self.confirmed_by = User.objects.filter(role='admin').first()
+                
+                if not self.confirmed_at:
+                    self.confirmed_at = timezone.now()
                 
-                # If status is changing from something else to 'confirmed'
-                if old_status != 'confirmed' and self.status == 'confirmed':
-                    # Set confirmed_by and confirmed_at if not already set
-                    if not self.confirmed_by:
-                        # Try to get the current user from the request context
-                        # This is a fallback - ideally this should be set by the admin/API
-                        from django.contrib.auth import get_user_model
-                        User = get_user_model()
-                        admin_user = User.objects.filter(role='admin').first()
-                        if admin_user:
-                            self.confirmed_by = admin_user
-                    
-                    if not self.confirmed_at:
-                        self.confirmed_at = timezone.now()
-                    
-                    # Create case if it doesn't exist
-                    from apps.cases.models import Case
-                    if not Case.objects.filter(violation=self).exists():
-                        investigator = self.confirmed_by if self.confirmed_by else admin_user
-                        Case.objects.create(
-                            violation=self,
-                            investigator=investigator,
-                            status='open',
-                            notes=f"Case created from confirmed violation: {self.violation_type}"
-                        )
-            except Violation.DoesNotExist:
-                pass  # This is a new violation, no old status to compare
+                # Create case if it doesn't exist
+                from apps.cases.models import Case
+                if not Case.objects.filter(violation=self).exists():
+                    Case.objects.create(
+                        violation=self,
+                        investigator_id=self.confirmed_by_id,
+                        status='open',
+                        notes=f"Case created from confirmed violation: {self.violation_type}"
+                    )
         
         super().save(*args, **kwargs)
+        self._loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
         
         # Invalidate cache when violations are updated
-        cache.delete('full_violation_report')
-        cache.delete('violation_stats')
+        invalidate_violation_caches()
+    
+    def _loaded_status(self):
+        """Status as last loaded from or saved to the database (None if the row doesn't exist)."""
+        loaded_values = getattr(self, '_loaded_values', None)
+        if loaded_values and 'status' in loaded_values:
+            return loaded_values['status']
+        # Instance wasn't loaded with its status (e.g. built by hand or deferred)
+        return Violation.objects.filter(pk=self.pk).values_list('status', flat=True).first()
 
 
 class ViolationCheckReport(models.Model):
@@ -194,6 +225,7 @@ class ViolationCheckReport(models.Model):
             models.Index(fields=['compliance_status', 'check_date']),
             models.Index(fields=['scraped_product', 'check_date']),
             models.Index(fields=['has_violation', 'check_date']),
+            models.Index(fields=['has_violation', 'percentage_difference']),
         ]
         unique_together = ['regulated_product', 'scraped_product']
     
@@ -221,3 +253,55 @@ class ViolationCheckReport(models.Model):
     def seller_name(self):
         """Get seller name from scraped product."""
         return self.scraped_product.seller_name
+
+
+class ViolationCheckRun(models.Model):
+    """A run of the check_all_violations command; completed runs are the watermark for incremental checks."""
+    
+    MODE_CHOICES = [
+        ('full', 'Full'),
+        ('incremental', 'Incremental'),
+    ]
+    
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES)
+    started_at = models.DateTimeField(default=timezone.now)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    watermark = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Changes after this time were re-checked (incremental runs only)"
+    )
+    products_checked = models.PositiveIntegerField(default=0)
+    violations_found = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-started_at']
+    
+    def __str__(self):
+        return f"{self.get_mode_display()} check - {self.started_at:%Y-%m-%d %H:%M}"
+    
+    @classmethod
+    def last_watermark(cls):
+        """Start time of the last completed run, or None if no run has completed."""
+        last_run = cls.objects.filter(completed_at__isnull=False).order_by('-started_at').first()
+        return last_run.started_at if last_run else None
+
+
+class ViolationReportCounter(models.Model):
+    """Materialized check report counts behind the full violation report, kept current as reports change."""
+    
+    day = models.DateField()
+    marketplace = models.CharField(max_length=50)
+    compliance_status = models.CharField(max_length=20, choices=ViolationCheckReport.COMPLIANCE_STATUS_CHOICES)
+    violation_severity = models.CharField(max_length=20, blank=True, default='')
+    report_count = models.IntegerField(default=0)
+    percentage_count = models.IntegerField(default=0, help_text="Violations counted in percentage_sum (their percentage is set)")
+    percentage_sum = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    penalty_sum = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    
+    class Meta:
+        ordering = ['-day']
+        unique_together = ['day', 'marketplace', 'compliance_status', 'violation_severity']
+    
+    def __str__(self):
+        return f"{self.day} {self.marketplace} {self.compliance_status} {self.violation_severity} - {self.report_count}"
@@ -3,6 +3,7 @@ from .models import Violation
 from apps.products.serializers import RegulatedProductSerializer
 from apps.scraping.serializers import ScrapedProductSerializer
 from apps.accounts.serializers import UserSerializer
+from price_monitoring.flat_lists import SparseFieldsMixin
 
 
 class ViolationSerializer(serializers.ModelSerializer):
@@ -28,6 +29,38 @@ class ViolationSerializer(serializers.ModelSerializer):
         ]
 
 
+class ViolationListSerializer(SparseFieldsMixin, serializers.Serializer):
+    """Compact violation rows for the list endpoint (flat values, nested objects only on ?expand=)."""
+    
+    id = serializers.IntegerField()
+    regulated_product_id = serializers.IntegerField()
+    regulated_product_name = serializers.CharField()
+    gov_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    scraped_product_id = serializers.IntegerField()
+    scraped_product_name = serializers.CharField()
+    marketplace = serializers.CharField()
+    listed_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    product_url = serializers.CharField()
+    violation_type = serializers.CharField()
+    severity = serializers.CharField()
+    proposed_penalty = serializers.DecimalField(max_digits=10, decimal_places=2)
+    status = serializers.CharField()
+    notes = serializers.CharField()
+    confirmed_by_id = serializers.IntegerField()
+    confirmed_by_name = serializers.CharField()
+    confirmed_at = serializers.DateTimeField()
+    price_difference = serializers.FloatField()
+    percentage_over = serializers.FloatField()
+    created_at = serializers.DateTimeField()
+    
+    regulated_product = RegulatedProductSerializer(read_only=True)
+    scraped_product = ScrapedProductSerializer(read_only=True)
+    confirmed_by = UserSerializer(read_only=True)
+    
+    class Meta:
+        expandable_fields = ['regulated_product', 'scraped_product', 'confirmed_by']
+
+
 class ViolationUpdateSerializer(serializers.ModelSerializer):
     """Serializer for updating violation status and notes."""
     
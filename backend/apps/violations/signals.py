@@ -0,0 +1,35 @@
+"""
+Signal handlers for deletes that cascade to violations and their check reports.
+Keeps the report counters in step when scraped or regulated products go away,
+and expires violation caches when violations are deleted.
+"""
+
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from apps.products.models import RegulatedProduct
+from apps.scraping.models import ScrapedProduct
+
+from .caching import invalidate_violation_caches
+from .counters import remove_related_reports, signals_active
+from .models import Violation
+
+
+@receiver(pre_delete, sender=ScrapedProduct)
+def scraped_product_pre_delete(sender, instance, **kwargs):
+    """Keep report counters right when a scraped product's reports are cascade-deleted."""
+    if signals_active():
+        remove_related_reports(scraped_product=instance)
+
+
+@receiver(pre_delete, sender=RegulatedProduct)
+def regulated_product_pre_delete(sender, instance, **kwargs):
+    """Keep report counters right when a regulated product's reports are cascade-deleted."""
+    if signals_active():
+        remove_related_reports(regulated_product=instance)
+
+
+@receiver(post_delete, sender=Violation)
+def violation_post_delete(sender, instance, **kwargs):
+    """Expire violation statistics when a violation is deleted, directly or by cascade."""
+    invalidate_violation_caches()
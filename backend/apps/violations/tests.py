@@ -0,0 +1,174 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import User
+from apps.cases.models import Case
+from apps.products.models import RegulatedProduct
+from apps.scraping.models import ScrapedProduct
+from apps.violations.counters import rebuild_counters
+from apps.violations.models import Violation, ViolationCheckReport
+
+
+class FullViolationReportTests(APITestCase):
+    """Pins the aggregates of the full violation report to a known set of check reports."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='regulator', email='regulator@example.com', password='pass',
+            name='Regulator', role='regulator'
+        )
+        regulated = RegulatedProduct.objects.create(
+            name='Sugar 1 kg', category='Food', gov_price=Decimal('100.00'), unit='kg'
+        )
+
+        # marketplace, compliance status, severity, percentage over, penalty, days old
+        rows = [
+            ('amazon', 'violation', 'high', '50.00', '5000.00', 0),
+            ('amazon', 'violation', 'medium', '20.00', '1000.00', 1),
+            ('amazon', 'ok', None, None, None, 2),
+            ('ebay', 'violation', 'high', '80.00', '8000.00', 10),
+            ('ebay', 'no_match', None, None, None, 0),
+            ('ebay', 'ok', None, None, None, 10),
+            # A violation without a percentage is left out of the average
+            ('ebay', 'violation', 'low', None, '500.00', 1),
+        ]
+        for i, (marketplace, compliance_status, severity, percentage, penalty, days_old) in enumerate(rows):
+            scraped = ScrapedProduct.objects.create(
+                product_name=f'Sugar pack {i}', marketplace=marketplace, search_query='sugar',
+                listed_price=Decimal('100.00') + Decimal(percentage or 0), url=f'https://example.com/sugar-{i}'
+            )
+            report = ViolationCheckReport.objects.create(
+                regulated_product=None if compliance_status == 'no_match' else regulated,
+                scraped_product=scraped,
+                has_violation=compliance_status == 'violation',
+                compliance_status=compliance_status,
+                percentage_difference=percentage and Decimal(percentage),
+                violation_severity=severity,
+                proposed_penalty=penalty and Decimal(penalty),
+            )
+            ViolationCheckReport.objects.filter(pk=report.pk).update(
+                check_date=timezone.now() - timedelta(days=days_old)
+            )
+
+        rebuild_counters()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def test_report_aggregates(self):
+        response = self.client.get(reverse('full_violation_report'))
+        self.assertEqual(response.status_code, 200)
+        report = response.data
+
+        self.assertEqual(report['summary'], {
+            'total_products_checked': 7,
+            'violations_found': 4,
+            'compliant_products': 2,
+            'no_matching_regulated_product': 1,
+            'violation_rate': 57.14,
+        })
+        self.assertEqual(report['violation_breakdown'], {
+            'by_severity': [
+                {'violation_severity': 'high', 'count': 2},
+                {'violation_severity': 'low', 'count': 1},
+                {'violation_severity': 'medium', 'count': 1},
+            ],
+            'by_marketplace': [
+                {'scraped_product__marketplace': 'amazon', 'total': 3, 'violations': 2, 'compliant': 1, 'no_match': 0},
+                {'scraped_product__marketplace': 'ebay', 'total': 4, 'violations': 2, 'compliant': 1, 'no_match': 1},
+            ],
+        })
+        self.assertEqual(report['price_statistics'], {
+            'average_violation_percentage': 50.0,
+            'maximum_violation_percentage': 80.0,
+            'total_proposed_penalties': 14500.0,
+        })
+        self.assertEqual(report['recent_activity'], {
+            'last_7_days_violations': 3,
+            'last_7_days_compliant': 1,
+        })
+        # Where the violation without a percentage sorts depends on the database
+        self.assertEqual(len(report['top_violators']), 4)
+        ranked = [row for row in report['top_violators'] if row['severity'] != 'low']
+        self.assertEqual([row['percentage_over'] for row in ranked], [80.0, 50.0, 20.0])
+        self.assertEqual(ranked[0], {
+            'scraped_product': 'Sugar pack 3',
+            'marketplace': 'ebay',
+            'regulated_product': 'Sugar 1 kg',
+            'scraped_price': 180.0,
+            'regulated_price': 100.0,
+            'percentage_over': 80.0,
+            'severity': 'high',
+            'proposed_penalty': 8000.0,
+        })
+
+    def test_last_7_days_is_today_and_the_six_days_before(self):
+        ViolationCheckReport.objects.filter(compliance_status='violation').update(
+            check_date=timezone.now() - timedelta(days=7)
+        )
+        rebuild_counters()
+
+        response = self.client.get(reverse('full_violation_report'))
+        self.assertEqual(response.data['recent_activity']['last_7_days_violations'], 0)
+
+
+class ConfirmViolationsActionTests(TestCase):
+    """The admin's confirm action opens cases only for the violations it confirmed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass', name='Admin', role='admin'
+        )
+        regulated = RegulatedProduct.objects.create(
+            name='Sugar 1 kg', category='Food', gov_price=Decimal('100.00'), unit='kg'
+        )
+        cls.violations = {}
+        for i, status in enumerate(['pending', 'pending', 'confirmed', 'dismissed']):
+            scraped = ScrapedProduct.objects.create(
+                product_name=f'Sugar pack {i}', marketplace='amazon', search_query='sugar',
+                listed_price=Decimal('150.00'), url=f'https://example.com/sugar-{i}'
+            )
+            cls.violations[i] = Violation.objects.create(
+                regulated_product=regulated, scraped_product=scraped, violation_type='price_exceeded',
+                severity='high', proposed_penalty=Decimal('5000.00'), status=status
+            )
+
+    def confirm(self, violations):
+        request = RequestFactory().post('/admin/violations/violation/')
+        request.user = self.admin
+        model_admin = admin.site._registry[Violation]
+        queryset = Violation.objects.filter(pk__in=[violation.pk for violation in violations])
+        with mock.patch.object(model_admin, 'message_user'):
+            model_admin.confirm_violations(request, queryset)
+
+    def test_confirms_pending_violations_and_opens_their_cases(self):
+        self.confirm(self.violations.values())
+
+        self.assertEqual(
+            sorted(Violation.objects.filter(status='confirmed').values_list('pk', flat=True)),
+            [self.violations[0].pk, self.violations[1].pk, self.violations[2].pk]
+        )
+        self.assertEqual(
+            sorted(Case.objects.values_list('violation_id', flat=True)),
+            [self.violations[0].pk, self.violations[1].pk]
+        )
+
+    def test_confirming_again_opens_no_more_cases(self):
+        self.confirm([self.violations[0]])
+        self.confirm([self.violations[0], self.violations[1]])
+
+        self.assertEqual(
+            sorted(Case.objects.values_list('violation_id', flat=True)),
+            [self.violations[0].pk, self.violations[1].pk]
+        )
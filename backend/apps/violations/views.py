@@ -1,27 +1,66 @@
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q, Count, Avg, Max, Sum
-from django.db import models
+from django.db.models import Q, Count, Sum
 from django.utils import timezone
+from collections import Counter
 
-from .models import Violation, ViolationCheckReport
-from .serializers import ViolationSerializer, ViolationUpdateSerializer
+from .models import Violation, ViolationCheckReport, ViolationReportCounter
+from .serializers import ViolationSerializer, ViolationListSerializer, ViolationUpdateSerializer
+from apps.accounts.models import User
+from apps.products.models import RegulatedProduct
+from apps.scraping.models import ScrapedProduct
 from apps.cases.models import Case
+from price_monitoring.conditional import conditional_response
+from price_monitoring.flat_lists import FlatListMixin
+from price_monitoring.pagination import OptionalCursorPagination
+from price_monitoring.query_budget import QueryBudgetMixin, query_budget
 
 
-class ViolationListView(generics.ListAPIView):
-    """List violations with filtering."""
+class ViolationListView(QueryBudgetMixin, FlatListMixin, generics.ListAPIView):
+    """List violations with filtering.
     
-    serializer_class = ViolationSerializer
+    Rows are flat; ?fields= picks columns and ?expand=regulated_product,scraped_product,confirmed_by
+    adds the nested objects the detail endpoint returns.
+    """
+    
+    serializer_class = ViolationListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ('-created_at', '-id')
+    # Authentication, count, page and one query per expansion
+    query_budget = 6
+    list_values = {
+        'id': 'id',
+        'regulated_product_id': 'regulated_product_id',
+        'regulated_product_name': 'regulated_product__name',
+        'gov_price': 'regulated_product__gov_price',
+        'scraped_product_id': 'scraped_product_id',
+        'scraped_product_name': 'scraped_product__product_name',
+        'marketplace': 'scraped_product__marketplace',
+        'listed_price': 'scraped_product__listed_price',
+        'product_url': 'scraped_product__url',
+        'violation_type': 'violation_type',
+        'severity': 'severity',
+        'proposed_penalty': 'proposed_penalty',
+        'status': 'status',
+        'notes': 'notes',
+        'confirmed_by_id': 'confirmed_by_id',
+        'confirmed_by_name': 'confirmed_by__name',
+        'confirmed_at': 'confirmed_at',
+        'price_difference': Violation.price_difference_expression(),
+        'percentage_over': Violation.percentage_over_expression(),
+        'created_at': 'created_at',
+    }
+    expand_loaders = {
+        'regulated_product': ('regulated_product_id', RegulatedProduct.objects.in_bulk),
+        'scraped_product': ('scraped_product_id', ScrapedProduct.objects.select_related('website').in_bulk),
+        'confirmed_by': ('confirmed_by_id', User.objects.in_bulk),
+    }
     
     def get_queryset(self):
-        queryset = Violation.objects.select_related(
-            'regulated_product', 'scraped_product', 'confirmed_by'
-        ).prefetch_related(
-            'case__case_notes__author'
-        ).all()
+        # Rows are read with values() (see list_values), so no related objects are loaded here
+        queryset = Violation.objects.all()
         
         # Filter by status
         status_filter = self.request.query_params.get('status')
@@ -54,14 +93,15 @@ class ViolationListView(generics.ListAPIView):
         return queryset
 
 
-class ViolationDetailView(generics.RetrieveUpdateAPIView):
+class ViolationDetailView(QueryBudgetMixin, generics.RetrieveUpdateAPIView):
     """Retrieve and update a violation."""
     
     queryset = Violation.objects.select_related(
-        'regulated_product', 'scraped_product', 'confirmed_by'
+        'regulated_product', 'scraped_product__website', 'confirmed_by'
     ).all()
     serializer_class = ViolationUpdateSerializer
     permission_classes = [permissions.IsAuthenticated]
+    query_budget = 8
     
     def get_serializer_class(self):
         if self.request.method == 'GET':
@@ -73,7 +113,7 @@ class ViolationDetailView(generics.RetrieveUpdateAPIView):
         if not self.request.user.is_investigator:
             raise permissions.PermissionDenied("Only investigators can update violations.")
         
-        violation = self.get_object()
+        violation = serializer.instance
         
         # If confirming violation, create a case
         if serializer.validated_data.get('status') == 'confirmed':
@@ -180,11 +220,20 @@ def dismiss_violation_view(request, violation_id):
         )
 
 
+@query_budget(6)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def violation_stats_view(request):
     """Get violation statistics."""
     
+    # Cached for 5 minutes and expired whenever violations change (see caching.py);
+    # clients holding the current ETag get a 304 without the stats being read
+    return conditional_response(request, 'violation_stats', ['violations'], compute_violation_stats, timeout=300)
+
+
+def compute_violation_stats():
+    """Aggregate the violation statistics served by violation_stats_view."""
+    
     # Total violations
     total_violations = Violation.objects.count()
     
@@ -206,54 +255,83 @@ def violation_stats_view(request):
     # Pending violations
     pending_violations = Violation.objects.filter(status='pending').count()
     
-    return Response({
+    return {
         'total_violations': total_violations,
         'status_stats': list(status_stats),
         'severity_stats': list(severity_stats),
         'recent_violations': recent_violations,
         'pending_violations': pending_violations,
-    })
+    }
 
 
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def full_violation_report_view(request):
     """Get comprehensive violation report with all product comparisons."""
     
-    from django.core.cache import cache
-    
-    # Try to get cached report first
-    cache_key = 'full_violation_report'
-    cached_report = cache.get(cache_key)
-    
-    if cached_report:
-        return Response(cached_report)
+    # Summary figures come from the materialized counters (see counters.py).
+    # Counters are per local day, so "last 7 days" is today plus the 6 days before it
+    recent_day = timezone.localdate() - timezone.timedelta(days=6)
+    counters = ViolationReportCounter.objects.order_by().values(
+        'marketplace', 'compliance_status', 'violation_severity'
+    ).annotate(
+        total_count=Sum('report_count'),
+        percentage_count=Sum('percentage_count'),
+        total_percentage=Sum('percentage_sum'),
+        total_penalty=Sum('penalty_sum'),
+        recent_count=Sum('report_count', filter=Q(day__gte=recent_day)),
+    )
     
-    # Get all violation check reports with optimized queries
-    reports = ViolationCheckReport.objects.select_related(
-        'regulated_product', 'scraped_product'
-    ).prefetch_related(
-        'violation_record'
-    ).all()
+    totals = Counter()
+    severity_totals = Counter()
+    marketplace_totals = {}
+    percentage_count = 0
+    percentage_sum = 0
+    total_penalty_amount = 0
+    for row in counters:
+        compliance_status = row['compliance_status']
+        totals[compliance_status] += row['total_count']
+        totals[f'recent_{compliance_status}'] += row['recent_count'] or 0
+        
+        marketplace = marketplace_totals.setdefault(row['marketplace'], Counter())
+        marketplace[compliance_status] += row['total_count']
+        
+        if compliance_status == 'violation':
+            severity_totals[row['violation_severity']] += row['total_count']
+            percentage_count += row['percentage_count']
+            percentage_sum += row['total_percentage']
+            total_penalty_amount += row['total_penalty']
     
     # Basic statistics
-    total_reports = reports.count()
-    violations_found = reports.filter(has_violation=True).count()
-    compliant_products = reports.filter(compliance_status='ok').count()
-    no_matches = reports.filter(compliance_status='no_match').count()
+    violations_found = totals['violation']
+    compliant_products = totals['ok']
+    no_matches = totals['no_match']
+    total_reports = violations_found + compliant_products + no_matches
     
     # Violation severity breakdown
-    severity_stats = reports.filter(has_violation=True).values('violation_severity').annotate(
-        count=Count('id')
-    ).order_by('violation_severity')
+    severity_stats = [
+        {'violation_severity': severity or None, 'count': count}
+        for severity, count in sorted(severity_totals.items())
+        if count
+    ]
     
     # Marketplace breakdown
-    marketplace_stats = reports.values('scraped_product__marketplace').annotate(
-        total=Count('id'),
-        violations=Count('id', filter=Q(has_violation=True)),
-        compliant=Count('id', filter=Q(compliance_status='ok')),
-        no_match=Count('id', filter=Q(compliance_status='no_match'))
-    ).order_by('scraped_product__marketplace')
+    marketplace_stats = [
+        {
+            'scraped_product__marketplace': marketplace,
+            'total': counts['violation'] + counts['ok'] + counts['no_match'],
+            'violations': counts['violation'],
+            'compliant': counts['ok'],
+            'no_match': counts['no_match'],
+        }
+        for marketplace, counts in sorted(marketplace_totals.items())
+        if sum(counts.values())
+    ]
+    
+    reports = ViolationCheckReport.objects.select_related(
+        'regulated_product', 'scraped_product'
+    )
     
     # Top violating products
     top_violators = reports.filter(has_violation=True).order_by('-percentage_difference')[:10]
@@ -270,31 +348,13 @@ def full_violation_report_view(request):
             'proposed_penalty': float(report.proposed_penalty) if report.proposed_penalty else None,
         })
     
-    # Price statistics
-    violation_reports = reports.filter(has_violation=True)
-    if violation_reports.exists():
-        avg_violation_percentage = violation_reports.aggregate(
-            avg_pct=models.Avg('percentage_difference')
-        )['avg_pct'] or 0
-        
-        max_violation_percentage = violation_reports.aggregate(
-            max_pct=models.Max('percentage_difference')
-        )['max_pct'] or 0
-        
-        total_penalty_amount = violation_reports.aggregate(
-            total_penalty=models.Sum('proposed_penalty')
-        )['total_penalty'] or 0
-    else:
-        avg_violation_percentage = 0
-        max_violation_percentage = 0
-        total_penalty_amount = 0
+    # Price statistics (the top violator has the highest percentage); violations without a percentage aren't averaged
+    avg_violation_percentage = percentage_sum / percentage_count if percentage_count else 0
+    max_violation_percentage = top_violators_data[0]['percentage_over'] if top_violators_data else 0
     
     # Recent activity (last 7 days)
-    recent_reports = reports.filter(
-        check_date__gte=timezone.now() - timezone.timedelta(days=7)
-    )
-    recent_violations = recent_reports.filter(has_violation=True).count()
-    recent_compliant = recent_reports.filter(compliance_status='ok').count()
+    recent_violations = totals['recent_violation']
+    recent_compliant = totals['recent_ok']
     
     report_data = {
         'summary': {
@@ -321,7 +381,4 @@ def full_violation_report_view(request):
         'generated_at': timezone.now().isoformat(),
     }
     
-    # Cache the report for 5 minutes
-    cache.set(cache_key, report_data, 300)
-    
     return Response(report_data)
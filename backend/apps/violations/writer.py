@@ -0,0 +1,192 @@
+"""
+Batch writer for violation check results.
+Takes (scraped product, regulated product) pairs, works out compliance in
+memory and saves the reports and violations with a handful of set-based
+queries instead of several queries per pair.
+"""
+
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+
+from .caching import invalidate_violation_caches
+from .counters import add_report_delta, add_report_instances, apply_deltas, new_deltas
+from .models import Violation, ViolationCheckReport
+
+logger = logging.getLogger(__name__)
+
+# Report fields refreshed when a pair has already been checked
+REPORT_UPDATE_FIELDS = [
+    'has_violation', 'compliance_status', 'price_difference', 'percentage_difference',
+    'violation_severity', 'proposed_penalty', 'notes',
+]
+
+
+def assess_violation(scraped_product, regulated_product):
+    """Compare a scraped price with the regulated price; returns the report values."""
+    violation_threshold = regulated_product.price_violation_threshold
+    scraped_price = scraped_product.listed_price
+    regulated_price = regulated_product.gov_price
+
+    # Calculate differences
+    price_difference = scraped_price - regulated_price
+    percentage_difference = (price_difference / regulated_price) * 100 if regulated_price > 0 else 0
+
+    # Determine compliance status
+    has_violation = scraped_price > violation_threshold
+    compliance_status = 'violation' if has_violation else 'ok'
+
+    # Calculate severity and penalty if violation
+    violation_severity = None
+    proposed_penalty = None
+
+    if has_violation:
+        if percentage_difference <= 20:
+            violation_severity = 'low'
+            proposed_penalty = Decimal('100')
+        elif percentage_difference <= 50:
+            violation_severity = 'medium'
+            proposed_penalty = Decimal('500')
+        elif percentage_difference <= 100:
+            violation_severity = 'high'
+            proposed_penalty = Decimal('1000')
+        else:
+            violation_severity = 'critical'
+            proposed_penalty = Decimal('2000')
+
+    # Create notes
+    notes = f"Scraped: Rs.{scraped_price} | Regulated: Rs.{regulated_price} | "
+    notes += f"Difference: Rs.{price_difference} ({percentage_difference:.1f}%)"
+
+    if has_violation:
+        notes += f" | Severity: {violation_severity} | Penalty: Rs.{proposed_penalty}"
+
+    return {
+        'has_violation': has_violation,
+        'compliance_status': compliance_status,
+        'price_difference': price_difference,
+        'percentage_difference': Decimal(str(round(percentage_difference, 2))),
+        'violation_severity': violation_severity,
+        'proposed_penalty': proposed_penalty,
+        'notes': notes,
+    }
+
+
+def write_violation_checks(pairs):
+    """Save check reports and pending violations for (scraped, regulated) pairs.
+
+    Reports are upserted on the regulated/scraped product pair, a pending
+    Violation is created for each violating pair that doesn't already have one,
+    and reports without a linked violation are linked in one bulk update. The
+    report counters are moved along in the same transaction.
+    Returns one dict per unique pair: the assessment plus 'scraped_product',
+    'regulated_product' and 'violation_created'.
+    """
+    results = {}
+    for scraped_product, regulated_product in pairs:
+        key = (scraped_product.pk, regulated_product.pk)
+        if key not in results:
+            result = assess_violation(scraped_product, regulated_product)
+            result.update(scraped_product=scraped_product, regulated_product=regulated_product, violation_created=False)
+            results[key] = result
+
+    if not results:
+        return []
+
+    scraped_ids = {scraped_id for scraped_id, regulated_id in results}
+    violating = {key: result for key, result in results.items() if result['has_violation']}
+
+    with transaction.atomic():
+        # Reuse pending violations, create the missing ones
+        violations = {}
+        if violating:
+            existing = Violation.objects.filter(
+                scraped_product_id__in={scraped_id for scraped_id, regulated_id in violating},
+                regulated_product_id__in={regulated_id for scraped_id, regulated_id in violating},
+                status='pending'
+            ).order_by('pk')
+            for violation in existing:
+                key = (violation.scraped_product_id, violation.regulated_product_id)
+                # The id filters cross-match pairs; only keep violations for pairs violating now
+                if key in violating:
+                    violations.setdefault(key, violation)
+
+            new_violations = []
+            for key, result in violating.items():
+                if key not in violations:
+                    violations[key] = Violation(
+                        regulated_product=result['regulated_product'],
+                        scraped_product=result['scraped_product'],
+                        violation_type='price_exceeded',
+                        severity=result['violation_severity'],
+                        proposed_penalty=result['proposed_penalty'],
+                        status='pending',
+                        notes=result['notes']
+                    )
+                    new_violations.append(violations[key])
+                    result['violation_created'] = True
+
+            if new_violations:
+                Violation.objects.bulk_create(new_violations)
+                logger.info(f"Created {len(new_violations)} violations")
+
+        # Reports about to be overwritten leave their counter buckets
+        deltas = new_deltas()
+        existing_reports = ViolationCheckReport.objects.filter(
+            scraped_product_id__in=scraped_ids,
+            regulated_product_id__in={regulated_id for scraped_id, regulated_id in results}
+        ).values(
+            'scraped_product_id', 'regulated_product_id', 'check_date', 'compliance_status',
+            'violation_severity', 'percentage_difference', 'proposed_penalty'
+        )
+        check_dates = {}
+        for row in existing_reports:
+            key = (row['scraped_product_id'], row['regulated_product_id'])
+            if key in results:
+                check_dates[key] = row['check_date']
+                add_report_delta(
+                    deltas, -1, row['check_date'], results[key]['scraped_product'].marketplace,
+                    row['compliance_status'], row['violation_severity'],
+                    row['percentage_difference'], row['proposed_penalty']
+                )
+
+        reports = ViolationCheckReport.objects.bulk_create(
+            [
+                ViolationCheckReport(
+                    regulated_product=result['regulated_product'],
+                    scraped_product=result['scraped_product'],
+                    violation_record=violations.get(key) if key in violating else None,
+                    **{field: result[field] for field in REPORT_UPDATE_FIELDS}
+                )
+                for key, result in results.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['regulated_product', 'scraped_product'],
+            update_fields=REPORT_UPDATE_FIELDS
+        )
+
+        # Upserted rows keep their original check_date
+        for key, report in zip(results, reports):
+            report.check_date = check_dates.get(key, report.check_date)
+        add_report_instances(deltas, 1, reports)
+        apply_deltas(deltas)
+
+        # Existing reports keep their link; only unlinked violating reports are linked
+        if violations:
+            unlinked = list(ViolationCheckReport.objects.filter(
+                scraped_product_id__in=scraped_ids,
+                has_violation=True,
+                violation_record__isnull=True
+            ).only('id', 'scraped_product_id', 'regulated_product_id'))
+            for report in unlinked:
+                violation = violations.get((report.scraped_product_id, report.regulated_product_id))
+                report.violation_record = violation
+            unlinked = [report for report in unlinked if report.violation_record]
+            if unlinked:
+                ViolationCheckReport.objects.bulk_update(unlinked, ['violation_record'])
+
+    if any(result['violation_created'] for result in results.values()):
+        invalidate_violation_caches()
+
+    return list(results.values())
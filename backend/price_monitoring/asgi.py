@@ -1,5 +1,9 @@
 """
 ASGI config for price_monitoring project.
+
+Serve the project with an ASGI server (e.g. `uvicorn price_monitoring.asgi:application`)
+to get live scraping job event streams; under WSGI that endpoint falls back to
+snapshots the browser re-requests.
 """
 
 import os
@@ -0,0 +1,175 @@
+"""
+Stampede-safe cached computations for dashboard and report endpoints.
+
+cached_computation() keeps a value in the cache with its own soft expiry:
+- fresh values are served straight from the cache, except that readers
+  refresh a little early at random (probabilistic early expiry, scaled by how
+  long the computation takes), so hot keys rarely expire all at once;
+- once a value is due, one request takes a per-key lock and recomputes it in a
+  background thread while everyone keeps getting the stale value;
+- when nothing is cached, only the lock holder computes; other requests wait
+  briefly for its result instead of running the same aggregates in parallel.
+
+Data versions are cheap counters per kind of data ('violations', 'cases',
+...) that are bumped whenever that data changes; endpoints derive ETags from
+them (see conditional.py).
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+LOCK_TIMEOUT = 30
+WAIT_INTERVAL = 0.05
+
+DATA_VERSION_KEY = 'data_version:{}'
+
+_pending_versions = threading.local()
+
+
+def cached_computation(key, compute, timeout=300, stale_timeout=None, beta=1.0):
+    """Return compute() cached under `key` for `timeout` seconds.
+
+    Stale values are kept for another `stale_timeout` seconds (default: `timeout`)
+    and served while a single background refresh runs. `beta` > 1 refreshes
+    earlier, < 1 later.
+    """
+    stale_timeout = timeout if stale_timeout is None else stale_timeout
+
+    entry = _get_entry(key)
+    if entry is not None:
+        value, expires_at, duration = entry
+        # XFetch: the longer the computation, the earlier a reader may refresh
+        if time.time() - duration * beta * math.log(1.0 - random.random()) < expires_at:
+            return value
+
+        lock = _acquire_lock(key)
+        if lock:
+            threading.Thread(
+                target=_refresh_in_background,
+                args=(key, compute, timeout, stale_timeout, lock),
+                daemon=True
+            ).start()
+        return value
+
+    lock = _acquire_lock(key)
+    if lock:
+        try:
+            return _compute_and_store(key, compute, timeout, stale_timeout)
+        finally:
+            _release_lock(key, lock)
+
+    # Someone else is computing this key; wait for their result
+    deadline = time.time() + LOCK_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = _get_entry(key)
+        if entry is not None:
+            return entry[0]
+
+    logger.warning(f"Timed out waiting for cached value '{key}', computing it directly")
+    return compute()
+
+
+def expire_cached(keys):
+    """Mark cached values as due for refresh, keeping them as stale fallbacks."""
+    entries = {key: entry for key, entry in cache.get_many(list(keys)).items() if _is_entry(entry)}
+    if entries:
+        cache.set_many({
+            key: (value, 0, duration)
+            for key, (value, expires_at, duration) in entries.items()
+        })
+
+
+def _get_entry(key):
+    """The (value, expires_at, duration) entry for `key`, ignoring values cached some other way."""
+    entry = cache.get(key)
+    return entry if _is_entry(entry) else None
+
+
+def _is_entry(entry):
+    return isinstance(entry, tuple) and len(entry) == 3
+
+
+def _compute_and_store(key, compute, timeout, stale_timeout):
+    started = time.time()
+    value = compute()
+    finished = time.time()
+    cache.set(key, (value, finished + timeout, finished - started), timeout + stale_timeout)
+    return value
+
+
+def _refresh_in_background(key, compute, timeout, stale_timeout, lock):
+    try:
+        _compute_and_store(key, compute, timeout, stale_timeout)
+    except Exception as e:
+        logger.error(f"Failed to refresh cached value '{key}': {str(e)}")
+    finally:
+        _release_lock(key, lock)
+        # This thread opened its own database connection
+        connection.close()
+
+
+def _acquire_lock(key):
+    """Take the refresh lock for `key`; returns a token, or None if someone else holds it."""
+    token = uuid.uuid4().hex
+    if cache.add(f'{key}:lock', token, LOCK_TIMEOUT):
+        return token
+    return None
+
+
+def _release_lock(key, token):
+    lock_key = f'{key}:lock'
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def get_data_versions(scopes):
+    """Current version of each data scope, in the order given."""
+    keys = [DATA_VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start from the clock so versions never repeat after the cache is flushed
+            cache.add(key, int(time.time() * 1000), None)
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_data_versions(scopes):
+    """Move data scopes to a new version straight away."""
+    for scope in scopes:
+        key = DATA_VERSION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), None)
+
+
+def bump_data_versions_on_commit(*scopes):
+    """Bump data scopes when the current transaction commits (at once outside one)."""
+    pending = getattr(_pending_versions, 'scopes', None)
+    if pending is None:
+        pending = _pending_versions.scopes = set()
+    pending.update(scopes)
+    transaction.on_commit(_flush_pending_versions)
+
+
+def _flush_pending_versions():
+    scopes = getattr(_pending_versions, 'scopes', None)
+    _pending_versions.scopes = None
+    if not scopes:
+        return
+
+    try:
+        bump_data_versions(sorted(scopes))
+    except Exception as e:
+        logger.warning(f"Failed to bump data versions {sorted(scopes)}: {str(e)}")
@@ -0,0 +1,81 @@
+"""
+Conditional GET for statistics endpoints.
+Each response carries an ETag derived from the data versions it depends on
+(see caching.get_data_versions) and the current cache period, and is marked
+`Cache-Control: private, no-cache` so browsers revalidate with If-None-Match.
+A matching tag gets a bodiless 304 before any aggregate runs or any cached
+payload is read. Cached values keep the tag they were computed under: one
+whose tag is out of date is refreshed in the background (so a version bump
+invalidates every cached payload built on that data), and while it is being
+refreshed it is served with its old tag, never claiming to be newer than it is.
+"""
+
+import hashlib
+import time
+
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .caching import cached_computation, expire_cached, get_data_versions
+
+
+def current_etag(key, scopes, period):
+    """ETag for `key` at the current versions of `scopes` and the current `period`-second window.
+
+    The window makes the tag change at least once per period, for figures such
+    as "last 7 days" that move with the clock and not only with the data.
+    """
+    versions = ':'.join(str(version) for version in get_data_versions(scopes))
+    window = int(time.time() // period)
+    digest = hashlib.md5(f'{key}|{versions}|{window}'.encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    # Compression middleware and proxies may weaken the tag; GET allows the weak comparison
+    tags = {tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(header)}
+    return '*' in tags or etag in tags
+
+
+def conditional_response(request, key, scopes, compute, timeout=300, cached=True):
+    """Response for compute(), or 304 Not Modified when the client's ETag is current.
+
+    With `cached`, the data comes from cached_computation(key, ..., timeout);
+    otherwise compute() runs on every request that misses the ETag.
+    """
+    etag = current_etag(key, scopes, timeout)
+    if etag_matches(request, etag):
+        return _with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+    if cached:
+        # The tag is taken before computing, so changes made meanwhile still show up as new
+        def compute_tagged():
+            return current_etag(key, scopes, timeout), compute()
+
+        tagged = cached_computation(key, compute_tagged, timeout)
+        if not (isinstance(tagged, tuple) and tagged[0] == etag):
+            # Computed before the data last changed (or before ETags were added):
+            # keep serving it while one request refreshes it in the background
+            expire_cached([key])
+            tagged = cached_computation(key, compute_tagged, timeout)
+        # Values cached before ETags were added hold bare data
+        etag, data = tagged if isinstance(tagged, tuple) else (None, tagged)
+        # A stale value still being refreshed may be exactly what the client has
+        if etag and etag_matches(request, etag):
+            return _with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+    else:
+        data = compute()
+
+    return _with_validators(Response(data), etag)
+
+
+def _with_validators(response, etag):
+    if etag:
+        response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
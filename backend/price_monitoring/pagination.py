@@ -0,0 +1,64 @@
+"""
+Opt-in keyset pagination for large list endpoints.
+Lists keep the default page-number pagination; passing ?pagination=cursor
+switches to cursor pagination on the view's cursor_ordering. The cursor
+continues from the last row's position instead of counting the table and
+scanning past an OFFSET, so deep pages cost the same as the first one.
+"""
+
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+CURSOR_PAGINATION_PARAM = 'pagination'
+CURSOR_PAGINATION_VALUE = 'cursor'
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Cursor pagination ordered by a timestamp with the primary key as tie-breaker."""
+
+    ordering = ('-created_at', '-id')
+
+    def __init__(self, ordering=None):
+        if ordering:
+            self.ordering = ordering
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """Page-number pagination, or keyset pagination with ?pagination=cursor.
+
+    Views set `cursor_ordering`, e.g. ('-scraped_at', '-id'): the first field
+    positions the cursor and the id keeps rows with equal timestamps in a
+    stable order.
+    """
+
+    cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(CURSOR_PAGINATION_PARAM) == CURSOR_PAGINATION_VALUE or
+            KeysetCursorPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = KeysetCursorPagination(getattr(view, 'cursor_ordering', None))
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+        self.cursor_paginator = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': CURSOR_PAGINATION_PARAM,
+                'required': False,
+                'in': 'query',
+                'description': "Set to 'cursor' for cursor pagination (follow the next/previous links).",
+                'schema': {'type': 'string', 'enum': [CURSOR_PAGINATION_VALUE]},
+            },
+            *KeysetCursorPagination().get_schema_operation_parameters(view),
+        ]
@@ -0,0 +1,71 @@
+"""
+Per-endpoint database query budgets.
+Views declare how many queries a request may run (authentication included);
+the count is taken with a connection execute wrapper around the view and a
+request over its budget is logged as a warning. Requests are never failed
+over a budget: the budgets are enforced by the tests in
+price_monitoring/tests.py, which read them with declared_query_budget().
+"""
+
+import functools
+import logging
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """connection.execute_wrapper callable counting the queries it sees."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_within_budget(name, budget, view, *args, **kwargs):
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        response = view(*args, **kwargs)
+    if counter.count > budget:
+        logger.warning(f"{name} ran {counter.count} queries, over its budget of {budget}")
+    return response
+
+
+class QueryBudgetMixin:
+    """APIView mixin counting each request against `query_budget` queries."""
+
+    query_budget = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.query_budget is None:
+            return super().dispatch(request, *args, **kwargs)
+        return run_within_budget(
+            type(self).__name__, self.query_budget, super().dispatch, request, *args, **kwargs
+        )
+
+
+def query_budget(budget):
+    """Decorator counting a function view against `budget` queries (put it above @api_view)."""
+
+    def decorator(view):
+        # @api_view returns a generic `view` function; its class carries the real name
+        name = getattr(view, 'cls', view).__name__
+
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            return run_within_budget(name, budget, view, request, *args, **kwargs)
+        wrapped.query_budget = budget
+        return wrapped
+
+    return decorator
+
+
+def declared_query_budget(view):
+    """The query budget of a resolved view function, or None if it has none."""
+    if hasattr(view, 'query_budget'):
+        return view.query_budget
+    return getattr(getattr(view, 'view_class', None), 'query_budget', None)
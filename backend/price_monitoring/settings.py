@@ -80,15 +80,18 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'price_monitoring.wsgi.application'
+ASGI_APPLICATION = 'price_monitoring.asgi.application'
 
 # Database - Neon Configuration with Connection Pooling
+DB_HOST = config('DB_HOST', default='ep-divine-art-adw2ivpe-pooler.c-2.us-east-1.aws.neon.tech')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': config('DB_NAME', default='neondb'),
         'USER': config('DB_USER', default='neondb_owner'),
         'PASSWORD': config('DB_PASSWORD', default='npg_iZGzN6wpy8td'),
-        'HOST': config('DB_HOST', default='ep-divine-art-adw2ivpe-pooler.c-2.us-east-1.aws.neon.tech'),
+        'HOST': DB_HOST,
         'PORT': config('DB_PORT', default='5432'),
         'OPTIONS': {
             'sslmode': 'require',
@@ -96,6 +99,9 @@ DATABASES = {
         },
         'CONN_MAX_AGE': 600,  # Keep connections alive for 10 minutes
         'CONN_HEALTH_CHECKS': True,  # Check connection health
+        # The -pooler endpoint is PgBouncer in transaction mode, which can't hold
+        # the named cursors iterator() would otherwise open
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default='-pooler' in DB_HOST, cast=bool),
     }
 }
 
@@ -192,6 +198,48 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Scraping jobs with more search queries than this are split into a chord of
+# per-chunk subtasks so several workers can share one job (0 disables)
+SCRAPING_CHUNK_SIZE = config('SCRAPING_CHUNK_SIZE', default=25, cast=int)
+
+# HTTP client for direct requests to generic websites, including the hybrid
+# engine's requests before any Selenium fallback: 'requests' (blocking) or
+# 'async' (shared HTTP/2 client on an event loop, needs httpx); websites can
+# override it with scraping_config['http_engine']
+SCRAPING_HTTP_ENGINE = config('SCRAPING_HTTP_ENGINE', default='requests')
+SCRAPING_ASYNC_MAX_CONNECTIONS = config('SCRAPING_ASYNC_MAX_CONNECTIONS', default=200, cast=int)
+
+# HTML parser for search result pages: 'lxml' (needs cssselect), 'selectolax'
+# (optional package) or 'bs4'; missing packages fall back to BeautifulSoup
+SCRAPING_HTML_PARSER = config('SCRAPING_HTML_PARSER', default='lxml')
+
+# Per-domain request pacing shared by all workers through Redis. A 429/503
+# doubles a domain's request interval (up to MAX_DELAY seconds) and Retry-After
+# blocks it for up to MAX_RETRY_AFTER seconds; every other response adds
+# RECOVERY_RATE requests/second back until the website's rate_limit_delay
+SCRAPING_RATE_LIMIT = {
+    'REDIS_URL': config('REDIS_URL', default='redis://localhost:6379/0'),
+    'MAX_DELAY': config('SCRAPING_RATE_LIMIT_MAX_DELAY', default=60, cast=float),
+    'MAX_RETRY_AFTER': config('SCRAPING_RATE_LIMIT_MAX_RETRY_AFTER', default=300, cast=float),
+    'RECOVERY_RATE': config('SCRAPING_RATE_LIMIT_RECOVERY_RATE', default=0.1, cast=float),
+    'STATE_TTL': 3600,
+}
+
+# Search pages are reused for each website's response_cache_ttl, then kept
+# MAX_STALE seconds longer so unchanged pages can be revalidated with a 304
+SCRAPING_RESPONSE_CACHE = {
+    'MAX_STALE': config('SCRAPING_RESPONSE_CACHE_MAX_STALE', default=86400, cast=int),
+}
+
+# Live scraping job events (Redis pub/sub relayed as server-sent events).
+# Streams are closed after JOB_EVENTS_MAX_STREAM_SECONDS and browsers reconnect
+# after JOB_EVENTS_RETRY_MS; without ASGI the endpoint only returns a snapshot,
+# so the reconnect delay becomes the polling interval
+JOB_EVENTS_REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+JOB_EVENTS_HEARTBEAT = 15
+JOB_EVENTS_MAX_STREAM_SECONDS = config('JOB_EVENTS_MAX_STREAM_SECONDS', default=300, cast=int)
+JOB_EVENTS_RETRY_MS = config('JOB_EVENTS_RETRY_MS', default=5000, cast=int)
+
 # Enhanced Caching Configuration for Better Performance
 CACHES = {
     'default': {
@@ -301,4 +349,13 @@ SELENIUM_CONFIG = {
     'SCREENSHOT_DIR': BASE_DIR / 'logs' / 'screenshots',
     'MAX_RETRIES': config('SELENIUM_MAX_RETRIES', default=3, cast=int),
     'RETRY_DELAY': config('SELENIUM_RETRY_DELAY', default=2, cast=int),
+    # Warm browsers kept per worker process, recycled after POOL_MAX_PAGES pages or
+    # POOL_MAX_AGE seconds and quit after POOL_IDLE_TIMEOUT idle seconds
+    'POOL_SIZE': config('SELENIUM_POOL_SIZE', default=2, cast=int),
+    'POOL_MAX_PAGES': config('SELENIUM_POOL_MAX_PAGES', default=50, cast=int),
+    'POOL_MAX_AGE': config('SELENIUM_POOL_MAX_AGE', default=1800, cast=int),
+    'POOL_IDLE_TIMEOUT': config('SELENIUM_POOL_IDLE_TIMEOUT', default=600, cast=int),
+    'POOL_ACQUIRE_TIMEOUT': config('SELENIUM_POOL_ACQUIRE_TIMEOUT', default=120, cast=int),
+    # chromedriver / geckodriver binary; empty lets webdriver-manager find one (once per process)
+    'DRIVER_PATH': config('SELENIUM_DRIVER_PATH', default=''),
 }
\ No newline at end of file
@@ -0,0 +1,122 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts.models import User
+from apps.cases.models import Case, CaseNote
+from apps.products.models import RegulatedProduct
+from apps.scraping.models import ScrapedProduct
+from apps.violations.models import Violation, ViolationCheckReport
+from price_monitoring.query_budget import declared_query_budget
+
+
+class QueryBudgetTests(APITestCase):
+    """Every list, detail and stats endpoint stays within its declared query budget.
+
+    The fixtures hold several rows per table, so an N+1 in a list shows up as
+    a count over the budget.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass', name='Admin', role='admin'
+        )
+        cls.investigator = User.objects.create_user(
+            username='investigator', email='investigator@example.com', password='pass',
+            name='Investigator', role='investigator'
+        )
+
+        cls.violations = []
+        for i in range(3):
+            regulated = RegulatedProduct.objects.create(
+                name=f'Sugar {i} kg', category='Food', gov_price=Decimal('100.00'), unit='kg'
+            )
+            scraped = ScrapedProduct.objects.create(
+                product_name=f'Sugar {i} kg pack', marketplace='amazon', search_query='sugar',
+                listed_price=Decimal('150.00'), url=f'https://example.com/sugar-{i}'
+            )
+            violation = Violation.objects.create(
+                regulated_product=regulated, scraped_product=scraped, violation_type='price_exceeded',
+                severity='high', proposed_penalty=Decimal('5000.00')
+            )
+            ViolationCheckReport.objects.create(
+                regulated_product=regulated, scraped_product=scraped, has_violation=True,
+                compliance_status='violation', price_difference=Decimal('50.00'),
+                percentage_difference=Decimal('50.00'), violation_severity='high',
+                proposed_penalty=Decimal('5000.00'), violation_record=violation
+            )
+            cls.violations.append(violation)
+
+        cls.cases = []
+        for violation in cls.violations[:2]:
+            case = Case.objects.create(violation=violation, investigator=cls.investigator)
+            CaseNote.objects.create(case=case, author=cls.investigator, content='Visited the seller')
+            cls.cases.append(case)
+
+    def setUp(self):
+        cache.clear()
+        token = RefreshToken.for_user(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def assertWithinQueryBudget(self, url, params=None):
+        budget = declared_query_budget(resolve(url).func)
+        self.assertIsNotNone(budget, f"{url} declares no query budget")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertLessEqual(
+            len(queries), budget,
+            f"{url} ran {len(queries)} queries, over its budget of {budget}:\n"
+            + '\n'.join(query['sql'] for query in queries.captured_queries)
+        )
+
+    def test_violation_list(self):
+        self.assertWithinQueryBudget(reverse('violation_list'))
+
+    def test_violation_list_expanded(self):
+        self.assertWithinQueryBudget(
+            reverse('violation_list'), {'expand': 'regulated_product,scraped_product,confirmed_by'}
+        )
+
+    def test_violation_detail(self):
+        self.assertWithinQueryBudget(reverse('violation_detail', args=[self.violations[0].pk]))
+
+    def test_violation_stats(self):
+        self.assertWithinQueryBudget(reverse('violation_stats'))
+
+    def test_full_violation_report(self):
+        self.assertWithinQueryBudget(reverse('full_violation_report'))
+
+    def test_case_list(self):
+        self.assertWithinQueryBudget(reverse('case_list_create'))
+
+    def test_case_list_expanded(self):
+        self.assertWithinQueryBudget(
+            reverse('case_list_create'), {'expand': 'violation,investigator,case_notes'}
+        )
+
+    def test_case_detail(self):
+        self.assertWithinQueryBudget(reverse('case_detail', args=[self.cases[0].pk]))
+
+    def test_case_stats(self):
+        self.assertWithinQueryBudget(reverse('case_stats'))
+
+    def test_scraped_product_list(self):
+        self.assertWithinQueryBudget(reverse('scraped_products'))
+
+    def test_scraping_stats(self):
+        self.assertWithinQueryBudget(reverse('scraping_stats'))
+
+    def test_summary_report(self):
+        self.assertWithinQueryBudget(reverse('report_summary'))
+
+    def test_dashboard_metrics(self):
+        self.assertWithinQueryBudget(reverse('dashboard_metrics'))
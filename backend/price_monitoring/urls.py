@@ -40,12 +40,16 @@ def api_documentation(request):
             "reports": {
                 "list": "GET/POST /api/reports/",
                 "detail": "GET/PUT/DELETE /api/reports/{id}/",
-                "generate": "POST /api/reports/generate/"
+                "generate": "POST /api/reports/generate/",
+                "export_jobs": "GET/POST /api/reports/export-jobs/",
+                "export_job_detail": "GET/DELETE /api/reports/export-jobs/{id}/",
+                "export_job_download": "GET /api/reports/export-jobs/{id}/download/"
             },
             "scraping": {
                 "scraped_products": "GET /api/scraping/results/",
                 "scraping_jobs": "GET/POST /api/scraping/jobs/",
                 "job_detail": "GET/PATCH /api/scraping/jobs/{id}/",
+                "job_events": "GET /api/scraping/jobs/{id}/events/ (server-sent events)",
                 "websites": "GET/POST /api/scraping/websites/",
                 "website_detail": "GET/PUT/DELETE /api/scraping/websites/{id}/",
                 "product_lists": "GET/POST /api/scraping/product-lists/",
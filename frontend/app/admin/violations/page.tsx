@@ -165,7 +165,7 @@ export default function ViolationsPage() {
                   <td>
                     <div>
                       <p className="font-medium text-gray-900">
-                        {violation.regulated_product?.name || 'Unknown Product'}
+                        {violation.regulated_product_name || 'Unknown Product'}
                       </p>
                       <p className="text-sm text-gray-500">
                         Found: {violation.scraped_product_name}
@@ -66,10 +66,10 @@ export function RecentActivity() {
                 </div>
                 <div className="flex-1 min-w-0">
                   <p className="text-sm font-medium text-gray-900 truncate">
-                    {violation.regulated_product.name}
+                    {violation.regulated_product_name}
                   </p>
                   <p className="text-sm text-gray-500">
-                    {violation.scraped_product.marketplace} - ${violation.scraped_product.listed_price}
+                    {violation.marketplace} - ${violation.listed_price}
                   </p>
                   <div className="flex items-center space-x-2 mt-1">
                     <span className={`text-xs font-medium ${getStatusColor(violation.status)}`}>
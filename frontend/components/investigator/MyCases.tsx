@@ -70,11 +70,11 @@ export function MyCases() {
                       </h4>
                     </div>
                     <p className="text-sm text-gray-600 mt-1">
-                      {caseItem.violation.regulated_product.name}
+                      {caseItem.regulated_product_name}
                     </p>
                     <p className="text-sm text-gray-500">
-                      {caseItem.violation.scraped_product.marketplace} - 
-                      ${caseItem.violation.scraped_product.listed_price}
+                      {caseItem.marketplace} - 
+                      ${caseItem.listed_price}
                     </p>
                     <div className="flex items-center space-x-2 mt-2">
                       <span className={`badge ${getStatusColor(caseItem.status)}`}>
@@ -89,17 +89,17 @@ export function RecentViolations() {
                 <div className="flex items-start justify-between">
                   <div className="flex-1">
                     <h4 className="font-medium text-gray-900">
-                      {violation.regulated_product.name}
+                      {violation.regulated_product_name}
                     </h4>
                     <p className="text-sm text-gray-600">
-                      {violation.scraped_product.marketplace} - {violation.scraped_product.product_name}
+                      {violation.marketplace} - {violation.scraped_product_name}
                     </p>
                     <div className="flex items-center space-x-4 mt-2 text-sm">
                       <span className="text-gray-500">
-                        Listed: {formatCurrency(violation.scraped_product.listed_price)}
+                        Listed: {formatCurrency(violation.listed_price)}
                       </span>
                       <span className="text-gray-500">
-                        Gov: {formatCurrency(violation.regulated_product.gov_price)}
+                        Gov: {formatCurrency(violation.gov_price)}
                       </span>
                       <span className="text-red-600 font-medium">
                         +{violation.percentage_over.toFixed(1)}%
@@ -325,6 +325,19 @@ export const scrapingApi = {
     return response.data
   },
 
+  // Live job progress as server-sent events: 'snapshot' on connect, then 'log',
+  // 'query' and 'status' events. EventSource can't send headers, so the access
+  // token goes in the query string; the browser reconnects by itself.
+  jobEvents: (jobId: string | number) => {
+    const accessTokenCookie = document.cookie.split(';').find(cookie =>
+      cookie.trim().startsWith('access_token=')
+    )
+    const accessToken = accessTokenCookie ? accessTokenCookie.trim().split('=')[1] : ''
+    return new EventSource(
+      `${getApiUrl()}/scraping/jobs/${jobId}/events/?token=${encodeURIComponent(accessToken)}`
+    )
+  },
+
   updateWebsiteStatus: async (websiteId: string, status: string) => {
     const response = await api.patch(`/scraping/websites/${websiteId}/`, { is_active: status === 'active' })
     return response.data